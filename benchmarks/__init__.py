@@ -0,0 +1 @@
+"""Benchmarks for iett-hacs hot paths (run as ``python -m benchmarks.<name>``)."""
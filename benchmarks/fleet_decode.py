@@ -0,0 +1,125 @@
+"""Compare buffered ``resp.json()`` and streamed decoding of /v1/fleet.
+
+Each measurement runs in a fresh worker process that fetches the payload
+from a local HTTP server, so peak RSS growth is not polluted by earlier
+runs. Usage::
+
+    python -m benchmarks.fleet_decode [--sizes 7000 50000] [--repeat 3]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import resource
+import statistics
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.payloads import fleet
+
+MODES = ("json", "stream")
+
+
+def _status_kib(field: str) -> int | None:
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> int:
+    """Reset the RSS high-water mark where the OS allows it; return current RSS.
+
+    Importing Home Assistant peaks higher than decoding a small fleet, so
+    without the reset (Linux ``clear_refs``) the decode would not register.
+    """
+    gc.collect()
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as refs:
+            refs.write("5")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return _status_kib("VmRSS:") or 0
+
+
+def _peak_rss() -> int:
+    return _status_kib("VmHWM:") or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def _worker(mode: str, url: str) -> None:
+    from custom_components.iett.client import IettMiddleClient, _models
+    from custom_components.iett.models import BusPosition
+
+    async with aiohttp.ClientSession() as session:
+        client = IettMiddleClient(session, url)
+        base_rss = _reset_peak_rss()
+        start = time.perf_counter()
+        if mode == "json":
+            buses = await client._get("/v1/fleet", _models(BusPosition))
+        else:
+            buses = await client.get_all_buses()
+        wall = time.perf_counter() - start
+        peak_rss = _peak_rss()
+    print(json.dumps({"wall_s": wall, "rss_kib": peak_rss - base_rss, "count": len(buses)}))
+
+
+async def _run_worker(mode: str, url: str) -> dict[str, float]:
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.fleet_decode", "--worker", mode, url,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    out, _ = await proc.communicate()
+    if proc.returncode:
+        raise RuntimeError(f"{mode} worker failed")
+    return json.loads(out)  # type: ignore[no-any-return]
+
+
+async def _main(sizes: list[int], repeat: int) -> None:
+    print(f"{'buses':>7} {'mode':>7} {'wall ms':>9} {'peak RSS MiB':>13}")
+    for size in sizes:
+        body = json.dumps(fleet(size), ensure_ascii=False).encode()
+
+        async def handler(_request: web.Request, body: bytes = body) -> web.Response:
+            return web.Response(body=body, content_type="application/json")
+
+        app = web.Application()
+        app.router.add_get("/v1/fleet", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        url = f"http://127.0.0.1:{port}"
+        try:
+            for mode in MODES:
+                runs = [await _run_worker(mode, url) for _ in range(repeat)]
+                wall = min(r["wall_s"] for r in runs) * 1000
+                rss = statistics.median(r["rss_kib"] for r in runs) / 1024
+                print(f"{size:>7} {mode:>7} {wall:>9.1f} {rss:>13.1f}")
+        finally:
+            await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "URL"))
+    args = parser.parse_args()
+    if args.worker:
+        asyncio.run(_worker(*args.worker))
+    else:
+        asyncio.run(_main(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Memory and iteration cost of fleet containers.
+
+Compares a list of plain (``__dict__``) dataclasses — the original
+``BusPosition`` — with today's slotted ``BusPosition`` list and the
+columnar ``FleetSnapshot``. Usage::
+
+    python -m benchmarks.fleet_memory [--sizes 7000 50000]
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.payloads import fleet
+from custom_components.iett.fleet import FleetSnapshot
+from custom_components.iett.models import BusPosition
+
+# The pre-slots model, rebuilt from the current field list.
+DictBusPosition = dataclasses.make_dataclass(
+    "DictBusPosition",
+    [(f.name, f.type, f) for f in dataclasses.fields(BusPosition)],
+)
+
+
+def _retained(build: Callable[[], Any]) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+def _best(fn: Callable[[], Any], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7000, 50000])
+    args = parser.parse_args()
+
+    print(
+        f"{'buses':>7} {'container':>10} {'MiB':>7} {'B/bus':>6}"
+        f" {'build ms':>9} {'iter ms':>8} {'as_dict ms':>11}"
+    )
+    for size in args.sizes:
+        # Decode inside each builder so every container owns fresh strings,
+        # exactly as after a real download.
+        body = json.dumps(fleet(size), ensure_ascii=False)
+        builders: dict[str, Callable[[], Any]] = {
+            "dict-dc": lambda: [DictBusPosition(**i) for i in json.loads(body)],
+            "slots-dc": lambda: [BusPosition(**i) for i in json.loads(body)],
+            "snapshot": lambda: FleetSnapshot.from_positions(
+                BusPosition(**i) for i in json.loads(body)
+            ),
+        }
+        for name, build in builders.items():
+            value, size_b = _retained(build)
+            build_ms = _best(build, 3)
+            iter_ms = _best(lambda: [(b.route_code, b.speed, b.latitude) for b in value])
+            dump = (
+                (lambda: [dataclasses.asdict(b) for b in value])
+                if name == "dict-dc"
+                else (lambda: [b.as_dict() for b in value])
+            )
+            dict_ms = _best(dump, 3)
+            print(
+                f"{size:>7} {name:>10} {size_b / 2**20:>7.1f} {size_b // size:>6}"
+                f" {build_ms:>9.1f} {iter_ms:>8.1f} {dict_ms:>11.1f}"
+            )
+        snap = builders["snapshot"]()
+        col_ms = _best(lambda: (sum(snap.speed), max(snap.latitude)))
+        print(f"{size:>7} {'columns':>10} {'':>7} {'':>6} {'':>9} {col_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare ``json.loads`` + ``BusPosition(**item)`` with orjson + the model decoder.
+
+Times the parse and the model build separately on a synthetic fleet body,
+then shows what each path makes of a body with schema drift: an extra
+field on every row and a few rows with bad values. Usage::
+
+    python -m benchmarks.model_decode [--buses 7000] [--rounds 20]
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.payloads import fleet
+from custom_components.iett.decode import ModelDecoder, json_loads
+from custom_components.iett.models import BusPosition
+
+
+def _best(run: Callable[[], Any], rounds: int) -> float:
+    best = float("inf")
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best * 1000
+
+
+def _old(rows: Any) -> list[BusPosition]:
+    return [BusPosition(**item) for item in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buses", type=int, default=7000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = fleet(args.buses)
+    body = json.dumps(rows, ensure_ascii=False).encode()
+    decoder = ModelDecoder(BusPosition)
+    n = args.rounds
+
+    print(f"{args.buses} buses, {len(body) / 1024:.0f} KiB body, best of {n}")
+    print(f"{'path':>18} {'parse ms':>9} {'build ms':>9} {'total ms':>9} {'rows/s':>10}")
+    for name, loads, build in (
+        ("json + **item", json.loads, _old),
+        ("orjson + decoder", json_loads, decoder.many),
+    ):
+        parse_ms = _best(lambda loads=loads: loads(body), n)
+        build_ms = _best(lambda build=build: build(rows), n)
+        total_ms = _best(lambda loads=loads, build=build: build(loads(body)), n)
+        rate = args.buses / total_ms * 1000
+        print(f"{name:>18} {parse_ms:>9.2f} {build_ms:>9.2f} {total_ms:>9.2f} {rate:>10,.0f}")
+
+    drifted = [{**row, "occupancy": 0.5} for row in rows]
+    for row in drifted[::1000]:
+        row["latitude"] = "n/a"
+    drifted[1]["speed"] = "42"  # coerced, not skipped
+    drifted_body = json.dumps(drifted).encode()
+    try:
+        _old(json.loads(drifted_body))
+        old_result = "ok"
+    except TypeError as err:
+        old_result = f"fails: {err}"
+    decoder = ModelDecoder(BusPosition)
+    kept = decoder.many(json_loads(drifted_body))
+    print("\nWith an extra field on every row and bad latitudes on a few:")
+    print(f"  json + **item:    {old_result}")
+    print(
+        f"  orjson + decoder: {len(kept)} rows kept, {decoder.stats.skipped} skipped, "
+        f"unknown fields {dict(decoder.stats.unknown_fields)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Synthetic iett-middle payloads shaped like the captured fixtures."""
+from __future__ import annotations
+
+import random
+from typing import Any
+
+_OPERATORS = [
+    "İstanbul Halk Ulaşım",
+    "Otobüs A.Ş.",
+    "Özel Halk Otobüsü",
+    "İETT İşletmeleri",
+]
+_DIRECTIONS = ["ŞİFA SONDURAK", "4.LEVENT METRO", "KADIKÖY", "EMİNÖNÜ", "TAKSİM"]
+
+
+def route_codes(count: int = 600, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    suffixes = ["", "T", "M", "A", "B", "D", "E", "K"]
+    codes: set[str] = set()
+    while len(codes) < count:
+        codes.add(f"{rng.randint(1, 999)}{rng.choice(suffixes)}")
+    return sorted(codes)
+
+
+def fleet(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    """*count* buses spread over ~600 routes around Istanbul."""
+    rng = random.Random(seed)
+    routes = route_codes(seed=seed)
+    buses: list[dict[str, Any]] = []
+    for i in range(count):
+        route = rng.choice(routes) if rng.random() < 0.85 else None
+        buses.append(
+            {
+                "kapino": f"{chr(65 + i % 26)}-{i:05d}",
+                "plate": f"34 HO {1000 + i}",
+                "latitude": 40.8 + rng.random() * 0.45,
+                "longitude": 28.6 + rng.random() * 0.9,
+                "speed": rng.randint(0, 80),
+                "operator": rng.choice(_OPERATORS),
+                "last_seen": f"2026-02-27 {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+                "route_code": route,
+                "route_name": f"{route} HATTI — TUZLA ŞİFA MAHALLESİ" if route else None,
+                "direction": rng.choice(_DIRECTIONS) if route else None,
+                "nearest_stop": str(rng.randint(100000, 399999)) if route else None,
+            }
+        )
+    return buses
+
+
+def schedule(count: int, route: str = "500T", seed: int = 0) -> list[dict[str, Any]]:
+    """*count* planned departures over three day types, two directions and variants."""
+    rng = random.Random(seed)
+    departures: list[dict[str, Any]] = []
+    for i in range(count):
+        direction = "GD"[i % 2]
+        minute = rng.randint(5 * 60, 24 * 60 + 30) % 1440
+        departures.append(
+            {
+                "route_code": route,
+                "route_name": f"{route} HATTI — TUZLA ŞİFA MAHALLESİ",
+                "route_variant": f"{route}_{direction}_D{rng.randint(0, 3)}",
+                "direction": direction,
+                "day_type": rng.choice("HCP"),
+                "service_type": "ÖHO",
+                "departure_time": f"{minute // 60:02d}:{minute % 60:02d}",
+            }
+        )
+    return departures
+
+
+def stop_codes(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return sorted({str(rng.randint(100000, 399999)) for _ in range(count * 2)})[:count]
+
+
+def arrivals(stops: list[str], per_stop: int = 20, seed: int = 0) -> dict[str, list[dict[str, Any]]]:
+    """Bulk ``/v1/stops/arrivals`` body: *per_stop* ETAs for every stop."""
+    rng = random.Random(seed)
+    routes = route_codes(seed=seed)
+    body: dict[str, list[dict[str, Any]]] = {}
+    for dcode in stops:
+        etas = sorted(rng.randint(0, 90) for _ in range(per_stop))
+        body[dcode] = [
+            {
+                "route_code": rng.choice(routes),
+                "destination": rng.choice(_DIRECTIONS),
+                "eta_minutes": eta,
+                "eta_raw": f"{eta} dk",
+            }
+            for eta in etas
+        ]
+    return body
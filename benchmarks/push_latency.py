@@ -0,0 +1,153 @@
+"""Compare how soon polling and the event stream see a fleet change.
+
+A local server moves one bus at a time, at random (exponentially spaced)
+moments, and serves both ``/v1/fleet?since=`` deltas and the ``fleet``
+channel of ``/v1/stream``. One client polls for deltas on a fixed
+interval while another holds the stream open; both report the delay from
+each change to the moment they saw it. Usage::
+
+    python -m benchmarks.push_latency [--buses 7000] [--poll 1.0] [--every 0.25] [--duration 20]
+
+Intervals are scaled down from the real ones (15 s polls); delays scale
+with them, so polling's median is about half the poll interval.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.payloads import fleet
+
+
+class _Source:
+    def __init__(self, buses: int, every: float) -> None:
+        self.buses = fleet(buses)
+        self.every = every
+        self.changes: list[tuple[float, dict[str, object]]] = []  # cursor = index + 1
+        self.streams: list[asyncio.Queue[bytes]] = []
+
+    async def move(self) -> None:
+        rng = random.Random(0)
+        while True:
+            await asyncio.sleep(rng.expovariate(1 / self.every))
+            bus = dict(rng.choice(self.buses), latitude=40.8 + rng.random() * 0.45)
+            self.changes.append((time.perf_counter(), bus))
+            body = {"cursor": len(self.changes), "changed": [bus], "removed": []}
+            frame = f"event: fleet\ndata: {json.dumps(body)}\n\n".encode()
+            for queue in self.streams:
+                queue.put_nowait(frame)
+
+    async def fleet(self, request: web.Request) -> web.Response:
+        since = request.query.get("since")
+        if since is None:
+            return web.json_response({"cursor": len(self.changes), "reset": True, "changed": self.buses})
+        changed = [bus for _, bus in self.changes[int(since):]]
+        return web.json_response({"cursor": len(self.changes), "changed": changed, "removed": []})
+
+    async def stream(self, request: web.Request) -> web.StreamResponse:
+        queue: asyncio.Queue[bytes] = asyncio.Queue()
+        self.streams.append(queue)
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        try:
+            while True:
+                await resp.write(await queue.get())
+        finally:
+            self.streams.remove(queue)
+
+
+def _seen(source: _Source, old: int, new: int, delays: list[float]) -> None:
+    now = time.perf_counter()
+    delays.extend(now - source.changes[c][0] for c in range(old, new))
+
+
+async def _poll(url: str, source: _Source, every: float, delays: list[float]) -> int:
+    from custom_components.iett.client import IettMiddleClient
+
+    requests = 0
+    async with aiohttp.ClientSession() as session:
+        client = IettMiddleClient(session, url)
+        cursor = (await client.get_fleet_delta(None)).cursor
+        try:
+            while True:
+                await asyncio.sleep(every)
+                delta = await client.get_fleet_delta(cursor)
+                requests += 1
+                _seen(source, int(cursor or 0), int(delta.cursor or 0), delays)
+                cursor = delta.cursor
+        except asyncio.CancelledError:
+            return requests
+
+
+async def _push(url: str, source: _Source, delays: list[float]) -> None:
+    from custom_components.iett.client import IettMiddleClient
+    from custom_components.iett.push import FLEET_CHANNEL, READY
+
+    async with aiohttp.ClientSession() as session:
+        client = IettMiddleClient(session, url)
+        cursor = len(source.changes)
+        async for event in client.stream([FLEET_CHANNEL], since=str(cursor)):
+            if event.channel == READY:
+                continue
+            new = int(event.data.cursor)
+            _seen(source, cursor, new, delays)
+            cursor = new
+
+
+async def _main(buses: int, poll: float, every: float, duration: float) -> None:
+    source = _Source(buses, every)
+    app = web.Application()
+    app.router.add_get("/v1/fleet", source.fleet)
+    app.router.add_get("/v1/stream", source.stream)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    url = f"http://127.0.0.1:{port}"
+
+    polled: list[float] = []
+    pushed: list[float] = []
+    tasks = [
+        asyncio.create_task(_poll(url, source, poll, polled)),
+        asyncio.create_task(_push(url, source, pushed)),
+    ]
+    await asyncio.sleep(0.5)  # both clients connected before the first change
+    mover = asyncio.create_task(source.move())
+    await asyncio.sleep(duration)
+    for task in (mover, *tasks):
+        task.cancel()
+    requests = await tasks[0]
+    await asyncio.gather(mover, tasks[1], return_exceptions=True)
+    await runner.cleanup()
+
+    print(f"{len(source.changes)} changes over {duration:.0f} s, polling every {poll} s")
+    print(f"{'mode':>5} {'seen':>5} {'median ms':>10} {'p90 ms':>8} {'requests':>9}")
+    for mode, delays, count in (("poll", polled, requests), ("push", pushed, 1)):
+        if not delays:
+            print(f"{mode:>5} {0:>5}")
+            continue
+        p90 = statistics.quantiles(delays, n=10)[-1] if len(delays) > 1 else delays[0]
+        median = statistics.median(delays)
+        print(f"{mode:>5} {len(delays):>5} {median * 1000:>10.1f} {p90 * 1000:>8.1f} {count:>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buses", type=int, default=7000)
+    parser.add_argument("--poll", type=float, default=1.0, help="poll interval (s)")
+    parser.add_argument("--every", type=float, default=0.25, help="mean time between changes (s)")
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(_main(args.buses, args.poll, args.every, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Regression suite for the integration's hot paths, checked against a baseline.
+
+Covers model decoding (JSON body to models, as the client does it),
+``_state_value``, attribute building (and with it ``as_dict``),
+``IettSensor._refresh_attributes`` and full coordinator
+cycles against a local HTTP server, over synthetic payloads of realistic
+and extreme sizes. Each case reports the best per-call time over several
+rounds. Usage::
+
+    python -m benchmarks.suite                    # run and print
+    python -m benchmarks.suite --check            # exit 1 on >25 % regressions
+    python -m benchmarks.suite --save             # write benchmarks/baseline.json
+    python -m benchmarks.suite -k cycle --check --tolerance 40
+
+Baselines are only comparable on the machine (and Python) that wrote
+them; re-save after changing either.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import fnmatch
+import gc
+import json
+import platform
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+from aiohttp import web
+
+from benchmarks import payloads
+from custom_components.iett.attributes import build_attributes
+from custom_components.iett.cache import ResponseCache
+from custom_components.iett.const import (
+    ATTRIBUTE_MODE_FULL,
+    ATTRIBUTE_MODE_SUMMARY,
+    ATTRIBUTE_MODE_TOP_N,
+    CONF_ATTRIBUTE_MODE,
+    DATA_CACHE,
+    DATA_CLIENTS,
+    FEED_ALL_FLEET,
+    FEED_ROUTE_FLEET,
+    FEED_ROUTE_SCHEDULE,
+    FEED_STOP_ARRIVALS,
+)
+from custom_components.iett.coordinator import IettCoordinator
+from custom_components.iett.decode import decoder, json_loads
+from custom_components.iett.fleet import FleetSnapshot
+from custom_components.iett.models import Arrival, BusPosition, ScheduledDeparture
+from custom_components.iett.schedule import ScheduleIndex
+from custom_components.iett.sensor import IettSensor, _state_value
+
+BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_TOLERANCE = 25.0  # percent
+# Slowdowns smaller than this are timer noise, whatever the percentage.
+NOISE_FLOOR_MS = 0.01
+
+FLEET_SIZES = (1000, 7000, 50000)
+SCHEDULE_SIZE = 5000
+ARRIVAL_STOPS = 50
+
+Bench = Callable[[], Any] | Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class Case:
+    name: str
+    run: Bench
+    is_async: bool = False
+
+
+def _hass() -> MagicMock:
+    hass = MagicMock()
+    hass.data = {DATA_CACHE: ResponseCache()}
+    hass.is_stopping = False
+    return hass
+
+
+def _entry_data(feed_type: str, url: str, **extra: Any) -> dict[str, Any]:
+    return {"feed_type": feed_type, "middle_url": url, "hat_kodu": "500T", **extra}
+
+
+def _size(n: int) -> str:
+    return f"{n // 1000}k" if n >= 1000 else str(n)
+
+
+# ── Pure cases ──────────────────────────────────────────────────────────────
+
+def _pure_cases() -> Iterator[Case]:
+    bus_positions = decoder(BusPosition).many
+    for n in FLEET_SIZES:
+        items = payloads.fleet(n)
+        body = json.dumps(items).encode()
+        buses = [BusPosition(**i) for i in items]
+        snap = FleetSnapshot.from_positions(buses)
+        yield Case(
+            f"decode.bus_position[{_size(n)}]", lambda b=body: bus_positions(json_loads(b))
+        )
+        yield Case(f"state_value.fleet[{_size(n)}]", lambda s=snap: _state_value(FEED_ALL_FLEET, s))
+        yield Case(
+            f"attributes.summary[{_size(n)}]",
+            lambda s=snap: build_attributes(FEED_ALL_FLEET, s, ATTRIBUTE_MODE_SUMMARY, 50),
+        )
+        yield Case(
+            f"attributes.full[{_size(n)}]",
+            lambda s=snap: build_attributes(FEED_ROUTE_FLEET, s, ATTRIBUTE_MODE_FULL, 50),
+        )
+        yield Case(
+            f"attributes.top_n[{_size(n)}]",
+            lambda s=snap: build_attributes(FEED_ROUTE_FLEET, s, ATTRIBUTE_MODE_TOP_N, 50),
+        )
+
+    rows = payloads.schedule(SCHEDULE_SIZE)
+    rows_body = json.dumps(rows).encode()
+    departures = [ScheduledDeparture(**r) for r in rows]
+    index = ScheduleIndex(departures)
+    size = _size(SCHEDULE_SIZE)
+    yield Case(f"decode.schedule[{size}]", lambda: decoder(ScheduledDeparture).many(json_loads(rows_body)))
+    yield Case(f"schedule.index[{size}]", lambda: ScheduleIndex(departures))
+    yield Case(
+        f"state_value.schedule[{size}]",
+        lambda: _state_value(FEED_ROUTE_SCHEDULE, departures, index),
+    )
+    yield Case(
+        f"attributes.full.schedule[{size}]",
+        lambda: build_attributes(FEED_ROUTE_SCHEDULE, departures, ATTRIBUTE_MODE_FULL, 50),
+    )
+
+    body = payloads.arrivals(payloads.stop_codes(ARRIVAL_STOPS), per_stop=40)
+    bulk = json.dumps(body).encode()
+    stop = [Arrival(**a) for a in next(iter(body.values()))]
+    arrivals = decoder(Arrival).many
+    yield Case(
+        f"decode.arrivals[{ARRIVAL_STOPS}x40]",
+        lambda: {d: arrivals(items) for d, items in json_loads(bulk).items()},
+    )
+    yield Case("state_value.arrivals[40]", lambda: _state_value(FEED_STOP_ARRIVALS, stop))
+
+
+# ── Cases against a local iett-middle stand-in ──────────────────────────────
+
+class _Server:
+    """Serves synthetic payloads for the coordinator cycles."""
+
+    def __init__(self) -> None:
+        self.fleet = b"[]"
+        self.schedule = json.dumps(payloads.schedule(SCHEDULE_SIZE), ensure_ascii=False).encode()
+        self.stops = payloads.stop_codes(ARRIVAL_STOPS)
+        self.arrivals = json.dumps(payloads.arrivals(self.stops), ensure_ascii=False).encode()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/fleet", self._body("fleet"))
+        app.router.add_get("/v1/stops/arrivals", self._body("arrivals"))
+        app.router.add_get("/v1/routes/{hat}/schedule", self._body("schedule"))
+        return app
+
+    def _body(self, name: str) -> Callable[[web.Request], Awaitable[web.Response]]:
+        async def handler(_request: web.Request) -> web.Response:
+            return web.Response(body=getattr(self, name), content_type="application/json")
+
+        return handler
+
+
+@asynccontextmanager
+async def _serve(server: _Server) -> Any:
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+def _subscribe(coord: IettCoordinator) -> None:
+    coord.async_add_listener(lambda: None)
+    hub = coord._hub  # noqa: SLF001
+    # No event loop timers under a mock hass; cycles are driven by hand.
+    for obj in (coord, hub):
+        if obj is not None:
+            obj._schedule_refresh = lambda: None  # type: ignore[method-assign]  # noqa: SLF001
+
+
+def _cycle_cases(hass: MagicMock, server: _Server, url: str) -> Iterator[Case]:
+    for n in FLEET_SIZES:
+        body = json.dumps(payloads.fleet(n), ensure_ascii=False).encode()
+        fleet = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET, url))
+        route = IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET, url))
+        _subscribe(fleet)
+        _subscribe(route)
+        hub = fleet._hub  # noqa: SLF001
+        assert hub is not None
+
+        async def cycle(body: bytes = body, hub: Any = hub) -> None:
+            # A new body object each time: the full fleet is re-downloaded,
+            # decoded, diffed and fanned out to both entries.
+            server.fleet = body
+            hub.store._full = None  # noqa: SLF001
+            await hub.async_refresh()
+
+        yield Case(f"cycle.fleet[{_size(n)}]", cycle, is_async=True)
+
+    coords = [
+        IettCoordinator(hass, _entry_data(FEED_STOP_ARRIVALS, url, dcode=d)) for d in server.stops
+    ]
+    for coord in coords:
+        _subscribe(coord)
+    arrivals_hub = coords[0]._hub  # noqa: SLF001
+    assert arrivals_hub is not None
+    yield Case(f"cycle.arrivals[{ARRIVAL_STOPS}]", arrivals_hub.async_refresh, is_async=True)
+
+    schedule = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE, url))
+    _subscribe(schedule)
+
+    async def schedule_cycle() -> None:
+        # Served from the response cache after the first round, as in HA. A
+        # full refresh, so the held data is seen as unchanged and not
+        # re-indexed.
+        await schedule.async_refresh()
+
+    yield Case(f"cycle.schedule.cached[{_size(SCHEDULE_SIZE)}]", schedule_cycle, is_async=True)
+
+
+def _sensor_cases(hass: MagicMock, url: str) -> Iterator[Case]:
+    for feed_type, mode in ((FEED_ALL_FLEET, ATTRIBUTE_MODE_SUMMARY), (FEED_ROUTE_FLEET, ATTRIBUTE_MODE_FULL)):
+        coord = IettCoordinator(hass, _entry_data(feed_type, url))
+        entry = MagicMock(options={CONF_ATTRIBUTE_MODE: mode}, title="bench", unique_id=None)
+        entry.entry_id = f"bench-{feed_type}"
+        for n in (1000, 7000):
+            coord.data = FleetSnapshot.from_positions(BusPosition(**i) for i in payloads.fleet(n))
+            sensor = IettSensor(coord, entry)
+            yield Case(
+                f"sensor.refresh_attributes.{mode}[{_size(n)}]",
+                sensor._refresh_attributes,  # noqa: SLF001
+            )
+
+
+# ── Runner ──────────────────────────────────────────────────────────────────
+
+async def _time(case: Case, rounds: int, budget: float) -> float:
+    """Best per-call time in ms, calibrating calls per round to *budget* seconds."""
+    async def call() -> None:
+        result = case.run()
+        if case.is_async:
+            await result  # type: ignore[misc]
+
+    start = time.perf_counter()
+    await call()
+    first = time.perf_counter() - start
+    number = max(1, min(10_000, int(budget / max(first, 1e-7))))
+    best = float("inf")
+    for _ in range(rounds):
+        # Collect between rounds, not inside them, so one case's garbage
+        # is not billed to another.
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(number):
+                await call()
+            best = min(best, (time.perf_counter() - start) / number)
+        finally:
+            gc.enable()
+    return best * 1000
+
+
+async def _run(pattern: str, rounds: int, budget: float) -> dict[str, float]:
+    results: dict[str, float] = {}
+
+    async def measure(cases: Iterator[Case]) -> None:
+        for case in cases:
+            if fnmatch.fnmatch(case.name, pattern):
+                results[case.name] = await _time(case, rounds, budget)
+                print(f"{case.name:<42} {results[case.name]:>10.3f} ms", flush=True)
+
+    await measure(_pure_cases())
+    server = _Server()
+    hass = _hass()
+    async with _serve(server) as url:
+        try:
+            await measure(_cycle_cases(hass, server, url))
+            await measure(_sensor_cases(hass, url))
+        finally:
+            for client in hass.data.get(DATA_CLIENTS, {}).values():
+                await client.close()
+    return results
+
+
+def _check(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """Cases slower than *baseline* by more than *tolerance* percent."""
+    failures = []
+    for name, ms in sorted(results.items()):
+        if (base := baseline.get(name)) is None:
+            continue
+        change = (ms / base - 1) * 100
+        if change > tolerance and ms - base > NOISE_FLOOR_MS:
+            failures.append(f"{name}: {base:.3f} → {ms:.3f} ms (+{change:.0f} %)")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-k", "--filter", default="*", help="fnmatch pattern on case names")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--budget", type=float, default=0.05, help="seconds per round")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write results as the baseline")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="percent")
+    args = parser.parse_args()
+
+    pattern = args.filter if any(c in args.filter for c in "*?[") else f"*{args.filter}*"
+    results = asyncio.run(_run(pattern, args.rounds, args.budget))
+
+    if args.check:
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures = _check(results, stored["cases"], args.tolerance)
+        if failures:
+            print(f"\n{len(failures)} regression(s) over {args.tolerance:g} %:")
+            print("\n".join(f"  {line}" for line in failures))
+            sys.exit(1)
+        print(f"\nNo regressions over {args.tolerance:g} % against {args.baseline.name}.")
+    if args.save:
+        cases = results
+        if args.filter != "*" and args.baseline.exists():
+            cases = {**json.loads(args.baseline.read_text(encoding="utf-8"))["cases"], **results}
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cases": dict(sorted(cases.items())),
+                },
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"Saved {len(results)} case(s) to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,59 @@
 """IETT integration — setup and teardown."""
 from __future__ import annotations
 
+import time
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
-from .coordinator import IettCoordinator
+from .const import CONF_FAST_START, CONF_MIDDLE_URL, DEFAULT_FAST_START, DOMAIN
+from .coordinator import (
+    IettCoordinator,
+    async_release_shared,
+    async_remove_snapshot,
+    create_coordinator,
+)
 
 PLATFORMS = ["sensor"]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    started = time.monotonic()
     hass.data.setdefault(DOMAIN, {})
-    coordinator = IettCoordinator(hass, dict(entry.data))
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = create_coordinator(hass, dict(entry.data), dict(entry.options))
+    fast_start = entry.options.get(CONF_FAST_START, DEFAULT_FAST_START)
+    if fast_start:
+        # Entities come up on the last saved data (or unavailable) and the
+        # first fetch runs in the background instead of holding up startup.
+        await coordinator.async_restore_snapshot()
+    else:
+        await coordinator.async_config_entry_first_refresh()
+        coordinator.startup_time = time.monotonic() - started
     hass.data[DOMAIN][entry.entry_id] = coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+    if fast_start:
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_startup_refresh(started),
+            f"{DOMAIN} first refresh {entry.entry_id}",
+        )
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: IettCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+        await async_release_shared(hass, entry.data[CONF_MIDDLE_URL])
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the entry's saved snapshot and seen announcements."""
+    await async_remove_snapshot(hass, entry.entry_id)
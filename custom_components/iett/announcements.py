@@ -0,0 +1,112 @@
+"""Announcement change tracking: what was added, edited or withdrawn.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from .models import Announcement
+
+_LOGGER = logging.getLogger(__name__)
+
+ADDED = "added"
+UPDATED = "updated"
+REMOVED = "removed"
+
+
+def announcement_key(item: Announcement) -> str:
+    """Stable identity of an announcement's content.
+
+    A digest of ``type``, ``message`` and ``updated_at`` rather than
+    :func:`hash`, whose string hashing is salted per process and so could
+    not be compared with keys saved before a restart.
+    """
+    raw = "\x1f".join((item.type, item.message, item.updated_at)).encode()
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class AnnouncementChange:
+    """One difference between two announcement lists."""
+
+    kind: str  # ADDED, UPDATED or REMOVED
+    key: str
+    announcement: Announcement
+    previous: Announcement | None = None  # the replaced version, for UPDATED
+    previous_key: str | None = None
+
+
+class AnnouncementTracker:
+    """Announcements seen so far, keyed by :func:`announcement_key`.
+
+    :meth:`update` diffs a freshly fetched list against the seen set and
+    returns the changes. Since the key covers the text and timestamp, an
+    edited announcement shows up as one key vanishing and another
+    appearing; those are paired into an ``updated`` change when both carry
+    the same route and type, and reported as ``removed`` plus ``added``
+    otherwise.
+
+    The first list a tracker sees with nothing loaded (see :meth:`load`)
+    only sets the baseline, so a new entry does not announce every alert
+    already in force.
+    """
+
+    def __init__(self) -> None:
+        self.seen: dict[str, Announcement] = {}
+        self.primed = False
+
+    def __len__(self) -> int:
+        return len(self.seen)
+
+    def update(self, items: Iterable[Announcement]) -> list[AnnouncementChange]:
+        current = {announcement_key(item): item for item in items}
+        if not self.primed:
+            self.seen, self.primed = current, True
+            return []
+        gone = [key for key in self.seen if key not in current]
+        new = [key for key in current if key not in self.seen]
+        if not gone and not new:
+            return []
+
+        changes: list[AnnouncementChange] = []
+        vanished: dict[tuple[str, str], list[str]] = {}
+        for key in gone:
+            old = self.seen[key]
+            vanished.setdefault((old.route_code, old.type), []).append(key)
+        for key in new:
+            item = current[key]
+            if candidates := vanished.get((item.route_code, item.type)):
+                old_key = candidates.pop(0)
+                changes.append(
+                    AnnouncementChange(UPDATED, key, item, self.seen[old_key], old_key)
+                )
+            else:
+                changes.append(AnnouncementChange(ADDED, key, item))
+        for keys in vanished.values():
+            changes.extend(AnnouncementChange(REMOVED, key, self.seen[key]) for key in keys)
+        self.seen = current
+        return changes
+
+    def dump(self) -> dict[str, Any]:
+        return {"seen": {key: item.as_dict() for key, item in self.seen.items()}}
+
+    def load(self, stored: dict[str, Any] | None) -> None:
+        """Restore the seen set saved by :meth:`dump`, if there is one.
+
+        Rows that no longer fit the model are dropped, so at worst their
+        announcements are reported as added again.
+        """
+        if not stored:
+            return
+        seen: dict[str, Announcement] = {}
+        for key, row in (stored.get("seen") or {}).items():
+            try:
+                seen[key] = Announcement(**row)
+            except TypeError:
+                _LOGGER.debug("Dropping unreadable saved announcement %s", key)
+        self.seen, self.primed = seen, True
@@ -0,0 +1,109 @@
+"""Sensor attribute builders: full item lists, top-N slices or summaries.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from itertools import islice
+from typing import Any
+
+from .const import (
+    ARRIVAL_FEEDS,
+    ATTRIBUTE_MODE_FULL,
+    ATTRIBUTE_MODE_TOP_N,
+    DATA_KEY,
+    FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ROUTE_SCHEDULE,
+    FEED_STOP_BOARD,
+    FLEET_FEEDS,
+)
+from .fleet import FleetSnapshot
+
+
+def build_attributes(
+    feed_type: str, data: Any, mode: str, limit: int
+) -> dict[str, Any]:
+    """Extra state attributes for *data* under attribute *mode*."""
+    data_key = DATA_KEY[feed_type]
+    attrs: dict[str, Any] = {"feed_type": feed_type}
+    if mode == ATTRIBUTE_MODE_FULL:
+        attrs[data_key] = [item.as_dict() for item in data]
+    elif mode == ATTRIBUTE_MODE_TOP_N:
+        attrs[data_key] = [item.as_dict() for item in top_items(feed_type, data, limit)]
+        attrs["truncated"] = len(data) > limit
+    else:
+        attrs["summary"] = summarize(feed_type, data)
+    attrs["count"] = len(data)
+    return attrs
+
+
+def top_items(feed_type: str, data: Any, limit: int) -> list[Any]:
+    """The *limit* most relevant items: soonest arrivals, otherwise feed order."""
+    if feed_type in ARRIVAL_FEEDS:
+        return heapq.nsmallest(
+            limit,
+            data,
+            key=lambda a: (a.eta_minutes is None, a.eta_minutes or 0),
+        )
+    return list(islice(data, limit))
+
+
+def page_items(data: Any, offset: int, limit: int) -> list[dict[str, Any]]:
+    """Items ``offset … offset+limit`` as dicts, for the paging service."""
+    return [item.as_dict() for item in islice(data, offset, offset + limit)]
+
+
+def summarize(feed_type: str, data: Any) -> dict[str, Any]:
+    """A bounded-size digest of *data*."""
+    if feed_type in FLEET_FEEDS:
+        return _fleet_summary(data)
+    if feed_type in ARRIVAL_FEEDS:
+        summary = {"next_by_route": _next_eta(data, lambda a: a.route_code)}
+        if feed_type == FEED_STOP_BOARD:
+            summary["next_by_stop"] = _next_eta(data, lambda d: d.dcode)
+        return summary
+    if feed_type == FEED_ROUTE_SCHEDULE:
+        times = sorted(d.departure_time for d in data)
+        return {
+            "by_day_type": dict(Counter(d.day_type for d in data)),
+            "by_direction": dict(Counter(d.direction for d in data)),
+            "first": times[0] if times else None,
+            "last": times[-1] if times else None,
+        }
+    if feed_type == FEED_ROUTE_ANNOUNCEMENTS:
+        return {"by_type": dict(Counter(a.type for a in data))}
+    return {}
+
+
+def _next_eta(data: Any, key: Any) -> dict[str, int]:
+    """Soonest known ETA per ``key(item)``, sorted by key."""
+    best: dict[str, int] = {}
+    for item in data:
+        if (eta := item.eta_minutes) is None:
+            continue
+        k = key(item)
+        if k not in best or eta < best[k]:
+            best[k] = eta
+    return dict(sorted(best.items()))
+
+
+def _fleet_summary(data: Any) -> dict[str, Any]:
+    snap = data if isinstance(data, FleetSnapshot) else FleetSnapshot.from_positions(data)
+    values = snap.strings.values
+    by_route = Counter(snap.route_code)
+    by_operator = Counter(snap.operator)
+    by_route.pop(0, None)
+    by_operator.pop(0, None)
+    bbox = (
+        [min(snap.latitude), min(snap.longitude), max(snap.latitude), max(snap.longitude)]
+        if len(snap)
+        else None
+    )
+    return {
+        "by_route": dict(sorted((values[c], n) for c, n in by_route.items())),
+        "by_operator": {values[c]: n for c, n in by_operator.most_common()},
+        "moving": sum(1 for speed in snap.speed if speed),
+        "bbox": bbox,
+    }
@@ -0,0 +1,85 @@
+"""Departure boards: arrivals at several stops merged into one list.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from .fleet import route_key
+from .models import Arrival
+
+# ``DCODE[@VIA][:ROUTE,ROUTE…]``, e.g. ``220602@301341:500T,34``.
+_SPEC = re.compile(r"^\s*([^@:\s]+)\s*(?:@\s*([^@:\s]+)\s*)?(?::\s*(.*?)\s*)?$")
+
+
+@dataclass(frozen=True, slots=True)
+class BoardStop:
+    """One stop on a board: its code, optional via stop and route filter."""
+
+    dcode: str
+    via: str | None = None
+    routes: frozenset[str] = frozenset()  # route_key() codes; empty keeps all
+
+    @classmethod
+    def parse(cls, spec: str) -> BoardStop:
+        """Read ``DCODE[@VIA][:ROUTE,ROUTE…]``; raise ``ValueError`` if malformed."""
+        if (match := _SPEC.match(spec)) is None:
+            raise ValueError(f"Invalid board stop {spec!r}")
+        dcode, via, routes = match.groups()
+        keys = {route_key(r) for r in (routes or "").split(",")}
+        keys.discard(None)
+        keys.discard("")
+        if routes is not None and not keys:
+            raise ValueError(f"Empty route filter in {spec!r}")
+        return cls(dcode, via, frozenset(keys))  # type: ignore[arg-type]
+
+    @classmethod
+    def from_config(cls, data: dict[str, Any]) -> BoardStop:
+        return cls(data["dcode"], data.get("via"), frozenset(data.get("routes") or ()))
+
+    def as_config(self) -> dict[str, Any]:
+        return {"dcode": self.dcode, "via": self.via, "routes": sorted(self.routes)}
+
+    def __str__(self) -> str:
+        spec = self.dcode
+        if self.via:
+            spec += f"@{self.via}"
+        if self.routes:
+            spec += ":" + ",".join(sorted(self.routes))
+        return spec
+
+    def wants(self, route_code: str) -> bool:
+        return not self.routes or route_key(route_code) in self.routes
+
+
+@dataclass(slots=True)
+class BoardDeparture:
+    """One arrival on a board, tagged with the stop it is expected at."""
+
+    dcode: str
+    route_code: str
+    destination: str
+    eta_raw: str
+    eta_minutes: int | None = None
+    via: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def merge(results: Iterable[tuple[BoardStop, list[Arrival]]]) -> list[BoardDeparture]:
+    """Each stop's wanted arrivals as one list, soonest first (unknown ETAs last)."""
+    board = [
+        BoardDeparture(
+            stop.dcode, a.route_code, a.destination, a.eta_raw, a.eta_minutes, stop.via
+        )
+        for stop, arrivals in results
+        for a in arrivals
+        if stop.wants(a.route_code)
+    ]
+    board.sort(key=lambda d: (d.eta_minutes is None, d.eta_minutes or 0, d.route_code, d.dcode))
+    return board
@@ -0,0 +1,92 @@
+"""Route bundles: a line's fleet, schedule and announcements as one payload.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any
+
+from .const import (
+    BUNDLE_PARTS,
+    FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ROUTE_FLEET,
+    FEED_ROUTE_SCHEDULE,
+)
+from .fleet import FleetSnapshot
+from .models import Announcement, ScheduledDeparture, fingerprint
+
+_FIELD_FOR_PART = {
+    FEED_ROUTE_FLEET: "fleet",
+    FEED_ROUTE_SCHEDULE: "schedule",
+    FEED_ROUTE_ANNOUNCEMENTS: "announcements",
+}
+
+
+def part_fingerprint(data: Any) -> int:
+    """Content hash of one part; ``0`` while the part is not loaded."""
+    if data is None:
+        return 0
+    if isinstance(data, FleetSnapshot):
+        return data.fingerprint()
+    return fingerprint(data)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class RouteBundle:
+    """Everything known about one route, each part ``None`` until loaded.
+
+    *failed* names the parts whose last fetch failed; their data is the
+    last that loaded. Bundles are immutable and compare by identity:
+    :meth:`with_parts` returns a new one only when something changed, and
+    it shares every part whose content did not, so readers can tell an
+    unchanged part by identity too.
+    """
+
+    hat_kodu: str
+    fleet: FleetSnapshot | None = None
+    schedule: list[ScheduledDeparture] | None = None
+    announcements: list[Announcement] | None = None
+    failed: frozenset[str] = frozenset()
+
+    def part(self, name: str) -> Any:
+        return getattr(self, _FIELD_FOR_PART[name])
+
+    def with_parts(
+        self, parts: dict[str, Any], failed: frozenset[str] | None = None
+    ) -> RouteBundle:
+        """This bundle with *parts* (``{part: data}``) and *failed* swapped in."""
+        changes: dict[str, Any] = {
+            _FIELD_FOR_PART[name]: data
+            for name, data in parts.items()
+            if data is not (old := self.part(name))
+            and part_fingerprint(data) != part_fingerprint(old)
+        }
+        if failed is not None and failed != self.failed:
+            changes["failed"] = failed
+        return replace(self, **changes) if changes else self
+
+    def fingerprint(self) -> int:
+        return hash(
+            (
+                *(part_fingerprint(self.part(name)) for name in BUNDLE_PARTS),
+                tuple(sorted(self.failed)),
+            )
+        )
+
+    @property
+    def route_name(self) -> str | None:
+        """The line's display name, from whichever part carries one."""
+        for rows in (self.schedule, self.announcements):
+            for row in rows or ():
+                if row.route_name:
+                    return row.route_name
+        return None
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-ready form of the data; unloaded parts are ``None``."""
+        out: dict[str, Any] = {"hat_kodu": self.hat_kodu}
+        for name in BUNDLE_PARTS:
+            data = self.part(name)
+            out[name] = None if data is None else [item.as_dict() for item in data]
+        return out
@@ -0,0 +1,138 @@
+"""Persistent LRU cache of decoded iett-middle responses.
+
+Zero Home Assistant imports — the owner supplies the load/save callables
+(a ``homeassistant.helpers.storage.Store`` in the integration).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """A decoded JSON body plus what is needed to revalidate it."""
+
+    data: Any
+    fetched: float  # time.time() of the last 200 or 304
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def age(self) -> float:
+        return time.time() - self.fetched
+
+
+@dataclass
+class CacheStats:
+    """Counters exposed for monitoring."""
+
+    hits: int = 0  # served within TTL, no request made
+    stale_hits: int = 0  # served past TTL while revalidating in the background
+    misses: int = 0  # nothing cached, fetched in the foreground
+    evictions: int = 0  # least recently used entries dropped
+
+
+class ResponseCache:
+    """Decoded responses keyed by URL, least recently used evicted first.
+
+    ``load`` returns what an earlier :meth:`dump` produced (or ``None``) and
+    is awaited once, on first use. ``save`` is called with :meth:`dump`
+    after every change and is expected to debounce the actual write.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Awaitable[dict[str, Any] | None]] | None = None,
+        save: Callable[[Callable[[], dict[str, Any]]], None] | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self._load = load
+        self._save = save
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._loaded = load is None
+        self._load_lock = asyncio.Lock()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._entries
+
+    async def async_load(self) -> None:
+        """Read the persisted entries; later calls return immediately.
+
+        Rows that no longer fit :class:`CachedResponse` are skipped, so they
+        are simply fetched again.
+        """
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            assert self._load is not None
+            try:
+                stored = await self._load()
+                for url, raw in (stored or {}).get("entries", []):
+                    try:
+                        self._entries[url] = CachedResponse(**raw)
+                    except (TypeError, ValueError):
+                        _LOGGER.debug("Dropping unreadable cached %s", url)
+            except Exception:  # noqa: BLE001 — a broken cache must not block setup
+                _LOGGER.warning("Discarding unreadable iett-middle cache", exc_info=True)
+            finally:
+                self._loaded = True
+
+    def get(self, url: str) -> CachedResponse | None:
+        if (entry := self._entries.get(url)) is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def put(self, url: str, entry: CachedResponse) -> None:
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        self._changed()
+
+    def refresh(self, url: str) -> None:
+        """Mark *url* as just revalidated (a 304)."""
+        if (entry := self._entries.get(url)) is not None:
+            entry.fetched = time.time()
+            self._changed()
+
+    def discard(self, url: str) -> None:
+        if self._entries.pop(url, None) is not None:
+            self._changed()
+
+    def dump(self) -> dict[str, Any]:
+        """Serialisable snapshot, oldest use first so order survives a reload."""
+        return {
+            "entries": [
+                [
+                    url,
+                    {
+                        "data": e.data,
+                        "fetched": e.fetched,
+                        "etag": e.etag,
+                        "last_modified": e.last_modified,
+                    },
+                ]
+                for url, e in self._entries.items()
+            ]
+        }
+
+    def _changed(self) -> None:
+        if self._save is not None:
+            self._save(self.dump)
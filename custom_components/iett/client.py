@@ -1,86 +1,884 @@
 """HTTP client for iett-middle REST API.
 
-Replaces all direct IETT SOAP/HTML calls with simple GET requests to the
-iett-middle backend. No parsing of IETT responses here — the middle-end
-handles everything.
+The middle-end does all the IETT parsing; this module turns its JSON into
+models and handles the transport around it: streaming decoding of large
+arrays, conditional requests and the persisted response cache, retries
+behind a circuit breaker, hedged and coalesced requests, and the
+server-sent event stream.
 
 Zero Home Assistant imports — fully testable with aioresponses.
 """
 from __future__ import annotations
 
+import asyncio
+import codecs
+import hashlib
+import json
 import logging
-from typing import Any
+import re
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, TypeVar
 
 import aiohttp
+from aiohttp import hdrs
+from aiohttp.compression_utils import HAS_BROTLI
 
-from .models import Announcement, Arrival, BusPosition, ScheduledDeparture
+from .cache import CachedResponse, ResponseCache
+from .decode import decoder, json_loads
+from .metrics import BUILD, BYTES, DECODE, LATENCY, Rolling, Timings
+from .models import Announcement, Arrival, BusPosition, FleetDelta, ScheduledDeparture
+from .push import (
+    FLEET_CHANNEL,
+    HEARTBEAT_TIMEOUT,
+    READY,
+    STOP_CHANNEL_PREFIX,
+    PushEvent,
+    SseParser,
+)
+from .resilience import (
+    CLOSED,
+    HEDGE_WINDOW,
+    CircuitBreaker,
+    RetryPolicy,
+    hedge_delay,
+    hedged,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+_STREAM_CHUNK = 64 * 1024
+
+# Brotli is only offered when a decoder (Brotli/brotlicffi) is installed.
+_ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+# Own connection pool per middle host: a few sockets kept warm between polls.
+_POOL_PER_HOST = 4
+_KEEPALIVE_SECONDS = 75.0
+_DNS_CACHE_SECONDS = 300
+
+# Connect and read timeouts per endpoint family. ``sock_read`` bounds the
+# gap between chunks, so a large fleet body may take longer overall as long
+# as it keeps flowing.
+_TIMEOUT_FLEET = aiohttp.ClientTimeout(total=60, connect=5, sock_read=15)
+_TIMEOUT_LIVE = aiohttp.ClientTimeout(total=15, connect=5, sock_read=10)
+_TIMEOUT_DEFAULT = aiohttp.ClientTimeout(total=30, connect=5, sock_read=20)
+# Event streams stay open indefinitely; only silence ends them.
+_TIMEOUT_STREAM = aiohttp.ClientTimeout(total=None, connect=5, sock_read=HEARTBEAT_TIMEOUT)
+
+# How long a persisted response is served without asking iett-middle again
+# (seconds). Past that it is still served, and revalidated in the background.
+_TTL_SCHEDULE = 6 * 3600
+_TTL_ROUTE_STOPS = 24 * 3600
+_TTL_STOP_DETAIL = 7 * 24 * 3600
+_TTL_GARAGES = 7 * 24 * 3600
+# How long a finished result is handed to further callers of the same URL
+# without a new request (seconds). Not used for the fleet and arrivals
+# endpoints, whose hubs already fetch once per cycle.
+_REUSE_ROUTE_BUSES = 2.0
+_REUSE_ANNOUNCEMENTS = 5.0
+_REUSE_NEARBY = 5.0
+# Reusable results kept before expired ones are swept.
+_REUSE_SWEEP_SIZE = 64
+# Statuses worth another attempt: overload and upstream trouble.
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Stop and route ids in paths, for grouping timings by endpoint.
+_PATH_ID = re.compile(r"/(routes|stops)/(?!arrivals$|nearby$)[^/]+")
+_JSON_WS = re.compile(r"[ \t\r\n]*")
+_JSON_SEP = re.compile(r"[ \t\r\n,]*")
+# What can follow a number's decodable prefix when a chunk cuts it ("-2500.",
+# "1e+"): raw_decode accepts the prefix, so such a value is not yet final.
+_NUMBER_TAIL = frozenset(".eE+-")
+# Where _JsonArrayScanner is in the body.
+_SCAN_START, _SCAN_ARRAY, _SCAN_OBJECT, _SCAN_END = range(4)
+
+
+def endpoint(path: str) -> str:
+    """Endpoint template of *path*: ``/v1/stops/220602/arrivals?via=1`` → ``/v1/stops/{id}/arrivals``."""
+    return _PATH_ID.sub(r"/\1/{id}", path.partition("?")[0])
+
+
+def _model(cls: type[_T]) -> Callable[[Any], _T | None]:
+    """Per-row parse for streamed arrays; ``None`` for a row that is skipped."""
+    return decoder(cls).one
+
+
+def _models(cls: type[_T]) -> Callable[[Any], list[_T]]:
+    return decoder(cls).many
+
+
+def _fleet_delta(
+    data: Any, buses: Callable[[Any], list[BusPosition]] | None = None
+) -> FleetDelta:
+    """A ``/v1/fleet?since=`` body (or fleet stream event) as a :class:`FleetDelta`.
+
+    *buses* turns the ``changed`` array into models; by default it decodes
+    JSON objects.
+    """
+    buses = buses or decoder(BusPosition).many
+    if isinstance(data, list):
+        return FleetDelta(None, True, buses(data), [])
+    return FleetDelta(
+        cursor=str(data["cursor"]),
+        reset=bool(data.get("reset")),
+        changed=buses(data.get("changed") or []),
+        removed=list(data.get("removed") or []),
+        checksum=data.get("checksum"),
+    )
+
+
+def _streamed_fleet_delta(data: Any) -> FleetDelta:
+    """A fleet delta whose ``changed`` buses were built while downloading."""
+    return _fleet_delta(data, list)
+
+
+@dataclass(frozen=True, slots=True)
+class _Rows:
+    """How to stream-decode an array body: *item* builds each row as it arrives.
+
+    A row *item* returns ``None`` for is skipped. With *member*, the body
+    may be an object holding the array under that name (see
+    :class:`_JsonArrayScanner`).
+    """
+
+    item: Callable[[Any], Any]
+    member: str | None = None
+
+
+class _JsonArrayScanner:
+    """Splits a top-level JSON array into decoded elements as text arrives.
+
+    Each element is handed to the C-accelerated ``raw_decode`` as soon as it
+    is complete, so neither the whole body nor the whole list of dicts has
+    to be held at once.
+
+    With *member*, the body may instead be an object whose *member* holds
+    the array, as in a fleet delta: that array's elements are streamed the
+    same way, and the object's other (small) members are decoded whole into
+    :attr:`members`.
+    """
+
+    def __init__(self, member: str | None = None) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._member = member
+        self._state = _SCAN_START
+        self.wrapped = False  # the body was an object, not a bare array
+        self.members: dict[str, Any] = {}
+        self.done = False
+
+    def feed(self, text: str, final: bool = False) -> list[Any]:
+        buf = self._buf + text
+        end_of_buf = len(buf)
+        pos = 0
+        items: list[Any] = []
+        raw_decode = self._decoder.raw_decode
+        while True:
+            state = self._state
+            if state == _SCAN_START:
+                pos = _JSON_WS.match(buf, pos).end()  # type: ignore[union-attr]
+                if pos >= end_of_buf:
+                    break
+                if buf[pos] == "[":
+                    self._state = _SCAN_ARRAY
+                elif buf[pos] == "{" and self._member is not None:
+                    self._state = _SCAN_OBJECT
+                    self.wrapped = True
+                else:
+                    raise ValueError("expected a JSON array")
+                pos += 1
+                continue
+            pos = _JSON_SEP.match(buf, pos).end()  # type: ignore[union-attr]
+            if pos >= end_of_buf:
+                break
+            if state == _SCAN_END:
+                raise ValueError("unexpected data after JSON array")
+            if state == _SCAN_ARRAY:
+                if buf[pos] == "]":
+                    self._state = _SCAN_OBJECT if self.wrapped else _SCAN_END
+                    self.done = not self.wrapped
+                    pos += 1
+                    continue
+                try:
+                    item, end = raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break  # element continues in the next chunk
+                if not final and _may_grow(buf, end):
+                    break  # a bare number could still be growing
+                items.append(item)
+                pos = end
+                continue
+            # _SCAN_OBJECT: between the members of the outer object.
+            if buf[pos] == "}":
+                self._state = _SCAN_END
+                self.done = True
+                pos += 1
+                continue
+            member = self._member_start(buf, pos, final)
+            if member is None:
+                break  # key or value continues in the next chunk
+            key, value_pos = member
+            if key == self._member and buf[value_pos] == "[":
+                self._state = _SCAN_ARRAY
+                pos = value_pos + 1
+                continue
+            try:
+                value, end = raw_decode(buf, value_pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            if not final and _may_grow(buf, end):
+                break
+            self.members[key] = value
+            pos = end
+        self._buf = buf[pos:]
+        if final and not self.done:
+            raise ValueError("truncated JSON array")
+        return items
+
+    def _member_start(self, buf: str, pos: int, final: bool) -> tuple[str, int] | None:
+        """Key at *pos* and where its value starts, or ``None`` if incomplete."""
+        try:
+            key, end = self._decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        if not isinstance(key, str):
+            raise ValueError("expected an object key")
+        colon = _JSON_WS.match(buf, end).end()  # type: ignore[union-attr]
+        value_pos = _JSON_WS.match(buf, colon + 1).end()  # type: ignore[union-attr]
+        if value_pos >= len(buf):
+            if final:
+                raise ValueError("truncated JSON object")
+            return None
+        if buf[colon] != ":":
+            raise ValueError("expected ':' after an object key")
+        return key, value_pos
+
+
+def _may_grow(buf: str, end: int) -> bool:
+    """Whether the value decoded up to *end* may continue in the next chunk."""
+    return len(buf) - end <= 2 and set(buf[end:]) <= _NUMBER_TAIL
+
+
+async def _iter_json_array(
+    chunks: AsyncIterable[bytes], scanner: _JsonArrayScanner | None = None
+) -> AsyncIterator[Any]:
+    """Yield the elements of a JSON array body while it downloads."""
+    scanner = scanner or _JsonArrayScanner()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in chunks:
+        for item in scanner.feed(utf8.decode(chunk)):
+            yield item
+    for item in scanner.feed(utf8.decode(b"", final=True), final=True):
+        yield item
+
+
+def _push_event(channel: str, data: str, event_id: str | None) -> PushEvent | None:
+    try:
+        payload = json_loads(data)
+        if channel == FLEET_CHANNEL:
+            payload = _fleet_delta(payload)
+        elif channel.startswith(STOP_CHANNEL_PREFIX):
+            payload = decoder(Arrival).many(payload)
+    except (ValueError, TypeError, KeyError):
+        _LOGGER.debug("Skipping unparseable %s event", channel, exc_info=True)
+        return None
+    return PushEvent(channel, payload, event_id)
+
 
 class IettMiddleError(Exception):
-    """Raised when an iett-middle API call fails."""
+    """Raised when an iett-middle API call fails.
+
+    ``status`` carries the HTTP status when the server answered with an error,
+    and is ``None`` for network failures and timeouts. ``retryable`` tells
+    transient failures (connection errors, timeouts, 429 and 5xx) from ones
+    another attempt would not fix; ``retry_after`` is the server's
+    ``Retry-After`` in seconds, when it sent one.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status: int | None = None,
+        *,
+        retryable: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class IettMiddleTimeout(IettMiddleError):
+    """The request timed out (connect, read or total)."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message, retryable=True)
+
+
+class IettMiddleUnavailable(IettMiddleError):
+    """Not sent: the middle server's circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message, retry_after=retry_after)
+
+
+def _retry_after(headers: Any) -> float | None:
+    """Seconds from a numeric ``Retry-After`` header; dates are ignored."""
+    try:
+        return max(float(headers[hdrs.RETRY_AFTER]), 0.0)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class _Validated:
+    """Validators and parsed result of the last full response for a URL."""
+
+    etag: str | None
+    last_modified: str | None
+    value: Any
+    digest: bytes | None = None  # of the raw body, for servers without validators
+
+
+@dataclass
+class ClientStats:
+    """Counters exposed for monitoring."""
+
+    not_modified: int = 0  # 304 answers served from the parsed cache
+    full_responses: int = 0  # bodies downloaded and decoded
+    unchanged_bodies: int = 0  # 200 bodies identical to the last, served as parsed
+    connections_created: int = 0  # new TCP connections (own session only)
+    connections_reused: int = 0  # requests served on a kept-alive connection
+    compressed_responses: int = 0  # bodies sent with a Content-Encoding
+    bytes_received: int = 0  # body bytes on the wire, where known
+    bytes_decoded: int = 0  # body bytes after decompression
+    retries: int = 0  # attempts repeated after a transient failure
+    short_circuited: int = 0  # requests refused while the breaker was open
+    hedged: int = 0  # second requests sent for a slow first one
+    coalesced: int = 0  # calls that joined an identical request in flight
+    reused: int = 0  # calls answered by a result finished moments ago
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes compression kept off the wire."""
+        return self.bytes_decoded - self.bytes_received
+
+
+def create_session(stats: ClientStats) -> aiohttp.ClientSession:
+    """A session with its own keep-alive pool, counting into *stats*."""
+
+    async def created(_s: Any, _ctx: SimpleNamespace, _params: Any) -> None:
+        stats.connections_created += 1
+
+    async def reused(_s: Any, _ctx: SimpleNamespace, _params: Any) -> None:
+        stats.connections_reused += 1
+
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_end.append(created)
+    trace.on_connection_reuseconn.append(reused)
+    connector = aiohttp.TCPConnector(
+        limit_per_host=_POOL_PER_HOST,
+        keepalive_timeout=_KEEPALIVE_SECONDS,
+        ttl_dns_cache=_DNS_CACHE_SECONDS,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        trace_configs=[trace],
+        headers={hdrs.ACCEPT_ENCODING: _ACCEPT_ENCODING},
+    )
 
 
 class IettMiddleClient:
-    """Simple REST client for iett-middle v1 API."""
+    """Client for the iett-middle v1 API, meant to be shared per middle URL."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession | None,
+        base_url: str,
+        cache: ResponseCache | None = None,
+        timings: Timings | None = None,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        """Use *session*, or with ``None`` open a :func:`create_session`.
 
-    def __init__(self, session: aiohttp.ClientSession, base_url: str) -> None:
-        self._session = session
+        An own session is meant to live as long as the middle URL is in use,
+        and is closed by :meth:`close`.
+        """
+        self.stats = ClientStats()
+        self.timings = timings if timings is not None else Timings()
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._owns_session = session is None
+        self._session = session if session is not None else create_session(self.stats)
         self._base = base_url.rstrip("/")
+        self._validated: dict[str, _Validated] = {}
+        self._cache = cache
+        self._revalidating: dict[str, asyncio.Task[Any]] = {}
+        self._hedge_latency: dict[str, Rolling] = {}
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        self._recent: dict[str, tuple[float, Any]] = {}
 
-    async def _get(self, path: str) -> Any:
+    async def close(self) -> None:
+        """Stop background revalidations and close the session if owned."""
+        for task in (*self._revalidating.values(), *self._inflight.values()):
+            task.cancel()
+        if self._owns_session:
+            await self._session.close()
+
+    async def _get(
+        self,
+        path: str,
+        parse: Callable[[Any], Any] | None = None,
+        conditional: bool = True,
+        stream: _Rows | None = None,
+        timeout: aiohttp.ClientTimeout = _TIMEOUT_DEFAULT,
+        ttl: float | None = None,
+        hedge: bool = False,
+        reuse: float = 0.0,
+    ) -> Any:
+        """GET *path*, sharing one request among concurrent callers.
+
+        A result that finished less than *reuse* seconds ago is handed out
+        again. With *ttl* and a :class:`ResponseCache`, see
+        :meth:`_get_cached`.
+        """
         url = f"{self._base}{path}"
+        if reuse and (recent := self._recent.get(url)) is not None:
+            if time.monotonic() - recent[0] < reuse:
+                self.stats.reused += 1
+                return recent[1]
+            del self._recent[url]
+        if (task := self._inflight.get(url)) is not None:
+            self.stats.coalesced += 1
+        else:
+            if ttl is not None and self._cache is not None:
+                fetch = self._get_cached(self._cache, url, parse, timeout, ttl)
+            else:
+                fetch = self._request(url, parse, conditional, stream, timeout, hedge=hedge)
+            task = self._inflight[url] = asyncio.get_running_loop().create_task(fetch)
+            task.add_done_callback(lambda t: self._landed(url, t, reuse))
+        # A caller giving up must not cancel the request for the others.
+        return await asyncio.shield(task)
+
+    def _landed(self, url: str, task: asyncio.Task[Any], reuse: float) -> None:
+        del self._inflight[url]
+        if task.cancelled() or task.exception() is not None or not reuse:
+            return
+        recent = self._recent
+        now = time.monotonic()
+        if len(recent) >= _REUSE_SWEEP_SIZE:
+            for stale in [u for u, (at, _) in recent.items() if now - at >= reuse]:
+                del recent[stale]
+        recent[url] = (now, task.result())
+
+    async def _get_cached(
+        self,
+        cache: ResponseCache,
+        url: str,
+        parse: Callable[[Any], Any] | None,
+        timeout: aiohttp.ClientTimeout,
+        ttl: float,
+    ) -> Any:
+        """Stale-while-revalidate for slow-changing endpoints.
+
+        A persisted copy is returned at once, and one older than *ttl* is
+        refreshed by a conditional request in the background.
+        """
+        await cache.async_load()
+        if (entry := cache.get(url)) is None:
+            cache.stats.misses += 1
+            return await self._request(url, parse, True, None, timeout, cache)
+        if (held := self._validated.get(url)) is None:
+            try:
+                value = parse(entry.data) if parse is not None else entry.data
+            except Exception:  # noqa: BLE001 — stale shape from an older build
+                _LOGGER.debug("Dropping unparseable cached %s", url, exc_info=True)
+                cache.discard(url)
+                cache.stats.misses += 1
+                return await self._request(url, parse, True, None, timeout, cache)
+            held = self._validated[url] = _Validated(entry.etag, entry.last_modified, value)
+        if entry.age() < ttl:
+            cache.stats.hits += 1
+        else:
+            cache.stats.stale_hits += 1
+            self._revalidate(cache, url, parse, timeout)
+        return held.value
+
+    def _revalidate(
+        self,
+        cache: ResponseCache,
+        url: str,
+        parse: Callable[[Any], Any] | None,
+        timeout: aiohttp.ClientTimeout,
+    ) -> None:
+        if url in self._revalidating:
+            return
+
+        def done(task: asyncio.Task[Any]) -> None:
+            self._revalidating.pop(url, None)
+            if not task.cancelled() and (err := task.exception()) is not None:
+                _LOGGER.debug("Background revalidation of %s failed: %s", url, err)
+
+        task = asyncio.get_running_loop().create_task(
+            self._request(url, parse, True, None, timeout, cache)
+        )
+        self._revalidating[url] = task
+        task.add_done_callback(done)
+
+    async def _request(
+        self,
+        url: str,
+        parse: Callable[[Any], Any] | None,
+        conditional: bool,
+        stream: _Rows | None,
+        timeout: aiohttp.ClientTimeout,
+        cache: ResponseCache | None = None,
+        hedge: bool = False,
+    ) -> Any:
+        """One logical GET: retried, gated by the breaker, optionally hedged.
+
+        Transient failures are retried per :attr:`retry` with jittered
+        backoff. Every attempt feeds :attr:`breaker`, one per client and so
+        per middle URL: once it opens, requests fail at once with
+        :class:`IettMiddleUnavailable` until a probe gets through.
+        """
+        retry, breaker = self.retry, self.breaker
+        started = time.monotonic()
+        retries = 0
+        while True:
+            if not breaker.allow():
+                self.stats.short_circuited += 1
+                wait = breaker.retry_after()
+                raise IettMiddleUnavailable(
+                    f"GET {url} not sent: iett-middle failing, retrying in {wait:.0f}s",
+                    wait,
+                )
+            try:
+                if hedge and breaker.state == CLOSED:
+                    value = await self._hedged(url, parse, conditional, stream, timeout, cache)
+                else:
+                    value = await self._attempt(url, parse, conditional, stream, timeout, cache)
+            except IettMiddleError as err:
+                if not err.retryable:
+                    breaker.success()  # the server answered
+                    raise
+                breaker.failure()
+                delay = retry.delay(retries, err.retry_after)
+                retries += 1
+                if (
+                    retries >= retry.attempts
+                    or time.monotonic() - started + delay > retry.budget
+                ):
+                    raise
+                self.stats.retries += 1
+                _LOGGER.debug("%s; retry %d in %.2fs", err, retries, delay)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.success()
+            return value
+
+    async def _hedged(
+        self,
+        url: str,
+        parse: Callable[[Any], Any] | None,
+        conditional: bool,
+        stream: _Rows | None,
+        timeout: aiohttp.ClientTimeout,
+        cache: ResponseCache | None,
+    ) -> Any:
+        """One attempt, plus a second copy if it is slow; the first answer wins.
+
+        Slow means slower than the endpoint's recent p95.
+        """
+        scope = endpoint(url[len(self._base):])
+        if (latency := self._hedge_latency.get(scope)) is None:
+            latency = self._hedge_latency[scope] = Rolling(HEDGE_WINDOW)
+        start = time.perf_counter()
+
+        def attempt() -> Awaitable[Any]:
+            return self._attempt(url, parse, conditional, stream, timeout, cache)
+
+        if (delay := hedge_delay(latency)) is None:
+            value = await attempt()
+        else:
+            value, sent = await hedged(attempt, delay)
+            self.stats.hedged += sent
+        latency.add(time.perf_counter() - start)
+        return value
+
+    async def _attempt(
+        self,
+        url: str,
+        parse: Callable[[Any], Any] | None,
+        conditional: bool,
+        stream: _Rows | None,
+        timeout: aiohttp.ClientTimeout,
+        cache: ResponseCache | None = None,
+    ) -> Any:
+        """One request for *url*, decoded and parsed.
+
+        Responses carrying an ``ETag`` or ``Last-Modified`` header are
+        remembered per URL, and the next request for it is conditional. A
+        304 returns the *same* parsed object as before, so callers can
+        detect "unchanged" by identity; so does a 200 whose body digest
+        matches the last one, for servers that send no validators.
+
+        With *stream*, models are built while the body downloads instead of
+        after the whole of it has been read. While :attr:`timings` is
+        enabled, latency, body size, decode and build time are recorded
+        under the :func:`endpoint` template.
+        """
+        cached = self._validated.get(url) if conditional else None
+        headers: dict[str, str] = {hdrs.ACCEPT_ENCODING: _ACCEPT_ENCODING}
+        if cached is not None:
+            if cached.etag:
+                headers[hdrs.IF_NONE_MATCH] = cached.etag
+            if cached.last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = cached.last_modified
+        timings = self.timings
+        timed = timings.enabled
+        scope = endpoint(url[len(self._base):]) if timed else ""
+        start = time.perf_counter() if timed else 0.0
         try:
-            async with self._session.get(
-                url, timeout=aiohttp.ClientTimeout(total=20)
-            ) as resp:
+            async with self._session.get(url, headers=headers, timeout=timeout) as resp:
+                if timed:
+                    now = time.perf_counter()
+                    timings.record(scope, LATENCY, (now - start) * 1000)
+                    start = now
+                if resp.status == 304 and cached is not None:
+                    self.stats.not_modified += 1
+                    if cache is not None:
+                        cache.refresh(url)
+                    return cached.value
                 resp.raise_for_status()
-                return await resp.json()  # type: ignore[return-value]
+                decoded = 0
+                body = hashlib.blake2b(digest_size=16)
+
+                async def chunks() -> AsyncIterator[bytes]:
+                    nonlocal decoded
+                    async for chunk in resp.content.iter_chunked(_STREAM_CHUNK):
+                        decoded += len(chunk)
+                        body.update(chunk)
+                        yield chunk
+
+                if stream is not None:
+                    scanner = _JsonArrayScanner(stream.member)
+                    build = stream.item
+                    data = [
+                        row
+                        async for item in _iter_json_array(chunks(), scanner)
+                        if (row := build(item)) is not None
+                    ]
+                    if scanner.wrapped:
+                        data = {**scanner.members, stream.member: data}
+                else:
+                    raw = b"".join([chunk async for chunk in chunks()])
+                digest = body.digest()
+                same = cached is not None and cached.digest == digest
+                if stream is None and not same:
+                    data = json_loads(raw)
+                if timed:
+                    now = time.perf_counter()
+                    timings.record(scope, DECODE, (now - start) * 1000)
+                    timings.record(scope, BYTES, decoded)
+                    start = now
+                self._count_bytes(resp, decoded)
+                etag = resp.headers.get(hdrs.ETAG)
+                last_modified = resp.headers.get(hdrs.LAST_MODIFIED)
+        except aiohttp.ClientResponseError as exc:
+            raise IettMiddleError(
+                f"GET {url} failed: {exc}",
+                exc.status,
+                retryable=exc.status in _RETRY_STATUSES,
+                retry_after=_retry_after(exc.headers),
+            ) from exc
+        except TimeoutError as exc:
+            raise IettMiddleTimeout(f"GET {url} timed out") from exc
+        except aiohttp.ClientError as exc:
+            raise IettMiddleError(f"GET {url} failed: {exc}", retryable=True) from exc
         except Exception as exc:
             raise IettMiddleError(f"GET {url} failed: {exc}") from exc
 
+        if same:
+            assert cached is not None
+            self.stats.unchanged_bodies += 1
+            if cache is not None:
+                cache.refresh(url)
+            return cached.value
+        self.stats.full_responses += 1
+        value = parse(data) if parse is not None else data
+        if timed:
+            timings.record(scope, BUILD, (time.perf_counter() - start) * 1000)
+        if cache is not None:
+            # Kept even without validators: it memoises the parse of the copy.
+            self._validated[url] = _Validated(etag, last_modified, value, digest)
+            cache.put(url, CachedResponse(data, time.time(), etag, last_modified))
+        elif conditional:
+            # Kept even without validators: the digest spots a repeated body.
+            self._validated[url] = _Validated(etag, last_modified, value, digest)
+        else:
+            self._validated.pop(url, None)
+        return value
+
+    def _count_bytes(self, resp: aiohttp.ClientResponse, decoded: int) -> None:
+        stats = self.stats
+        stats.bytes_decoded += decoded
+        if resp.headers.get(hdrs.CONTENT_ENCODING, "identity") == "identity":
+            stats.bytes_received += decoded
+            return
+        stats.compressed_responses += 1
+        # Chunked compressed bodies have no length; claim no saving for them.
+        wire = resp.content_length
+        stats.bytes_received += decoded if wire is None else wire
+
     # ── Fleet ──────────────────────────────────────────────────────────────
 
     async def get_all_buses(self) -> list[BusPosition]:
         """All active Istanbul buses (~7,000)."""
-        data = await self._get("/v1/fleet")
-        return [BusPosition(**item) for item in data]
+        return await self._get(  # type: ignore[no-any-return]
+            "/v1/fleet", stream=_Rows(_model(BusPosition)), timeout=_TIMEOUT_FLEET
+        )
+
+    async def get_fleet_delta(self, since: str | None) -> FleetDelta:
+        """Fleet changes since cursor *since*; ``None`` asks for a full reset.
+
+        The delta body is ``{"cursor", "reset", "changed", "removed",
+        "checksum"}``. A server without the delta protocol ignores ``since``
+        and sends the plain list, which comes back as a cursor-less reset.
+        A 410 means the cursor has expired and the caller must resync.
+
+        Full resyncs carry the whole fleet in ``changed``, so that array is
+        streamed into models as it downloads, like :meth:`get_all_buses`.
+        """
+        # Every cursor is a new URL, so validators would only pile up.
+        return await self._get(  # type: ignore[no-any-return]
+            f"/v1/fleet?since={since or 0}",
+            _streamed_fleet_delta,
+            conditional=False,
+            stream=_Rows(_model(BusPosition), "changed"),
+            timeout=_TIMEOUT_FLEET,
+        )
 
     async def get_route_buses(self, hat_kodu: str) -> list[BusPosition]:
         """Live positions of buses on a specific route."""
-        data = await self._get(f"/v1/routes/{hat_kodu}/buses")
-        return [BusPosition(**item) for item in data]
+        return await self._get(  # type: ignore[no-any-return]
+            f"/v1/routes/{hat_kodu}/buses",
+            stream=_Rows(_model(BusPosition)),
+            timeout=_TIMEOUT_LIVE,
+            reuse=_REUSE_ROUTE_BUSES,
+        )
 
     # ── Stops ──────────────────────────────────────────────────────────────
 
     async def get_stop_arrivals(
-        self, dcode: str, via: str | None = None
+        self, dcode: str, via: str | None = None, hedge: bool = False
     ) -> list[Arrival]:
-        """Real-time ETAs at a stop, optionally filtered by via stop."""
+        """Real-time ETAs at a stop, optionally filtered by via stop.
+
+        With *hedge*, a slow request is raced by a second copy.
+        """
         path = f"/v1/stops/{dcode}/arrivals"
         if via:
             path += f"?via={via}"
-        data = await self._get(path)
-        return [Arrival(**item) for item in data]
+        return await self._get(  # type: ignore[no-any-return]
+            path, _models(Arrival), timeout=_TIMEOUT_LIVE, hedge=hedge
+        )
+
+    async def get_stops_arrivals(
+        self, dcodes: Iterable[str], hedge: bool = False
+    ) -> dict[str, list[Arrival]]:
+        """Real-time ETAs for several stops in a single bulk request.
+
+        Older iett-middle builds lack the bulk endpoint and answer 404/405;
+        callers should fall back to :meth:`get_stop_arrivals` per stop.
+        *hedge* as for :meth:`get_stop_arrivals`.
+        """
+        codes = list(dcodes)
+        arrivals = decoder(Arrival).many
+
+        def parse(data: Any) -> dict[str, list[Arrival]]:
+            return {dcode: arrivals(data.get(dcode) or []) for dcode in codes}
+
+        return await self._get(  # type: ignore[no-any-return]
+            f"/v1/stops/arrivals?dcodes={','.join(codes)}",
+            parse,
+            timeout=_TIMEOUT_LIVE,
+            hedge=hedge,
+        )
 
     # ── Routes ─────────────────────────────────────────────────────────────
 
     async def get_route_schedule(self, hat_kodu: str) -> list[ScheduledDeparture]:
         """Planned departure schedule for a route."""
-        data = await self._get(f"/v1/routes/{hat_kodu}/schedule")
-        return [ScheduledDeparture(**item) for item in data]
+        return await self._get(  # type: ignore[no-any-return]
+            f"/v1/routes/{hat_kodu}/schedule", _models(ScheduledDeparture), ttl=_TTL_SCHEDULE
+        )
 
     async def get_announcements(self, hat_kodu: str) -> list[Announcement]:
         """Active service announcements/disruptions for a route."""
-        data = await self._get(f"/v1/routes/{hat_kodu}/announcements")
-        return [Announcement(**item) for item in data]
+        return await self._get(  # type: ignore[no-any-return]
+            f"/v1/routes/{hat_kodu}/announcements",
+            _models(Announcement),
+            reuse=_REUSE_ANNOUNCEMENTS,
+        )
+
+    # ── Push ───────────────────────────────────────────────────────────────
+
+    async def stream(
+        self, channels: Iterable[str], since: str | None = None
+    ) -> AsyncIterator[PushEvent]:
+        """Subscribe to server-sent events on *channels* (``/v1/stream``).
+
+        Yields a :data:`READY` event once the stream is open, then each
+        event parsed as its poll would be: a :class:`FleetDelta` (resuming
+        after fleet cursor *since*) for the fleet channel and a list of
+        :class:`Arrival` for stop channels. Events that fail to parse are
+        skipped. Iteration ends when the server closes the stream; failing
+        to open it, or :data:`HEARTBEAT_TIMEOUT` of silence, raises
+        :class:`IettMiddleError`. Streams bypass retries and the breaker:
+        :class:`PushLink` handles reconnects.
+        """
+        url = f"{self._base}/v1/stream?channels={','.join(sorted(channels))}"
+        if since:
+            url += f"&since={since}"
+        headers = {hdrs.ACCEPT: "text/event-stream"}
+        try:
+            async with self._session.get(url, headers=headers, timeout=_TIMEOUT_STREAM) as resp:
+                resp.raise_for_status()
+                yield PushEvent(READY, None)
+                parser = SseParser()
+                utf8 = codecs.getincrementaldecoder("utf-8")()
+                async for chunk in resp.content.iter_any():
+                    for channel, data, event_id in parser.feed(utf8.decode(chunk)):
+                        if (event := _push_event(channel, data, event_id)) is not None:
+                            yield event
+        except aiohttp.ClientResponseError as exc:
+            raise IettMiddleError(f"GET {url} failed: {exc}", exc.status) from exc
+        except TimeoutError as exc:
+            raise IettMiddleTimeout(f"GET {url} went silent") from exc
+        except aiohttp.ClientError as exc:
+            raise IettMiddleError(f"GET {url} failed: {exc}", retryable=True) from exc
 
     # ── Discovery ──────────────────────────────────────────────────────────
 
     async def get_stop_detail(self, dcode: str) -> dict[str, Any]:
         """Metadata for a single stop (name, coords, district)."""
-        data = await self._get(f"/v1/stops/{dcode}")
+        data = await self._get(f"/v1/stops/{dcode}", ttl=_TTL_STOP_DETAIL)
         # _get may return a single dict or a list — normalise to dict
         if isinstance(data, list):
             return data[0] if data else {}  # type: ignore[return-value]
@@ -90,15 +888,17 @@ class IettMiddleClient:
         self, lat: float, lon: float, radius: int = 500
     ) -> list[dict[str, Any]]:
         """Stops within *radius* metres of the given coordinates."""
-        data = await self._get(f"/v1/stops/nearby?lat={lat}&lon={lon}&radius={radius}")
+        data = await self._get(
+            f"/v1/stops/nearby?lat={lat}&lon={lon}&radius={radius}", reuse=_REUSE_NEARBY
+        )
         return data  # type: ignore[return-value]
 
     async def get_garages(self) -> list[dict[str, Any]]:
         """All IETT garages with coordinates."""
-        data = await self._get("/v1/garages")
+        data = await self._get("/v1/garages", ttl=_TTL_GARAGES)
         return data  # type: ignore[return-value]
 
     async def get_route_stops(self, hat_kodu: str) -> list[dict[str, Any]]:
         """Ordered stop list for a route."""
-        data = await self._get(f"/v1/routes/{hat_kodu}/stops")
+        data = await self._get(f"/v1/routes/{hat_kodu}/stops", ttl=_TTL_ROUTE_STOPS)
         return data  # type: ignore[return-value]
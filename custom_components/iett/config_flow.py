@@ -6,26 +6,70 @@ from typing import Any
 import aiohttp
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import callback
+from homeassistant.helpers import selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
+from .board import BoardStop
 from .const import (
+    ARRIVAL_FEEDS,
+    ATTRIBUTE_MODES,
+    CONF_ATTRIBUTE_LIMIT,
+    CONF_ATTRIBUTE_MODE,
+    CONF_FAST_START,
+    CONF_HEDGE,
     CONF_DCODE,
     CONF_FEED_TYPE,
     CONF_HAT_KODU,
     CONF_MIDDLE_URL,
+    CONF_POLL_CEILING,
+    CONF_POLL_FLOOR,
+    CONF_PUSH,
+    CONF_RADIUS,
+    CONF_STOPS,
+    CONF_ZONE,
+    DEFAULT_ATTRIBUTE_LIMIT,
+    DEFAULT_ATTRIBUTE_MODE,
+    DEFAULT_FAST_START,
+    DEFAULT_HEDGE,
     DEFAULT_MIDDLE_URL,
+    DEFAULT_POLL_CEILING,
+    DEFAULT_POLL_FLOOR,
+    DEFAULT_PUSH,
+    DEFAULT_ZONE,
     DOMAIN,
     FEED_ALL_FLEET,
     FEED_LABELS,
     FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ROUTE_BUNDLE,
     FEED_ROUTE_FLEET,
     FEED_ROUTE_SCHEDULE,
     FEED_STOP_ARRIVALS,
+    FEED_STOP_BOARD,
+    FEED_ZONE_FLEET,
+    MAX_ATTRIBUTE_LIMIT,
+    MAX_BOARD_STOPS,
+    MAX_POLL_SECONDS,
+    MAX_ZONE_RADIUS,
+    MIN_POLL_SECONDS,
+    PUSH_FEEDS,
 )
 
-_FEED_REQUIRES_HAT = {FEED_ROUTE_FLEET, FEED_ROUTE_SCHEDULE, FEED_ROUTE_ANNOUNCEMENTS}
+_FEED_REQUIRES_HAT = {
+    FEED_ROUTE_FLEET,
+    FEED_ROUTE_SCHEDULE,
+    FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ROUTE_BUNDLE,
+}
 _FEED_REQUIRES_DCODE = {FEED_STOP_ARRIVALS}
+_FEED_REQUIRES_ZONE = {FEED_ZONE_FLEET}
+_FEED_REQUIRES_STOPS = {FEED_STOP_BOARD}
 
 STEP_1_SCHEMA = vol.Schema(
     {
@@ -42,9 +86,40 @@ def _step2_schema(feed_type: str) -> vol.Schema:
         return vol.Schema({vol.Required(CONF_HAT_KODU): str})
     if feed_type in _FEED_REQUIRES_DCODE:
         return vol.Schema({vol.Required(CONF_DCODE): str})
+    if feed_type in _FEED_REQUIRES_ZONE:
+        return vol.Schema(
+            {
+                vol.Required(CONF_ZONE, default=DEFAULT_ZONE): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="zone")
+                ),
+                # 0 keeps the zone's own radius.
+                vol.Required(CONF_RADIUS, default=0): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=MAX_ZONE_RADIUS)
+                ),
+            }
+        )
+    if feed_type in _FEED_REQUIRES_STOPS:
+        return vol.Schema(
+            {
+                vol.Required(CONF_STOPS): selector.TextSelector(
+                    selector.TextSelectorConfig(multiple=True)
+                ),
+            }
+        )
     return vol.Schema({})
 
 
+def _board_stops(specs: list[str]) -> list[dict[str, Any]]:
+    """Parsed, de-duplicated board stops as stored in the entry.
+
+    Raises ``ValueError`` for a malformed spec, an empty list or too many stops.
+    """
+    stops = list(dict.fromkeys(BoardStop.parse(spec) for spec in specs if spec.strip()))
+    if not 0 < len(stops) <= MAX_BOARD_STOPS:
+        raise ValueError(f"A board needs 1–{MAX_BOARD_STOPS} stops, got {len(stops)}")
+    return [stop.as_config() for stop in stops]
+
+
 def _entry_title(data: dict[str, Any]) -> str:
     ft = data[CONF_FEED_TYPE]
     label = FEED_LABELS[ft]
@@ -52,9 +127,44 @@ def _entry_title(data: dict[str, Any]) -> str:
         return f"IETT — {data[CONF_HAT_KODU].upper()} {label.split('(')[0].strip()}"
     if ft in _FEED_REQUIRES_DCODE:
         return f"IETT — Stop {data[CONF_DCODE]} Arrivals"
+    if ft in _FEED_REQUIRES_STOPS:
+        codes = [stop["dcode"] for stop in data[CONF_STOPS]]
+        if len(codes) > 3:
+            return f"IETT — Departure Board ({len(codes)} stops)"
+        return f"IETT — Departure Board {', '.join(codes)}"
+    if ft in _FEED_REQUIRES_ZONE:
+        if data[CONF_RADIUS]:
+            return f"IETT — Buses within {data[CONF_RADIUS]} m of {data[CONF_ZONE]}"
+        return f"IETT — Buses in {data[CONF_ZONE]}"
     return f"IETT — {label}"
 
 
+_seconds = vol.All(vol.Coerce(int), vol.Range(min=MIN_POLL_SECONDS, max=MAX_POLL_SECONDS))
+
+
+def _options_schema(feed_type: str) -> vol.Schema:
+    schema = vol.Schema(
+        {
+            vol.Required(
+                CONF_ATTRIBUTE_MODE, default=DEFAULT_ATTRIBUTE_MODE[feed_type]
+            ): vol.In(ATTRIBUTE_MODES),
+            vol.Required(CONF_ATTRIBUTE_LIMIT, default=DEFAULT_ATTRIBUTE_LIMIT): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_ATTRIBUTE_LIMIT)
+            ),
+            vol.Required(CONF_POLL_FLOOR, default=DEFAULT_POLL_FLOOR[feed_type]): _seconds,
+            vol.Required(
+                CONF_POLL_CEILING, default=DEFAULT_POLL_CEILING[feed_type]
+            ): _seconds,
+            vol.Required(CONF_FAST_START, default=DEFAULT_FAST_START): bool,
+        }
+    )
+    if feed_type in ARRIVAL_FEEDS:
+        schema = schema.extend({vol.Required(CONF_HEDGE, default=DEFAULT_HEDGE): bool})
+    if feed_type in PUSH_FEEDS:
+        schema = schema.extend({vol.Required(CONF_PUSH, default=DEFAULT_PUSH): bool})
+    return schema
+
+
 class IettConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for IETT."""
 
@@ -63,6 +173,11 @@ class IettConfigFlow(ConfigFlow, domain=DOMAIN):
     def __init__(self) -> None:
         self._step1_data: dict[str, Any] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> IettOptionsFlow:
+        return IettOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -97,14 +212,49 @@ class IettConfigFlow(ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         ft = self._step1_data[CONF_FEED_TYPE]
+        errors: dict[str, str] = {}
         if user_input is not None:
-            return self._create_entry(user_input)
+            if ft in _FEED_REQUIRES_STOPS:
+                try:
+                    user_input = {CONF_STOPS: _board_stops(user_input[CONF_STOPS])}
+                except ValueError:
+                    errors[CONF_STOPS] = "invalid_stops"
+            if not errors:
+                return self._create_entry(user_input)
         return self.async_show_form(
             step_id="params",
             data_schema=_step2_schema(ft),
+            errors=errors,
         )
 
     def _create_entry(self, params: dict[str, Any]) -> ConfigFlowResult:
         data = {**self._step1_data, **params, "feed_type": self._step1_data[CONF_FEED_TYPE]}
         self._async_abort_entries_match({"feed_type": data["feed_type"], **params})
         return self.async_create_entry(title=_entry_title(data), data=data)
+
+
+class IettOptionsFlow(OptionsFlow):
+    """Per-entry tuning options."""
+
+    def __init__(self, config_entry: ConfigEntry) -> None:
+        # Held under our own name: cores before 2024.11 don't provide
+        # ``self.config_entry``, and later ones deprecate assigning it.
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_POLL_FLOOR] > user_input[CONF_POLL_CEILING]:
+                errors[CONF_POLL_FLOOR] = "floor_above_ceiling"
+            else:
+                return self.async_create_entry(data=user_input)
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                _options_schema(self._entry.data[CONF_FEED_TYPE]),
+                user_input or self._entry.options,
+            ),
+            errors=errors,
+        )
@@ -11,6 +11,9 @@ FEED_ROUTE_FLEET        = "route_fleet"
 FEED_STOP_ARRIVALS      = "stop_arrivals"
 FEED_ROUTE_SCHEDULE     = "route_schedule"
 FEED_ROUTE_ANNOUNCEMENTS = "route_announcements"
+FEED_ZONE_FLEET         = "zone_fleet"
+FEED_STOP_BOARD         = "stop_board"
+FEED_ROUTE_BUNDLE       = "route_bundle"
 
 FEED_TYPES = [
     FEED_ALL_FLEET,
@@ -18,8 +21,19 @@ FEED_TYPES = [
     FEED_STOP_ARRIVALS,
     FEED_ROUTE_SCHEDULE,
     FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ZONE_FLEET,
+    FEED_STOP_BOARD,
+    FEED_ROUTE_BUNDLE,
 ]
 
+# Feeds whose data is a FleetSnapshot read from the shared fleet poll.
+FLEET_FEEDS = (FEED_ALL_FLEET, FEED_ROUTE_FLEET, FEED_ZONE_FLEET)
+# Feeds whose items are real-time ETAs, soonest first.
+ARRIVAL_FEEDS = (FEED_STOP_ARRIVALS, FEED_STOP_BOARD)
+# What a route bundle holds: one sensor per part, each shown like the feed
+# of the same name.
+BUNDLE_PARTS = (FEED_ROUTE_FLEET, FEED_ROUTE_SCHEDULE, FEED_ROUTE_ANNOUNCEMENTS)
+
 # Human-readable labels for config flow UI
 FEED_LABELS: dict[str, str] = {
     FEED_ALL_FLEET:          "All Fleet (entire Istanbul)",
@@ -27,6 +41,9 @@ FEED_LABELS: dict[str, str] = {
     FEED_STOP_ARRIVALS:      "Arrivals at Stop (real-time ETAs)",
     FEED_ROUTE_SCHEDULE:     "Route Schedule (planned departures)",
     FEED_ROUTE_ANNOUNCEMENTS: "Route Announcements (disruption alerts)",
+    FEED_ZONE_FLEET:         "Buses in Zone (count near a zone)",
+    FEED_STOP_BOARD:         "Departure Board (several stops, real-time ETAs)",
+    FEED_ROUTE_BUNDLE:       "Route Bundle (fleet, schedule and announcements of a line)",
 }
 
 # Coordinator update intervals
@@ -36,6 +53,10 @@ UPDATE_INTERVALS: dict[str, timedelta] = {
     FEED_STOP_ARRIVALS:      timedelta(seconds=30),
     FEED_ROUTE_SCHEDULE:     timedelta(seconds=3600),
     FEED_ROUTE_ANNOUNCEMENTS: timedelta(seconds=300),
+    FEED_ZONE_FLEET:         timedelta(seconds=15),
+    FEED_STOP_BOARD:         timedelta(seconds=30),
+    # Fleet part; schedule and announcements keep their own feed's interval.
+    FEED_ROUTE_BUNDLE:       timedelta(seconds=15),
 }
 
 # ── Config entry keys ───────────────────────────────────────────────────────
@@ -43,16 +64,161 @@ CONF_MIDDLE_URL  = "middle_url"
 CONF_FEED_TYPE   = "feed_type"
 CONF_HAT_KODU    = "hat_kodu"
 CONF_DCODE       = "dcode"
+CONF_ZONE        = "zone"
+CONF_RADIUS      = "radius"
+CONF_STOPS       = "stops"
+
+DEFAULT_ZONE = "zone.home"
+# Zone feeds use the zone's own radius unless the entry sets one (metres).
+MAX_ZONE_RADIUS = 50_000
+# Stops on one departure board.
+MAX_BOARD_STOPS = 20
 
 DEFAULT_MIDDLE_URL = "http://localhost:8000"
 
+# ── Options ─────────────────────────────────────────────────────────────────
+CONF_ATTRIBUTE_MODE  = "attribute_mode"
+CONF_ATTRIBUTE_LIMIT = "attribute_limit"
+
+ATTRIBUTE_MODE_FULL    = "full"     # every item as a dict (original behaviour)
+ATTRIBUTE_MODE_TOP_N   = "top_n"    # the first/most relevant N items
+ATTRIBUTE_MODE_SUMMARY = "summary"  # counts and extents only
+
+ATTRIBUTE_MODES = [ATTRIBUTE_MODE_FULL, ATTRIBUTE_MODE_TOP_N, ATTRIBUTE_MODE_SUMMARY]
+
+# The whole-city fleet is far too large to push as attributes every 15 s.
+DEFAULT_ATTRIBUTE_MODE: dict[str, str] = {
+    FEED_ALL_FLEET:          ATTRIBUTE_MODE_SUMMARY,
+    FEED_ROUTE_FLEET:        ATTRIBUTE_MODE_FULL,
+    FEED_STOP_ARRIVALS:      ATTRIBUTE_MODE_FULL,
+    FEED_ROUTE_SCHEDULE:     ATTRIBUTE_MODE_FULL,
+    FEED_ROUTE_ANNOUNCEMENTS: ATTRIBUTE_MODE_FULL,
+    FEED_ZONE_FLEET:         ATTRIBUTE_MODE_TOP_N,
+    FEED_STOP_BOARD:         ATTRIBUTE_MODE_TOP_N,
+    FEED_ROUTE_BUNDLE:       ATTRIBUTE_MODE_FULL,
+}
+DEFAULT_ATTRIBUTE_LIMIT = 50
+MAX_ATTRIBUTE_LIMIT = 1000
+
+# Adaptive polling bounds, in seconds. The base interval is UPDATE_INTERVALS;
+# the effective one moves between these with ETA proximity and staleness.
+CONF_POLL_FLOOR   = "poll_floor"
+CONF_POLL_CEILING = "poll_ceiling"
+
+DEFAULT_POLL_FLOOR: dict[str, int] = {
+    FEED_ALL_FLEET:          10,
+    FEED_ROUTE_FLEET:        10,
+    FEED_STOP_ARRIVALS:      10,
+    FEED_ROUTE_SCHEDULE:     900,
+    FEED_ROUTE_ANNOUNCEMENTS: 60,
+    FEED_ZONE_FLEET:         10,
+    FEED_STOP_BOARD:         10,
+    FEED_ROUTE_BUNDLE:       10,
+}
+DEFAULT_POLL_CEILING: dict[str, int] = {
+    FEED_ALL_FLEET:          120,
+    FEED_ROUTE_FLEET:        120,
+    FEED_STOP_ARRIVALS:      300,
+    FEED_ROUTE_SCHEDULE:     21600,
+    FEED_ROUTE_ANNOUNCEMENTS: 3600,
+    FEED_ZONE_FLEET:         120,
+    FEED_STOP_BOARD:         300,
+    FEED_ROUTE_BUNDLE:       120,
+}
+MIN_POLL_SECONDS = 5
+MAX_POLL_SECONDS = 86400
+
+# Fast start: restore the last payload from disk, add sensors at once and
+# run the first refresh in the background.
+CONF_FAST_START = "fast_start"
+DEFAULT_FAST_START = True
+
+# Hedged requests (arrival feeds only): race a second request against one
+# slower than the endpoint's recent p95.
+CONF_HEDGE = "hedge"
+DEFAULT_HEDGE = False
+
+# Push (fleet and stop arrival feeds): take updates from iett-middle's event
+# stream while it is open, polling only as a fallback.
+CONF_PUSH = "push"
+DEFAULT_PUSH = False
+# Feeds read from a shared hub, which is what the stream feeds.
+PUSH_FEEDS = (*FLEET_FEEDS, FEED_STOP_ARRIVALS, FEED_ROUTE_BUNDLE)
+
+# ── Services ────────────────────────────────────────────────────────────────
+SERVICE_GET_ITEMS = "get_items"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
+ATTR_SKIPPED_WRITES = "skipped_writes"
+ATTR_POLL_INTERVAL = "poll_interval"
+ATTR_NEXT_DEPARTURES = "next_departures"
+ATTR_FAILED_STOPS = "failed_stops"
+ATTR_ROUTE_NAME = "route_name"
+
+# ── hass.data keys for objects shared across entries ────────────────────────
+DATA_CLIENTS = f"{DOMAIN}_clients"
+DATA_HUBS = f"{DOMAIN}_hubs"
+DATA_SERVICE_CALENDAR = f"{DOMAIN}_service_calendar"
+DATA_CACHE = f"{DOMAIN}_cache"
+DATA_STARTUP = f"{DOMAIN}_startup"
+DATA_TIMINGS = f"{DOMAIN}_timings"
+DATA_PUSH = f"{DOMAIN}_push"
+DATA_PHASES = f"{DOMAIN}_phases"
+
+# ── Persistent response cache (.storage/iett.response_cache) ────────────────
+CACHE_STORAGE_KEY = f"{DOMAIN}.response_cache"
+CACHE_STORAGE_VERSION = 1
+CACHE_SAVE_DELAY = 30  # seconds; writes are coalesced
+
+# ── Per-entry payload snapshots (.storage/iett.snapshot.<entry_id>) ─────────
+SNAPSHOT_STORAGE_KEY = f"{DOMAIN}.snapshot"
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 600  # seconds; pending writes are flushed on shutdown
+# Older snapshots are not restored: stale ETAs are worse than none.
+SNAPSHOT_MAX_AGE: dict[str, int] = {
+    FEED_ALL_FLEET:          600,
+    FEED_ROUTE_FLEET:        600,
+    FEED_STOP_ARRIVALS:      300,
+    FEED_ROUTE_SCHEDULE:     7 * 86400,
+    FEED_ROUTE_ANNOUNCEMENTS: 86400,
+    FEED_ZONE_FLEET:         600,
+    FEED_STOP_BOARD:         300,
+    FEED_ROUTE_BUNDLE:       600,  # the fleet part's age limit
+}
+# Gap between the background first refreshes of entries (or shared hubs).
+STARTUP_STAGGER = 0.25
+# Scheduled refreshes allowed to run at once against one middle URL.
+POLL_MAX_IN_FLIGHT = 4
+
+# ── Announcement changes (.storage/iett.announcements.<entry_id>) ──────────
+# Fired on the event bus when a route's announcement list changes.
+EVENT_ANNOUNCEMENT_ADDED = f"{DOMAIN}_announcement_added"
+EVENT_ANNOUNCEMENT_UPDATED = f"{DOMAIN}_announcement_updated"
+EVENT_ANNOUNCEMENT_REMOVED = f"{DOMAIN}_announcement_removed"
+# Announcements already reported, kept so a restart does not report them again.
+ANNOUNCEMENTS_STORAGE_KEY = f"{DOMAIN}.announcements"
+ANNOUNCEMENTS_STORAGE_VERSION = 1
+ANNOUNCEMENTS_SAVE_DELAY = 30  # seconds; pending writes are flushed on shutdown
+
+# ── Batched stop arrivals ───────────────────────────────────────────────────
+# Upper bound on parallel per-stop requests, for departure boards and when
+# the middle server has no bulk /v1/stops/arrivals endpoint.
+ARRIVALS_MAX_CONCURRENCY = 4
+
+# ── Route schedules ─────────────────────────────────────────────────────────
+# Upcoming departure times listed on schedule sensors.
+NEXT_DEPARTURES_COUNT = 5
+
 # ── Sensor attribute data keys ──────────────────────────────────────────────
+# Route bundles have none of their own: each part's sensor uses its feed's.
 DATA_KEY: dict[str, str] = {
     FEED_ALL_FLEET:          "buses",
     FEED_ROUTE_FLEET:        "buses",
     FEED_STOP_ARRIVALS:      "arrivals",
     FEED_ROUTE_SCHEDULE:     "departures",
     FEED_ROUTE_ANNOUNCEMENTS: "announcements",
+    FEED_ZONE_FLEET:         "buses",
+    FEED_STOP_BOARD:         "departures",
 }
 
 # Sensor icons (MDI)
@@ -62,6 +228,8 @@ SENSOR_ICON: dict[str, str] = {
     FEED_STOP_ARRIVALS:      "mdi:bus-clock",
     FEED_ROUTE_SCHEDULE:     "mdi:timetable",
     FEED_ROUTE_ANNOUNCEMENTS: "mdi:alert-circle-outline",
+    FEED_ZONE_FLEET:         "mdi:map-marker-radius",
+    FEED_STOP_BOARD:         "mdi:sign-direction",
 }
 
 # Sensor units of measurement
@@ -71,4 +239,6 @@ SENSOR_UNIT: dict[str, str | None] = {
     FEED_STOP_ARRIVALS:      "min",
     FEED_ROUTE_SCHEDULE:     "min",
     FEED_ROUTE_ANNOUNCEMENTS: None,
+    FEED_ZONE_FLEET:         None,
+    FEED_STOP_BOARD:         "min",
 }
@@ -1,69 +1,1335 @@
-"""One generic IettCoordinator for all feed types."""
+"""One generic IettCoordinator for all feed types, plus the shared hubs."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Any, Generic, TypeVar
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant import config_entries
+from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import event
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .announcements import ADDED, REMOVED, UPDATED, AnnouncementChange, AnnouncementTracker
+from .board import BoardDeparture, BoardStop, merge
+from .bundle import RouteBundle
+from .cache import ResponseCache
 from .client import IettMiddleClient, IettMiddleError
 from .const import (
+    ANNOUNCEMENTS_SAVE_DELAY,
+    ANNOUNCEMENTS_STORAGE_KEY,
+    ANNOUNCEMENTS_STORAGE_VERSION,
+    ARRIVALS_MAX_CONCURRENCY,
+    BUNDLE_PARTS,
     CONF_DCODE,
     CONF_HAT_KODU,
+    CONF_HEDGE,
     CONF_MIDDLE_URL,
+    CONF_POLL_CEILING,
+    CONF_POLL_FLOOR,
+    CONF_PUSH,
+    CONF_RADIUS,
+    CONF_STOPS,
+    CONF_ZONE,
+    CACHE_SAVE_DELAY,
+    CACHE_STORAGE_KEY,
+    CACHE_STORAGE_VERSION,
+    DATA_CACHE,
+    DATA_CLIENTS,
+    DATA_HUBS,
+    DATA_PHASES,
+    DATA_PUSH,
+    DATA_SERVICE_CALENDAR,
+    DATA_STARTUP,
+    DATA_TIMINGS,
+    DEFAULT_HEDGE,
+    DEFAULT_POLL_CEILING,
+    DEFAULT_POLL_FLOOR,
+    DEFAULT_PUSH,
+    DEFAULT_ZONE,
     DOMAIN,
+    EVENT_ANNOUNCEMENT_ADDED,
+    EVENT_ANNOUNCEMENT_REMOVED,
+    EVENT_ANNOUNCEMENT_UPDATED,
     FEED_ALL_FLEET,
     FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ROUTE_BUNDLE,
     FEED_ROUTE_FLEET,
     FEED_ROUTE_SCHEDULE,
     FEED_STOP_ARRIVALS,
+    FEED_STOP_BOARD,
+    FEED_ZONE_FLEET,
+    POLL_MAX_IN_FLIGHT,
+    SNAPSHOT_MAX_AGE,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_KEY,
+    SNAPSHOT_STORAGE_VERSION,
+    STARTUP_STAGGER,
     UPDATE_INTERVALS,
 )
+from .fleet import FleetSnapshot, FleetStore, route_key
+from .metrics import REFRESH, Timings
+from .motion import MotionTracker
+from .models import (
+    Announcement,
+    Arrival,
+    BusPosition,
+    FleetDelta,
+    ScheduledDeparture,
+    fingerprint,
+)
+from .polling import AdaptiveInterval, Cadence, PollPhases, ServiceCalendar, StartupStagger
+from .push import FLEET_CHANNEL, STOP_CHANNEL_PREFIX, PushEvent, PushLink, stop_channel
+from .schedule import ScheduleIndex
+from .spatial import FleetGrid
 
 _LOGGER = logging.getLogger(__name__)
 
+_DataT = TypeVar("_DataT")
+_HubDataT = TypeVar("_HubDataT")
+
+# How long the first stop lookup waits for others to join its batch.
+_BATCH_WINDOW = 0.05
+# Statuses meaning "this middle build has no bulk arrivals endpoint".
+_BULK_UNSUPPORTED = {404, 405, 501}
+
+
+@callback
+def async_get_client(hass: HomeAssistant, middle_url: str) -> IettMiddleClient:
+    """Return the long-lived client for *middle_url*, shared by all entries.
+
+    Each client owns its connection pool, so polls to one middle host reuse
+    warm keep-alive connections instead of competing in HA's shared pool.
+    Those sessions are closed when the last entry on the URL unloads, or
+    at the latest when Home Assistant stops.
+    """
+    if DATA_CLIENTS not in hass.data:
+
+        async def _async_stop(_event: Event) -> None:
+            await async_close_clients(hass)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop)
+    clients: dict[str, IettMiddleClient] = hass.data.setdefault(DATA_CLIENTS, {})
+    url = middle_url.rstrip("/")
+    if (client := clients.get(url)) is None:
+        client = clients[url] = IettMiddleClient(
+            None, url, _async_get_cache(hass), async_get_timings(hass)
+        )
+    return client
+
+
+async def async_close_clients(hass: HomeAssistant) -> None:
+    """Close every client's session, and the event streams reading from them."""
+    for link in hass.data.pop(DATA_PUSH, {}).values():
+        await link.stop()
+    for client in hass.data.pop(DATA_CLIENTS, {}).values():
+        await client.close()
+
+
+@callback
+def async_get_timings(hass: HomeAssistant) -> Timings:
+    """Hot-path timings shared by every client, coordinator and sensor."""
+    timings: Timings = hass.data.setdefault(DATA_TIMINGS, Timings())
+    return timings
+
+
+@callback
+def async_get_phases(hass: HomeAssistant, middle_url: str) -> PollPhases:
+    """The poll phases and refresh slots of everything polling *middle_url*."""
+    plans: dict[str, PollPhases] = hass.data.setdefault(DATA_PHASES, {})
+    url = middle_url.rstrip("/")
+    if (phases := plans.get(url)) is None:
+        phases = plans[url] = PollPhases(POLL_MAX_IN_FLIGHT)
+    return phases
+
+
+@callback
+def _async_get_cache(hass: HomeAssistant) -> ResponseCache:
+    """The response cache shared by every client, persisted in ``.storage``."""
+    if (cache := hass.data.get(DATA_CACHE)) is None:
+        store: Store[dict[str, Any]] = Store(
+            hass, CACHE_STORAGE_VERSION, CACHE_STORAGE_KEY, private=True
+        )
+        cache = hass.data[DATA_CACHE] = ResponseCache(
+            load=store.async_load,
+            save=lambda dump: store.async_delay_save(dump, CACHE_SAVE_DELAY),
+        )
+    return cache
+
+
+def _fingerprint(data: Any) -> int:
+    if isinstance(data, (FleetSnapshot, RouteBundle)):
+        return data.fingerprint()
+    return fingerprint(data)
+
+
+def _min_eta(arrivals: Iterable[Arrival]) -> int | None:
+    return min(
+        (a.eta_minutes for a in arrivals if a.eta_minutes is not None), default=None
+    )
+
+
+def _route_keys(items: Iterable[Any]) -> set[str]:
+    return {key for item in items if (key := route_key(item.route_code))}
+
+
+def _minutes_to_service(hass: HomeAssistant, routes: Iterable[str]) -> int | None:
+    """Minutes until the next departure on any of *routes*, if their schedules say."""
+    calendar: ServiceCalendar | None = hass.data.get(DATA_SERVICE_CALENDAR)
+    if calendar is None:
+        return None
+    return calendar.minutes_to_service(routes, dt_util.now())
+
+
+def _async_set_service(
+    hass: HomeAssistant, owner: object, route: str, schedule: ScheduleIndex
+) -> None:
+    calendar: ServiceCalendar = hass.data.setdefault(DATA_SERVICE_CALENDAR, ServiceCalendar())
+    calendar.set(owner, route, schedule)
+
+
+def _poll_bounds(feed_type: str, options: dict[str, Any]) -> tuple[timedelta, timedelta]:
+    floor = options.get(CONF_POLL_FLOOR, DEFAULT_POLL_FLOOR[feed_type])
+    ceiling = options.get(CONF_POLL_CEILING, DEFAULT_POLL_CEILING[feed_type])
+    return timedelta(seconds=floor), timedelta(seconds=ceiling)
+
+
+class _PhasedCoordinator(DataUpdateCoordinator[_DataT], Generic[_DataT]):
+    """Coordinator whose timer follows its middle URL's :class:`PollPhases`.
+
+    Its refreshes are set for its own phase of the interval rather than a
+    plain interval from now, so pollers sharing a server take turns, and a
+    scheduled refresh first waits for one of the server's refresh slots.
+    A poller leaves the plan when it loses its last listener or shuts down.
+    """
+
+    # False keeps Home Assistant's own timing; refreshes still take a slot.
+    _phased = True
+    phases: PollPhases
+
+    @property
+    def phase_key(self) -> str:
+        """This poller's name in :attr:`phases`."""
+        return self.name
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        if (
+            not self._phased
+            or self.update_interval is None
+            or (self.config_entry and self.config_entry.pref_disable_polling)
+        ):
+            super()._schedule_refresh()
+            return
+        self._async_unsub_refresh()
+        at = self.phases.next_at(
+            self.phase_key, self.update_interval.total_seconds(), self.hass.loop.time()
+        )
+        self._unsub_refresh = event.async_call_at(self.hass, self._job, at)
+
+    @callback
+    def _unschedule_refresh(self) -> None:
+        super()._unschedule_refresh()
+        self.phases.remove(self.phase_key)
+
+    async def _handle_refresh_interval(self, _now: datetime) -> None:
+        async with self.phases.slot():
+            await super()._handle_refresh_interval(_now)
+
+    async def async_shutdown(self) -> None:
+        self.phases.remove(self.phase_key)
+        await super().async_shutdown()
+
+
+class _IettHub(_PhasedCoordinator[_HubDataT], ABC):
+    """Coordinator shared by every entry of one feed family on a middle URL.
+
+    Entries subscribe with a *context* (route code, stop code, …) through
+    :meth:`async_add_listener`; the hub fetches on their behalf and each
+    entry reads its own slice with :meth:`hub_slice`.
+    """
+
+    feed_type: str
+    endpoint: str  # template, as grouped in the client's timings
+
+    def __init__(self, hass: HomeAssistant, middle_url: str) -> None:
+        self.middle_url = middle_url
+        self.phases = async_get_phases(hass, middle_url)
+        self._poll_bounds: dict[object, tuple[timedelta, timedelta]] = {}
+        self._hedging: set[object] = set()
+        self._pushing: set[object] = set()
+        self.pushed = False
+        self.poller = AdaptiveInterval(
+            UPDATE_INTERVALS[self.feed_type], *_poll_bounds(self.feed_type, {})
+        )
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_{self.feed_type}_hub",
+            update_interval=self.poller.interval,
+            # A 304 hands back the previous object; don't wake entries for it.
+            always_update=False,
+        )
+
+    def _client(self) -> IettMiddleClient:
+        return async_get_client(self.hass, self.middle_url)
+
+    @callback
+    def async_set_poll_bounds(
+        self, owner: object, bounds: tuple[timedelta, timedelta] | None
+    ) -> None:
+        """Set (or with ``None`` drop) the poll floor/ceiling *owner* needs.
+
+        The interval adapts (see :class:`AdaptiveInterval`) within the
+        tightest bounds any owner asked for.
+        """
+        if bounds is None:
+            self._poll_bounds.pop(owner, None)
+        else:
+            self._poll_bounds[owner] = bounds
+        if self._poll_bounds:
+            floors, ceilings = zip(*self._poll_bounds.values())
+            self.poller.set_bounds(min(floors), min(ceilings))
+        else:
+            self.poller.set_bounds(*_poll_bounds(self.feed_type, {}))
+        self._apply_interval()
+
+    @property
+    def hedge(self) -> bool:
+        return bool(self._hedging)
+
+    @callback
+    def async_set_hedge(self, owner: object, hedge: bool) -> None:
+        """Record whether *owner* wants this hub's requests hedged.
+
+        Requests are hedged, where the endpoint supports it, while any owner
+        asks to be.
+        """
+        if hedge:
+            self._hedging.add(owner)
+        else:
+            self._hedging.discard(owner)
+
+    @callback
+    def async_set_push(self, owner: object, push: bool) -> None:
+        """Record whether *owner* wants this hub fed by the event stream.
+
+        While any owner does, the hub's channels are added to the middle
+        URL's event stream (see :func:`async_get_push`).
+        """
+        if push:
+            self._pushing.add(owner)
+        else:
+            self._pushing.discard(owner)
+        _async_sync_push(self.hass, self.middle_url)
+
+    @abstractmethod
+    def push_channels(self) -> set[str]:
+        """Event stream channels this hub needs; none while nobody asks for push."""
+
+    @callback
+    def async_set_pushed(self, pushed: bool) -> None:
+        """Record whether the event stream is currently feeding this hub.
+
+        While it is, the hub only polls at its ceiling, as a safety net;
+        once it drops, the adaptive interval is back in force.
+        """
+        if pushed == self.pushed:
+            return
+        self.pushed = pushed
+        self._apply_interval()
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    @abstractmethod
+    def async_handle_push(self, event: PushEvent) -> None:
+        """Apply one stream event, if it is for this hub."""
+
+    def _apply_interval(self) -> None:
+        self.update_interval = self.poller.ceiling if self.pushed else self.poller.interval
+
+    def _adapt(self, changed: bool, min_eta: int | None = None) -> None:
+        self.poller.update(
+            changed, min_eta, _minutes_to_service(self.hass, self.service_routes())
+        )
+        self._apply_interval()
+
+    def service_routes(self) -> set[str]:
+        """Routes whose schedules tell when this hub's data goes quiet.
+
+        Empty when they are not known, e.g. for the whole fleet.
+        """
+        return set()
+
+    @abstractmethod
+    def hub_slice(self, context: str) -> Any:
+        """Return the part of the last snapshot belonging to *context*."""
+
+    @abstractmethod
+    async def async_fetch(self, context: str) -> Any:
+        """Fetch data for *context* on demand (used for first refreshes)."""
+
+
+class IettFleetHub(_IettHub[FleetSnapshot]):
+    """Fetches /v1/fleet once per cycle for every fleet entry on a middle URL.
+
+    The fleet is indexed by ``route_code`` after each fetch, so route entries
+    read their slice from memory instead of calling iett-middle themselves.
+    Zone entries query :attr:`grid`, which is synced to the current snapshot
+    on first use after each change. Every changed snapshot is also fed to
+    :attr:`motion` for per-bus heading, speed and dwell.
+    """
+
+    feed_type = FEED_ALL_FLEET
+    endpoint = "/v1/fleet"
+
+    def __init__(self, hass: HomeAssistant, middle_url: str) -> None:
+        self.store = FleetStore()
+        self.grid = FleetGrid()
+        self.motion = MotionTracker()
+        self._first_refresh_lock = asyncio.Lock()
+        super().__init__(hass, middle_url)
+
+    async def _async_update_data(self) -> FleetSnapshot:
+        try:
+            changed = await self.store.async_sync(self._client())
+        except IettMiddleError as err:
+            raise UpdateFailed(f"iett-middle error: {err}") from err
+        if changed:
+            self.motion.update(self.store.snapshot, time.monotonic())
+        self._adapt(changed)
+        return self.store.snapshot
+
+    def route_buses(self, hat_kodu: str) -> FleetSnapshot:
+        """Buses currently reporting *hat_kodu* in the last fleet snapshot."""
+        return self.store.route_buses(hat_kodu)
+
+    def zone_buses(self, latitude: float, longitude: float, radius: float) -> FleetSnapshot:
+        """Buses within *radius* metres of a point, nearest first."""
+        snapshot = self.store.snapshot
+        self.grid.sync(snapshot)
+        return snapshot.take(self.grid.within(latitude, longitude, radius))
+
+    def hub_slice(self, context: str) -> Any:
+        if context == FEED_ALL_FLEET:
+            return self.store.snapshot
+        return self.route_buses(context)
+
+    def service_routes(self) -> set[str]:
+        contexts = set(self.async_contexts())
+        # Whole-fleet and zone entries could be waiting on any route.
+        return set() if FEED_ALL_FLEET in contexts else contexts
+
+    def push_channels(self) -> set[str]:
+        return {FLEET_CHANNEL} if self._pushing else set()
+
+    @callback
+    def async_handle_push(self, event: PushEvent) -> None:
+        if event.channel != FLEET_CHANNEL:
+            return
+        delta: FleetDelta = event.data
+        store = self.store
+        changed = store.apply(delta)
+        if delta.checksum is not None and delta.checksum != store.checksum():
+            _LOGGER.debug("Fleet checksum mismatch after a pushed delta, resyncing")
+            store.cursor = None
+            self.hass.async_create_task(self.async_request_refresh())
+            return
+        if changed:
+            self.motion.update(store.snapshot, time.monotonic())
+            self.async_set_updated_data(store.snapshot)
+
+    async def async_ensure_data(self) -> None:
+        """Refresh once if no successful snapshot is held yet.
+
+        Entries set up concurrently share the single in-flight refresh.
+        """
+        async with self._first_refresh_lock:
+            if self.data is None or not self.last_update_success:
+                await self.async_refresh()
+
+    async def async_fetch(self, context: str) -> Any:
+        await self.async_ensure_data()
+        if not self.last_update_success:
+            raise UpdateFailed(f"iett-middle error: {self.last_exception}")
+        return self.hub_slice(context)
+
+
+class IettArrivalsHub(_IettHub[dict[str, list[Arrival]]]):
+    """Fetches arrivals for every subscribed stop on a middle URL at once.
+
+    Uses the bulk ``/v1/stops/arrivals?dcodes=…`` endpoint when the server
+    has it, otherwise a per-stop gather bounded by
+    :data:`ARRIVALS_MAX_CONCURRENCY`. Stops that fail individually are kept
+    in :attr:`stop_errors` so only their entries go unavailable.
+    """
+
+    feed_type = FEED_STOP_ARRIVALS
+
+    @property  # type: ignore[override]
+    def endpoint(self) -> str:
+        if self._bulk_supported is False:
+            return "/v1/stops/{id}/arrivals"
+        return "/v1/stops/arrivals"
+
+    def __init__(self, hass: HomeAssistant, middle_url: str) -> None:
+        self.stop_errors: dict[str, IettMiddleError] = {}
+        self._bulk_supported: bool | None = None
+        self._pending: set[str] = set()
+        self._batch: asyncio.Future[dict[str, list[Arrival]]] | None = None
+        self._stop_routes: dict[str, set[str]] = {}
+        super().__init__(hass, middle_url)
+
+    async def _async_update_data(self) -> dict[str, list[Arrival]]:
+        dcodes = sorted(set(self.async_contexts()))
+        if not dcodes:
+            return {}
+        result = await self._fetch(dcodes)
+        for dcode, arrivals in result.items():
+            self._stop_routes.setdefault(dcode, set()).update(_route_keys(arrivals))
+        self._adapt(result != self.data, _min_eta(chain.from_iterable(result.values())))
+        return result
+
+    def service_routes(self) -> set[str]:
+        """Every route seen arriving at a subscribed stop (empty until one has)."""
+        return set().union(*(self._stop_routes.get(d, ()) for d in self.async_contexts()))
+
+    async def _fetch(self, dcodes: list[str]) -> dict[str, list[Arrival]]:
+        client = self._client()
+        try:
+            if self._bulk_supported is not False:
+                try:
+                    result = await client.get_stops_arrivals(dcodes, hedge=self.hedge)
+                except IettMiddleError as err:
+                    if self._bulk_supported or err.status not in _BULK_UNSUPPORTED:
+                        raise
+                    _LOGGER.debug(
+                        "%s has no bulk arrivals endpoint, fetching per stop",
+                        self.middle_url,
+                    )
+                    self._bulk_supported = False
+                else:
+                    self._bulk_supported = True
+                    for dcode in dcodes:
+                        self.stop_errors.pop(dcode, None)
+                    return result
+            return await self._gather(client, dcodes)
+        except IettMiddleError as err:
+            raise UpdateFailed(f"iett-middle error: {err}") from err
+
+    async def _gather(
+        self, client: IettMiddleClient, dcodes: list[str]
+    ) -> dict[str, list[Arrival]]:
+        semaphore = asyncio.Semaphore(ARRIVALS_MAX_CONCURRENCY)
+
+        async def _one(dcode: str) -> list[Arrival]:
+            async with semaphore:
+                return await client.get_stop_arrivals(dcode, hedge=self.hedge)
+
+        results = await asyncio.gather(
+            *(_one(dcode) for dcode in dcodes), return_exceptions=True
+        )
+        arrivals: dict[str, list[Arrival]] = {}
+        for dcode, res in zip(dcodes, results):
+            if isinstance(res, IettMiddleError):
+                self.stop_errors[dcode] = res
+            elif isinstance(res, BaseException):
+                raise res
+            else:
+                self.stop_errors.pop(dcode, None)
+                arrivals[dcode] = res
+        if not arrivals and dcodes:
+            raise self.stop_errors[dcodes[0]]
+        return arrivals
+
+    def push_channels(self) -> set[str]:
+        if not self._pushing:
+            return set()
+        return {stop_channel(dcode) for dcode in self.async_contexts()}
+
+    @callback
+    def async_handle_push(self, event: PushEvent) -> None:
+        if not event.channel.startswith(STOP_CHANNEL_PREFIX):
+            return
+        dcode = event.channel.removeprefix(STOP_CHANNEL_PREFIX)
+        held = self.data or {}
+        error = self.stop_errors.pop(dcode, None)
+        if error is None and dcode in held and held[dcode] == event.data:
+            return
+        self.async_set_updated_data({**held, dcode: event.data})
+
+    def hub_slice(self, context: str) -> list[Any]:
+        if (err := self.stop_errors.get(context)) is not None:
+            raise UpdateFailed(f"iett-middle error: {err}")
+        return (self.data or {}).get(context, [])
+
+    async def async_fetch(self, context: str) -> list[Any]:
+        """Fetch one stop, batched with any other stop requested meanwhile."""
+        self._pending.add(context)
+        if (batch := self._batch) is not None:
+            result = await asyncio.shield(batch)
+        else:
+            batch = self._batch = asyncio.get_running_loop().create_future()
+            # Nobody may be waiting on the batch; don't warn about that.
+            batch.add_done_callback(lambda f: f.cancelled() or f.exception())
+            try:
+                await asyncio.sleep(_BATCH_WINDOW)
+                dcodes = sorted(self._pending)
+                self._pending.clear()
+                self._batch = None
+                result = await self._fetch(dcodes)
+            except BaseException as err:
+                self._batch = None
+                if not batch.done():
+                    batch.set_exception(err)
+                raise
+            batch.set_result(result)
+        if context not in result:
+            self.hub_slice(context)  # raises the stop's own error
+        return result.get(context, [])
 
-class IettCoordinator(DataUpdateCoordinator[list[Any]]):
-    """Single coordinator parameterised by feed type."""
+
+_HubT = TypeVar("_HubT", bound=_IettHub[Any])
+
+
+@callback
+def async_get_hub(hass: HomeAssistant, hub_cls: type[_HubT], middle_url: str) -> _HubT:
+    """Return the *hub_cls* hub for *middle_url*, creating it on first use."""
+    hubs: dict[tuple[str, str], _IettHub[Any]] = hass.data.setdefault(DATA_HUBS, {})
+    key = (hub_cls.feed_type, middle_url.rstrip("/"))
+    if (hub := hubs.get(key)) is None:
+        # The hub outlives whichever entry created it, so it must not bind
+        # itself to the config entry currently being set up.
+        token = config_entries.current_entry.set(None)
+        try:
+            hub = hubs[key] = hub_cls(hass, key[1])
+        finally:
+            config_entries.current_entry.reset(token)
+    return hub  # type: ignore[return-value]
+
+
+@callback
+def async_get_push(hass: HomeAssistant, middle_url: str) -> PushLink:
+    """Return the event stream for *middle_url*, shared by its hubs.
+
+    It streams the union of the hubs' :meth:`~_IettHub.push_channels`,
+    resuming the fleet from the fleet hub's cursor on every (re)connect.
+    """
+    links: dict[str, PushLink] = hass.data.setdefault(DATA_PUSH, {})
+    url = middle_url.rstrip("/")
+    if (link := links.get(url)) is not None:
+        return link
+
+    def hubs() -> list[_IettHub[Any]]:
+        return [hub for (_, u), hub in hass.data.get(DATA_HUBS, {}).items() if u == url]
+
+    def connect(channels: frozenset[str]) -> Any:
+        fleet: IettFleetHub | None = hass.data.get(DATA_HUBS, {}).get((FEED_ALL_FLEET, url))
+        since = fleet.store.cursor if fleet is not None else None
+        return async_get_client(hass, url).stream(channels, since)
+
+    def on_event(event: PushEvent) -> None:
+        for hub in hubs():
+            hub.async_handle_push(event)
+
+    def on_state(connected: bool) -> None:
+        for hub in hubs():
+            hub.async_set_pushed(connected and bool(hub.push_channels()))
+
+    link = links[url] = PushLink(connect, on_event, on_state)
+    return link
+
+
+@callback
+def _async_sync_push(hass: HomeAssistant, middle_url: str) -> None:
+    """Point the URL's event stream at whatever its hubs currently need."""
+    url = middle_url.rstrip("/")
+    channels: set[str] = set()
+    for (_, hub_url), hub in hass.data.get(DATA_HUBS, {}).items():
+        if hub_url == url:
+            channels |= hub.push_channels()
+    if channels or url in hass.data.get(DATA_PUSH, {}):
+        async_get_push(hass, url).set_channels(channels)
+
+
+async def async_release_shared(hass: HomeAssistant, middle_url: str) -> None:
+    """Shut down what entries shared for *middle_url* once none uses it.
+
+    Hubs go as soon as nobody listens to them; the client once no hub and
+    no loaded entry refers to the URL any more.
+    """
+    hubs: dict[tuple[str, str], _IettHub[Any]] = hass.data.get(DATA_HUBS, {})
+    url = middle_url.rstrip("/")
+    for key, hub in list(hubs.items()):
+        if key[1] == url and not any(True for _ in hub.async_contexts()):
+            hubs.pop(key)
+            await hub.async_shutdown()
+    if any(key[1] == url for key in hubs) or any(
+        coordinator._middle_url.rstrip("/") == url
+        for coordinator in hass.data.get(DOMAIN, {}).values()
+    ):
+        return
+    if (link := hass.data.get(DATA_PUSH, {}).pop(url, None)) is not None:
+        await link.stop()
+    hass.data.get(DATA_PHASES, {}).pop(url, None)
+    if (client := hass.data.get(DATA_CLIENTS, {}).pop(url, None)) is not None:
+        await client.close()
+
+
+_MODEL_FOR_FEED: dict[str, type[Any]] = {
+    FEED_ALL_FLEET: BusPosition,
+    FEED_ROUTE_FLEET: BusPosition,
+    FEED_STOP_ARRIVALS: Arrival,
+    FEED_ROUTE_SCHEDULE: ScheduledDeparture,
+    FEED_ROUTE_ANNOUNCEMENTS: Announcement,
+    FEED_ZONE_FLEET: BusPosition,
+    FEED_STOP_BOARD: BoardDeparture,
+}
+
+
+def _restore_payload(feed_type: str, items: Any) -> Any:
+    if feed_type == FEED_ROUTE_BUNDLE:
+        return RouteBundle(items["hat_kodu"]).with_parts(
+            {
+                part: _restore_payload(part, items[part])
+                for part in BUNDLE_PARTS
+                if items.get(part) is not None
+            }
+        )
+    model = _MODEL_FOR_FEED[feed_type]
+    data = [model(**item) for item in items]
+    if model is BusPosition:
+        return FleetSnapshot.from_positions(data)
+    return data
+
+
+def _snapshot_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    return Store(
+        hass, SNAPSHOT_STORAGE_VERSION, f"{SNAPSHOT_STORAGE_KEY}.{entry_id}", private=True
+    )
+
+
+def _announcement_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    return Store(
+        hass,
+        ANNOUNCEMENTS_STORAGE_VERSION,
+        f"{ANNOUNCEMENTS_STORAGE_KEY}.{entry_id}",
+        private=True,
+    )
+
+
+async def async_remove_snapshot(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the saved snapshot and seen announcements of a removed config entry."""
+    await _snapshot_store(hass, entry_id).async_remove()
+    await _announcement_store(hass, entry_id).async_remove()
+
+
+_EVENT_FOR_CHANGE: dict[str, str] = {
+    ADDED: EVENT_ANNOUNCEMENT_ADDED,
+    UPDATED: EVENT_ANNOUNCEMENT_UPDATED,
+    REMOVED: EVENT_ANNOUNCEMENT_REMOVED,
+}
+
+
+_ENDPOINT_FOR_FEED: dict[str, str] = {
+    FEED_ROUTE_SCHEDULE: "/v1/routes/{id}/schedule",
+    FEED_ROUTE_ANNOUNCEMENTS: "/v1/routes/{id}/announcements",
+    FEED_STOP_BOARD: "/v1/stops/{id}/arrivals",
+}
+
+_HUB_FOR_FEED: dict[str, type[_IettHub[Any]]] = {
+    FEED_ALL_FLEET: IettFleetHub,
+    FEED_ROUTE_FLEET: IettFleetHub,
+    FEED_STOP_ARRIVALS: IettArrivalsHub,
+    FEED_ZONE_FLEET: IettFleetHub,
+    FEED_ROUTE_BUNDLE: IettFleetHub,
+}
+
+
+class IettCoordinator(_PhasedCoordinator[list[Any]]):
+    """Single coordinator parameterised by feed type.
+
+    Fleet and arrivals feeds do not poll on their own: they subscribe to the
+    shared hub for their middle URL and are pushed their slice after every
+    hub refresh. The others poll on an :class:`AdaptiveInterval`.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
         entry_data: dict[str, Any],
+        options: dict[str, Any] | None = None,
     ) -> None:
         self.feed_type: str = entry_data["feed_type"]
         self._middle_url: str = entry_data[CONF_MIDDLE_URL]
         self._hat_kodu: str = entry_data.get(CONF_HAT_KODU, "")
         self._dcode: str = entry_data.get(CONF_DCODE, "")
+        self._zone: str = entry_data.get(CONF_ZONE, DEFAULT_ZONE)
+        self._radius: float = entry_data.get(CONF_RADIUS) or 0
+        self._stops = [BoardStop.from_config(s) for s in entry_data.get(CONF_STOPS) or []]
 
         if self.feed_type not in UPDATE_INTERVALS:
             raise ValueError(f"Unknown feed type: {self.feed_type!r}")
 
+        self.fingerprint: int | None = None
+        self.skipped_writes = 0
+        self.schedule: ScheduleIndex | None = None
+        self.startup_time: float | None = None
+        self.stop_errors: dict[str, IettMiddleError] = {}
+        self._board_routes: set[str] = set()
+        self.timings = async_get_timings(hass)
+        self.phases = async_get_phases(hass, self._middle_url)
+        self._poll_bounds = _poll_bounds(self.feed_type, options or {})
+        self._hedge: bool = (options or {}).get(CONF_HEDGE, DEFAULT_HEDGE)
+        self._push: bool = (options or {}).get(CONF_PUSH, DEFAULT_PUSH)
+        self.poller: AdaptiveInterval | None = None
+        self.announcements: AnnouncementTracker | None = None
+        if self.feed_type in (FEED_ROUTE_ANNOUNCEMENTS, FEED_ROUTE_BUNDLE):
+            self.announcements = AnnouncementTracker()
+        self._hub: _IettHub[Any] | None = None
+        self._unsub_hub: CALLBACK_TYPE | None = None
+        if (hub_cls := _HUB_FOR_FEED.get(self.feed_type)) is not None:
+            self._hub = async_get_hub(hass, hub_cls, self._middle_url)
+        else:
+            self.poller = AdaptiveInterval(
+                UPDATE_INTERVALS[self.feed_type], *self._poll_bounds
+            )
+
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}_{self.feed_type}",
-            update_interval=UPDATE_INTERVALS[self.feed_type],
+            update_interval=self.poller.interval if self.poller else None,
+            # A 304 hands back the previous object; skip the sensor rebuild.
+            always_update=False,
         )
+        self._snapshot_store: Store[dict[str, Any]] | None = None
+        self._snapshot_due = 0.0  # monotonic time the scheduled save runs
+        self._announcement_store: Store[dict[str, Any]] | None = None
+        self._announcements_due = 0.0  # monotonic time the scheduled save runs
+        self._announcements_loaded = False
+        self.metrics_scope = self.name
+        if self.config_entry is not None:
+            self._snapshot_store = _snapshot_store(hass, self.config_entry.entry_id)
+            if self.announcements is not None:
+                self._announcement_store = _announcement_store(
+                    hass, self.config_entry.entry_id
+                )
+            self.metrics_scope = self.config_entry.entry_id
 
-    async def _async_update_data(self) -> list[Any]:
-        client = IettMiddleClient(
-            async_get_clientsession(self.hass),
-            self._middle_url,
+    @property
+    def endpoint(self) -> str:
+        """Template of the iett-middle endpoint this entry's data comes from."""
+        if self._hub is not None:
+            return self._hub.endpoint
+        return _ENDPOINT_FOR_FEED[self.feed_type]
+
+    @property
+    def _route(self) -> str:
+        return route_key(self._hat_kodu) or ""
+
+    @property
+    def _hub_context(self) -> str:
+        if self.feed_type in (FEED_ROUTE_FLEET, FEED_ROUTE_BUNDLE):
+            return self._route
+        if self.feed_type == FEED_STOP_ARRIVALS:
+            return self._dcode
+        return FEED_ALL_FLEET
+
+    @property
+    def phase_key(self) -> str:
+        return self.metrics_scope
+
+    @property
+    def poll_phase(self) -> float | None:
+        """Where in its interval this entry's data is polled (0–1), if on a timer."""
+        return self.phases.phase((self._hub or self).phase_key)
+
+    @property
+    def motion(self) -> MotionTracker | None:
+        """Motion history of the shared fleet poll, for fleet feeds."""
+        return self._hub.motion if isinstance(self._hub, IettFleetHub) else None
+
+    @property
+    def effective_interval(self) -> timedelta | None:
+        """The poll interval currently applied to this entry's data."""
+        if self._hub is not None:
+            return self._hub.update_interval
+        return self.update_interval
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, subscribing to the hub on demand.
+
+        The subscription carries the entry's poll bounds and its ``hedge``
+        and ``push`` options.
+        """
+        remove = super().async_add_listener(update_callback, context)
+        if self._hub is not None and self._unsub_hub is None:
+            self._unsub_hub = self._hub.async_add_listener(
+                self._handle_hub_update, self._hub_context
+            )
+            self._hub.async_set_poll_bounds(self, self._poll_bounds)
+            self._hub.async_set_hedge(self, self._hedge)
+            self._hub.async_set_push(self, self._push)
+
+        @callback
+        def remove_listener() -> None:
+            remove()
+            if not self._listeners:
+                self._async_unsub_hub()
+
+        return remove_listener
+
+    @callback
+    def _async_unsub_hub(self) -> None:
+        if self._unsub_hub:
+            self._unsub_hub()
+            self._unsub_hub = None
+            assert self._hub is not None
+            self._hub.async_set_poll_bounds(self, None)
+            self._hub.async_set_hedge(self, False)
+            self._hub.async_set_push(self, False)
+
+    @callback
+    def _handle_hub_update(self) -> None:
+        hub = self._hub
+        assert hub is not None
+        if not hub.last_update_success:
+            self.async_set_update_error(
+                UpdateFailed(f"iett-middle error: {hub.last_exception}")
+            )
+            return
+        start = time.perf_counter() if self.timings.enabled else None
+        try:
+            data = self._hub_slice()
+        except UpdateFailed as err:
+            self.async_set_update_error(err)
+            return
+        unchanged = self._is_unchanged(data)
+        if not unchanged:
+            self._on_new_data(data)
+        if start is not None:
+            self.timings.record(
+                self.metrics_scope, REFRESH, (time.perf_counter() - start) * 1000
+            )
+        if not unchanged:
+            self.async_set_updated_data(data)
+
+    def _hub_slice(self) -> Any:
+        hub = self._hub
+        if self.feed_type == FEED_ZONE_FLEET:
+            assert isinstance(hub, IettFleetHub)
+            return hub.zone_buses(*self._zone_circle())
+        assert hub is not None
+        return hub.hub_slice(self._hub_context)
+
+    def _zone_circle(self) -> tuple[float, float, float]:
+        """Centre and radius (metres) of the entry's zone, read from its state."""
+        state = self.hass.states.get(self._zone)
+        attrs: Any = state.attributes if state is not None else {}
+        try:
+            radius = self._radius or attrs.get("radius", 0)
+            return float(attrs[ATTR_LATITUDE]), float(attrs[ATTR_LONGITUDE]), float(radius)
+        except (KeyError, TypeError, ValueError) as err:
+            raise UpdateFailed(f"Zone {self._zone} has no usable location") from err
+
+    def _is_unchanged(self, data: Any) -> bool:
+        """Whether listeners already hold *data*; counts the skipped write.
+
+        The very object listeners hold (a 304 or a repeated body) is known
+        by identity, anything else by fingerprint. Skipping it spares the
+        sensors their attribute rebuild and state write; the skips are
+        counted in :attr:`skipped_writes`.
+        """
+        if data is not self.data:
+            new = _fingerprint(data)
+            if new != self.fingerprint:
+                self.fingerprint = new
+                return False
+        if self.data is None or not self.last_update_success:
+            return False
+        self.skipped_writes += 1
+        return True
+
+    def _on_new_data(self, data: Any) -> None:
+        """Bookkeeping for a payload that differs from what listeners hold."""
+        if self.feed_type == FEED_ROUTE_SCHEDULE:
+            # Parsed once here; sensors then only bisect into it.
+            self.schedule = ScheduleIndex(data)
+        elif self.feed_type == FEED_ROUTE_ANNOUNCEMENTS:
+            self._track_announcements(data)
+        self._schedule_snapshot()
+
+    def _schedule_snapshot(self) -> None:
+        """Have the snapshot written within SNAPSHOT_SAVE_DELAY of this change.
+
+        The store restarts its timer on every call, so calling it on each
+        change of a feed polled more often than the delay would put the
+        write off until shutdown. Only the first change of each window
+        schedules one; the write dumps whatever :attr:`data` is by then.
+        """
+        if self._snapshot_store is None:
+            return
+        now = time.monotonic()
+        if now < self._snapshot_due:
+            return
+        self._snapshot_due = now + SNAPSHOT_SAVE_DELAY
+        self._snapshot_store.async_delay_save(self._dump_snapshot, SNAPSHOT_SAVE_DELAY)
+
+    async def _async_load_announcements(self) -> None:
+        """Read the seen announcements back before the first diff."""
+        if self._announcements_loaded or self.announcements is None:
+            return
+        self._announcements_loaded = True
+        if self._announcement_store is None:
+            return
+        try:
+            self.announcements.load(await self._announcement_store.async_load())
+        except Exception:  # noqa: BLE001 — at worst old alerts are reported again
+            _LOGGER.debug("Ignoring unreadable announcements for %s", self.name, exc_info=True)
+
+    def _track_announcements(self, items: list[Announcement]) -> None:
+        """Fire an event per announcement change and save the seen set.
+
+        Changes go out as ``iett_announcement_added``, ``_updated`` or
+        ``_removed``. The seen set is saved per entry, so a restart does not
+        report the same alerts again.
+        """
+        tracker = self.announcements
+        assert tracker is not None
+        baseline = not tracker.primed
+        changes = tracker.update(items)
+        for change in changes:
+            self.hass.bus.async_fire(
+                _EVENT_FOR_CHANGE[change.kind], self._announcement_event(change)
+            )
+        if (changes or baseline) and self._announcement_store is not None:
+            self._announcements_due = time.monotonic() + ANNOUNCEMENTS_SAVE_DELAY
+            self._announcement_store.async_delay_save(tracker.dump, ANNOUNCEMENTS_SAVE_DELAY)
+
+    def _announcement_event(self, change: AnnouncementChange) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "entry_id": self.config_entry.entry_id if self.config_entry else None,
+            "key": change.key,
+            **change.announcement.as_dict(),
+        }
+        if change.previous is not None:
+            data["previous"] = {"key": change.previous_key, **change.previous.as_dict()}
+        return data
+
+    def _dump_snapshot(self) -> dict[str, Any]:
+        return {
+            "feed_type": self.feed_type,
+            "saved": time.time(),
+            "data": [item.as_dict() for item in self.data or []],
+        }
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last saved payload as current data; return whether one was.
+
+        Snapshots older than :data:`SNAPSHOT_MAX_AGE` for the feed are
+        ignored. Without a snapshot the coordinator is marked as not yet
+        updated, so its entities stay unavailable until the first refresh.
+        """
+        stored = None
+        if self._snapshot_store is not None:
+            try:
+                stored = await self._snapshot_store.async_load()
+            except Exception:  # noqa: BLE001 — a broken snapshot must not block setup
+                _LOGGER.debug("Ignoring unreadable snapshot for %s", self.name, exc_info=True)
+        try:
+            if (
+                not stored
+                or stored["feed_type"] != self.feed_type
+                or time.time() - stored["saved"] > SNAPSHOT_MAX_AGE[self.feed_type]
+            ):
+                raise LookupError
+            data = _restore_payload(self.feed_type, stored["data"])
+        except (LookupError, TypeError):
+            self.last_update_success = False
+            return False
+        self.fingerprint = _fingerprint(data)
+        if self.feed_type == FEED_ROUTE_SCHEDULE:
+            self.schedule = ScheduleIndex(data)
+        self.data = data
+        self.last_update_success = True
+        return True
+
+    async def async_startup_refresh(self, started: float) -> None:
+        """First refresh for fast start, staggered against other entries.
+
+        *started* is the ``time.monotonic()`` at which setup began;
+        :attr:`startup_time` records how long until fresh data arrived.
+        """
+        stagger: StartupStagger = self.hass.data.setdefault(
+            DATA_STARTUP, StartupStagger(STARTUP_STAGGER)
         )
+        if delay := stagger.delay(self._hub or self, time.monotonic()):
+            await asyncio.sleep(delay)
+        await self.async_refresh()
+        self.startup_time = time.monotonic() - started
+        _LOGGER.debug(
+            "%s ready %.2fs after setup (%s)",
+            self.name,
+            self.startup_time,
+            "ok" if self.last_update_success else "failed",
+        )
+
+    async def async_shutdown(self) -> None:
+        """Drop the hub subscription along with any scheduled refresh.
+
+        Snapshot and announcement saves still pending are written now: left
+        to their timers on these stores, they would land after
+        :func:`async_remove_snapshot` (or over the reloaded entry's newer
+        files).
+        """
+        self._async_unsub_hub()
+        if (calendar := self.hass.data.get(DATA_SERVICE_CALENDAR)) is not None:
+            calendar.remove(self)
+        now = time.monotonic()
+        if self._snapshot_store is not None and now < self._snapshot_due:
+            self._snapshot_due = 0.0
+            await self._snapshot_store.async_save(self._dump_snapshot())
+        if self._announcement_store is not None and now < self._announcements_due:
+            assert self.announcements is not None
+            self._announcements_due = 0.0
+            await self._announcement_store.async_save(self.announcements.dump())
+        await super().async_shutdown()
+
+    async def _async_update_data(self) -> list[Any]:
+        """Fetch and compare; timed, without the listeners, while timings are on."""
+        start = time.perf_counter() if self.timings.enabled else None
+        await self._async_load_announcements()
+        data = await self._async_fetch()
+        unchanged = self._is_unchanged(data)
+        if not unchanged:
+            self._on_new_data(data)
+        if self.poller is not None:
+            self._adapt(data, not unchanged)
+        if start is not None:
+            self.timings.record(
+                self.metrics_scope, REFRESH, (time.perf_counter() - start) * 1000
+            )
+        # Handing back the held object lets always_update=False skip listeners.
+        return self.data if unchanged else data
+
+    def _adapt(self, data: list[Any], changed: bool) -> None:
+        assert self.poller is not None
+        if self.feed_type == FEED_ROUTE_SCHEDULE:
+            if self.schedule is not None:  # also when restored from a snapshot
+                _async_set_service(self.hass, self, self._route, self.schedule)
+            self.update_interval = self.poller.update(changed)
+        elif self.feed_type == FEED_STOP_BOARD:
+            self._board_routes.update(_route_keys(data))
+            self.update_interval = self.poller.update(
+                changed, _min_eta(data), _minutes_to_service(self.hass, self._board_routes)
+            )
+        else:
+            self.update_interval = self.poller.update(
+                changed, None, _minutes_to_service(self.hass, (self._route,))
+            )
+
+    async def _async_fetch(self) -> list[Any]:
+        if self._hub is not None:
+            data = await self._hub.async_fetch(self._hub_context)
+            return self._hub_slice() if self.feed_type == FEED_ZONE_FLEET else data
+
+        client = async_get_client(self.hass, self._middle_url)
         try:
-            if self.feed_type == FEED_ALL_FLEET:
-                return await client.get_all_buses()  # type: ignore[return-value]
-            if self.feed_type == FEED_ROUTE_FLEET:
-                return await client.get_route_buses(self._hat_kodu)  # type: ignore[return-value]
-            if self.feed_type == FEED_STOP_ARRIVALS:
-                return await client.get_stop_arrivals(self._dcode)  # type: ignore[return-value]
             if self.feed_type == FEED_ROUTE_SCHEDULE:
                 return await client.get_route_schedule(self._hat_kodu)  # type: ignore[return-value]
             if self.feed_type == FEED_ROUTE_ANNOUNCEMENTS:
                 return await client.get_announcements(self._hat_kodu)  # type: ignore[return-value]
+            if self.feed_type == FEED_STOP_BOARD:
+                return await self._fetch_board(client)  # type: ignore[return-value]
         except IettMiddleError as err:
             raise UpdateFailed(f"iett-middle error: {err}") from err
         raise UpdateFailed(f"Unknown feed type: {self.feed_type}")
+
+    async def _fetch_board(self, client: IettMiddleClient) -> list[BoardDeparture]:
+        """Every board stop at once, at most ARRIVALS_MAX_CONCURRENCY in flight.
+
+        A stop that fails is left off the board and listed in
+        :attr:`stop_errors`; the board only fails when every stop does.
+        """
+        semaphore = asyncio.Semaphore(ARRIVALS_MAX_CONCURRENCY)
+
+        async def _one(stop: BoardStop) -> list[Arrival]:
+            async with semaphore:
+                return await client.get_stop_arrivals(stop.dcode, stop.via, hedge=self._hedge)
+
+        results = await asyncio.gather(
+            *(_one(stop) for stop in self._stops), return_exceptions=True
+        )
+        fetched: list[tuple[BoardStop, list[Arrival]]] = []
+        errors: dict[str, IettMiddleError] = {}
+        for stop, res in zip(self._stops, results):
+            if isinstance(res, IettMiddleError):
+                errors[str(stop)] = res
+            elif isinstance(res, BaseException):
+                raise res
+            else:
+                fetched.append((stop, res))
+        self.stop_errors = errors
+        if errors and not fetched:
+            raise next(iter(errors.values()))
+        return merge(fetched)
+
+
+class IettRouteBundleCoordinator(IettCoordinator):
+    """A whole route — fleet, schedule and announcements — in one coordinator.
+
+    The fleet part is the route's slice of the shared fleet hub, pushed
+    after every hub refresh as for ``route_fleet`` entries. Schedule and
+    announcements are polled on this coordinator's single timer, each at
+    its own feed's interval (see :class:`Cadence`): parts falling due
+    together are fetched in one gather, and the timer is always set for
+    the next part due, so a followed line costs one timer instead of three.
+
+    Data is a :class:`RouteBundle`. A part whose fetch fails keeps its last
+    data and is marked in :attr:`RouteBundle.failed`, so only its own
+    sensor goes unavailable; the update as a whole fails only while nothing
+    at all has loaded.
+    """
+
+    # The timer is aimed at the next part due; a phase would only delay it.
+    _phased = False
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_data: dict[str, Any],
+        options: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(hass, entry_data, options)
+        self.cadence = Cadence(
+            {
+                part: UPDATE_INTERVALS[part]
+                for part in BUNDLE_PARTS
+                if part != FEED_ROUTE_FLEET  # pushed by the hub
+            }
+        )
+
+    def part_interval(self, part: str) -> timedelta | None:
+        """The poll interval currently applied to *part*."""
+        if part == FEED_ROUTE_FLEET:
+            return self.effective_interval
+        return timedelta(seconds=self.cadence.intervals[part])
+
+    @callback
+    def _handle_hub_update(self) -> None:
+        # Pushing data reschedules our own timer from now; keep it aimed at
+        # the next part due rather than a full interval away.
+        self.update_interval = self.cadence.until_next(time.monotonic())
+        hub = self._hub
+        assert hub is not None
+        if self.data is None or hub.last_update_success:
+            super()._handle_hub_update()
+            return
+        data = self.data.with_parts({}, self.data.failed | {FEED_ROUTE_FLEET})
+        if not self._is_unchanged(data):
+            self.async_set_updated_data(data)
+
+    def _hub_slice(self) -> RouteBundle:
+        bundle = self.data or RouteBundle(self._hat_kodu)
+        return bundle.with_parts(
+            {FEED_ROUTE_FLEET: super()._hub_slice()}, bundle.failed - {FEED_ROUTE_FLEET}
+        )
+
+    def _on_new_data(self, data: RouteBundle) -> None:
+        if data.schedule is not None and (
+            self.data is None or data.schedule is not self.data.schedule
+        ):
+            self.schedule = ScheduleIndex(data.schedule)
+            _async_set_service(self.hass, self, self._route, self.schedule)
+        if data.announcements is not None and (
+            self.data is None or data.announcements is not self.data.announcements
+        ):
+            self._track_announcements(data.announcements)
+        super()._on_new_data(data)
+
+    def _dump_snapshot(self) -> dict[str, Any]:
+        return {
+            "feed_type": self.feed_type,
+            "saved": time.time(),
+            "data": self.data.as_dict() if self.data is not None else None,
+        }
+
+    async def async_restore_snapshot(self) -> bool:
+        if not await super().async_restore_snapshot():
+            return False
+        if self.data.schedule is not None:
+            self.schedule = ScheduleIndex(self.data.schedule)
+            _async_set_service(self.hass, self, self._route, self.schedule)
+        return True
+
+    async def _async_update_data(self) -> RouteBundle:
+        start = time.perf_counter() if self.timings.enabled else None
+        await self._async_load_announcements()
+        now = time.monotonic()
+        client = async_get_client(self.hass, self._middle_url)
+        bundle = self.data or RouteBundle(self._hat_kodu)
+        calls: dict[str, Awaitable[Any]] = {}
+        for part in self.cadence.due(now):
+            if part == FEED_ROUTE_SCHEDULE:
+                calls[part] = client.get_route_schedule(self._hat_kodu)
+            else:
+                calls[part] = client.get_announcements(self._hat_kodu)
+        if bundle.fleet is None:
+            # Until the hub's first push, fetch the slice along with the rest.
+            assert self._hub is not None
+            calls[FEED_ROUTE_FLEET] = self._hub.async_fetch(self._hub_context)
+
+        results = await asyncio.gather(*calls.values(), return_exceptions=True)
+        fetched: dict[str, Any] = {}
+        failed = set(bundle.failed)
+        errors: list[Exception] = []
+        for part, res in zip(calls, results):
+            if isinstance(res, (IettMiddleError, UpdateFailed)):
+                failed.add(part)
+                errors.append(res)
+            elif isinstance(res, BaseException):
+                raise res
+            else:
+                failed.discard(part)
+                fetched[part] = res
+            if part != FEED_ROUTE_FLEET:
+                self.cadence.done(part, now, ok=part in fetched)
+        self.update_interval = self.cadence.until_next(time.monotonic())
+        if errors and not fetched and self.data is None:
+            if isinstance(err := errors[0], UpdateFailed):
+                raise err
+            raise UpdateFailed(f"iett-middle error: {err}") from err
+
+        data = bundle.with_parts(fetched, frozenset(failed))
+        unchanged = self._is_unchanged(data)
+        if not unchanged:
+            self._on_new_data(data)
+        if start is not None:
+            self.timings.record(
+                self.metrics_scope, REFRESH, (time.perf_counter() - start) * 1000
+            )
+        return self.data if unchanged else data
+
+
+def create_coordinator(
+    hass: HomeAssistant,
+    entry_data: dict[str, Any],
+    options: dict[str, Any] | None = None,
+) -> IettCoordinator:
+    """The coordinator for an entry, of the class its feed type needs."""
+    if entry_data.get("feed_type") == FEED_ROUTE_BUNDLE:
+        return IettRouteBundleCoordinator(hass, entry_data, options)
+    return IettCoordinator(hass, entry_data, options)
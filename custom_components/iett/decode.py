@@ -0,0 +1,196 @@
+"""Fast, tolerant construction of the API models from decoded JSON.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, Generic, TypeVar
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # plain Python without Home Assistant's dependencies
+    from json import loads as json_loads  # noqa: F401 — re-exported
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Errors that mean "this row cannot be the model", as opposed to a bug.
+_ROW_ERRORS = (KeyError, TypeError, ValueError, AttributeError)
+
+
+def _to_str(value: Any) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError(f"expected str, got {type(value).__name__}")
+
+
+def _to_int(value: Any) -> int:
+    # Fractional values (a speed of 12.5) round rather than cost the row.
+    if isinstance(value, str):
+        value = value.strip()
+    elif not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise TypeError(f"expected int, got {type(value).__name__}")
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"expected int, got {value!r}")
+    return int(round(number))
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return float(value.strip())
+    raise TypeError(f"expected float, got {type(value).__name__}")
+
+
+_COERCE: dict[str, tuple[type, Callable[[Any], Any]]] = {
+    "str": (str, _to_str),
+    "int": (int, _to_int),
+    "float": (float, _to_float),
+}
+
+
+def _or_none(coerce: Callable[[Any], Any], value: Any) -> Any:
+    try:
+        return coerce(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compile(cls: type[_T]) -> Callable[[dict[str, Any]], _T]:
+    """Generate a constructor for dataclass *cls* from its annotations.
+
+    Each field is read by name and checked with an exact class test, so
+    well-formed rows pay one comparison per field; anything else goes
+    through the field's coercer. Required fields that are missing or will
+    not coerce raise; optional ones fall back to ``None``.
+    """
+    env: dict[str, Any] = {"cls": cls, "or_none": _or_none}
+    lines = ["def build(item):"]
+    args = []
+    for i, f in enumerate(fields(cls)):
+        annotation = str(f.type).replace(" ", "")
+        optional = annotation.endswith("|None")
+        base = annotation.removesuffix("|None")
+        if base not in _COERCE:
+            raise TypeError(f"{cls.__name__}.{f.name}: cannot decode {f.type!r}")
+        exact, coerce = _COERCE[base]
+        env[f"t{i}"], env[f"c{i}"] = exact, coerce
+        var = f"v{i}"
+        if f.default is MISSING:
+            lines.append(f"    {var} = item[{f.name!r}]")
+        else:
+            env[f"d{i}"] = f.default
+            lines.append(f"    {var} = item.get({f.name!r}, d{i})")
+        if optional:
+            lines.append(f"    if {var} is not None and {var}.__class__ is not t{i}:")
+            lines.append(f"        {var} = or_none(c{i}, {var})")
+        else:
+            lines.append(f"    if {var}.__class__ is not t{i}:")
+            lines.append(f"        {var} = c{i}({var})")
+        args.append(var)
+    lines.append(f"    return cls({', '.join(args)})")
+    exec("\n".join(lines), env)  # noqa: S102 — source built from field names only
+    build: Callable[[dict[str, Any]], _T] = env["build"]
+    return build
+
+
+@dataclass
+class DecodeStats:
+    """Rows seen and skipped, and unknown fields by name."""
+
+    rows: int = 0
+    skipped: int = 0
+    unknown_fields: Counter[str] = field(default_factory=Counter)
+    last_error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "skipped": self.skipped,
+            "unknown_fields": dict(self.unknown_fields),
+            "last_error": self.last_error,
+        }
+
+
+class ModelDecoder(Generic[_T]):
+    """Builds *cls* instances from JSON objects, tolerating schema drift.
+
+    Fields iett-middle adds are ignored (and counted by name), numbers and
+    numeric strings are coerced to the field's type, and a row that still
+    cannot be a model is skipped and counted instead of failing the batch.
+
+    Only rows whose key count differs from the model's field count are
+    searched for unknown fields, so complete rows skip the set difference.
+    A row that both lacks a field and adds one, in equal numbers, goes
+    uncounted, though the extra field is still dropped.
+    """
+
+    def __init__(self, cls: type[_T]) -> None:
+        self.cls = cls
+        self.stats = DecodeStats()
+        self._known = frozenset(f.name for f in fields(cls))  # type: ignore[arg-type]
+        self._width = len(self._known)
+        self._build = _compile(cls)
+
+    def one(self, item: Any) -> _T | None:
+        """*item* as a model, or ``None`` if it cannot be one."""
+        self.stats.rows += 1
+        try:
+            if len(item) != self._width:
+                self._note_unknown(item)
+            return self._build(item)
+        except _ROW_ERRORS as err:
+            self._skip(err)
+            return None
+
+    def many(self, items: Iterable[Any]) -> list[_T]:
+        """Every row of the JSON array *items* that can be a model."""
+        if not isinstance(items, list):
+            raise TypeError(f"expected a list of {self.cls.__name__}, got {type(items).__name__}")
+        build, width = self._build, self._width
+        out: list[_T] = []
+        append = out.append
+        for item in items:
+            try:
+                if len(item) != width:
+                    self._note_unknown(item)
+                append(build(item))
+            except _ROW_ERRORS as err:
+                self._skip(err)
+        self.stats.rows += len(items)
+        return out
+
+    def _note_unknown(self, item: dict[str, Any]) -> None:
+        unknown = self.stats.unknown_fields
+        for name in item.keys() - self._known:
+            if name not in unknown:
+                _LOGGER.debug("Ignoring unknown %s field %r", self.cls.__name__, name)
+            unknown[name] += 1
+
+    def _skip(self, err: Exception) -> None:
+        self.stats.skipped += 1
+        self.stats.last_error = f"{type(err).__name__}: {err}"
+        _LOGGER.debug("Skipping %s row: %s", self.cls.__name__, self.stats.last_error)
+
+
+_DECODERS: dict[type, ModelDecoder[Any]] = {}
+
+
+def decoder(cls: type[_T]) -> ModelDecoder[_T]:
+    """The shared decoder for model *cls*."""
+    if (found := _DECODERS.get(cls)) is None:
+        found = _DECODERS[cls] = ModelDecoder(cls)
+    return found
+
+
+def decode_stats() -> dict[str, dict[str, Any]]:
+    """Counters of every decoder used so far, by model name."""
+    return {cls.__name__: d.stats.as_dict() for cls, d in _DECODERS.items()}
@@ -0,0 +1,81 @@
+"""Diagnostics download: entry setup, client/cache/decoder counters and hot-path timings."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .bundle import RouteBundle
+from .const import (
+    BUNDLE_PARTS,
+    CONF_MIDDLE_URL,
+    DATA_CACHE,
+    DATA_CLIENTS,
+    DATA_PHASES,
+    DATA_PUSH,
+    DOMAIN,
+)
+from .coordinator import IettCoordinator, async_get_timings
+from .decode import decode_stats
+
+TO_REDACT = {CONF_MIDDLE_URL}
+
+
+def _items(data: Any) -> int | dict[str, int | None]:
+    """Item count, per part for route bundles (``None`` while not loaded)."""
+    if isinstance(data, RouteBundle):
+        return {
+            part: None if (rows := data.part(part)) is None else len(rows)
+            for part in BUNDLE_PARTS
+        }
+    return len(data or [])
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    coordinator: IettCoordinator = hass.data[DOMAIN][entry.entry_id]
+    url = entry.data[CONF_MIDDLE_URL].rstrip("/")
+    client = hass.data.get(DATA_CLIENTS, {}).get(url)
+    cache = hass.data.get(DATA_CACHE)
+    push = hass.data.get(DATA_PUSH, {}).get(url)
+    phases = hass.data.get(DATA_PHASES, {}).get(url)
+    timings = async_get_timings(hass)
+    interval = coordinator.effective_interval
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "feed_type": coordinator.feed_type,
+            "endpoint": coordinator.endpoint,
+            "last_update_success": coordinator.last_update_success,
+            "items": _items(coordinator.data),
+            "skipped_writes": coordinator.skipped_writes,
+            "poll_interval": None if interval is None else interval.total_seconds(),
+            "poll_phase": coordinator.poll_phase,
+            "startup_time": coordinator.startup_time,
+            "announcements_seen": None
+            if coordinator.announcements is None
+            else len(coordinator.announcements),
+        },
+        "client": None
+        if client is None
+        else {
+            **asdict(client.stats),
+            "bytes_saved": client.stats.bytes_saved,
+            "breaker": client.breaker.as_dict(),
+        },
+        "push": None if push is None else push.as_dict(),
+        "phases": None if phases is None else phases.as_dict(),
+        "decode": decode_stats(),
+        "cache": None if cache is None else {**asdict(cache.stats), "entries": len(cache)},
+        "timings": {
+            "enabled": timings.enabled,
+            **timings.as_dict({coordinator.endpoint, coordinator.metrics_scope}),
+        },
+    }
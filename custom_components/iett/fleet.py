@@ -0,0 +1,409 @@
+"""Columnar fleet snapshots and the keyed store fed by the /v1/fleet deltas.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import logging
+import sys
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from .client import IettMiddleClient, IettMiddleError
+from .models import BusPosition, FleetDelta
+
+_LOGGER = logging.getLogger(__name__)
+
+# iett-middle answers 410 Gone when a cursor has fallen out of its history.
+_CURSOR_EXPIRED = 410
+
+# Repeated text fields stored as codes into a shared StringTable.
+_ENCODED = ("operator", "route_code", "route_name", "direction", "nearest_stop")
+# Mostly-unique text fields kept as plain lists.
+_PLAIN = ("kapino", "plate", "last_seen")
+_ARRAYS = (*_ENCODED, "latitude", "longitude", "speed")
+_COLUMNS = (*_PLAIN, *_ARRAYS)
+_SPEED_MAX = 0xFFFF
+
+
+def route_key(route_code: str | None) -> str | None:
+    """Normalise a route code for index lookups (``" 14m"`` → ``"14M"``)."""
+    return route_code.strip().upper() if route_code else None
+
+
+def _kapino_hash(kapino: str) -> int:
+    return zlib.crc32(kapino.encode())
+
+
+class StringTable:
+    """Append-only dictionary of interned strings; code 0 is ``None``."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self) -> None:
+        self.values: list[str | None] = [None]
+        self._codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        if (code := self._codes.get(value)) is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+
+def _column(name: str) -> property:
+    def get(row: FleetRow) -> Any:
+        return getattr(row._snap, name)[row._i]
+
+    return property(get)
+
+
+def _encoded_column(name: str) -> property:
+    def get(row: FleetRow) -> Any:
+        snap = row._snap
+        return snap.strings.values[getattr(snap, name)[row._i]]
+
+    return property(get)
+
+
+class FleetRow:
+    """Lazy, read-only view of one bus in a :class:`FleetSnapshot`.
+
+    Exposes the same attributes as :class:`BusPosition` without
+    materialising one.
+    """
+
+    __slots__ = ("_snap", "_i")
+
+    kapino = _column("kapino")
+    latitude = _column("latitude")
+    longitude = _column("longitude")
+    speed = _column("speed")
+    last_seen = _column("last_seen")
+    plate = _column("plate")
+    operator = _encoded_column("operator")
+    route_code = _encoded_column("route_code")
+    route_name = _encoded_column("route_name")
+    direction = _encoded_column("direction")
+    nearest_stop = _encoded_column("nearest_stop")
+
+    def __init__(self, snap: FleetSnapshot, index: int) -> None:
+        self._snap = snap
+        self._i = index
+
+    def __repr__(self) -> str:
+        return f"FleetRow({self.kapino!r}, route_code={self.route_code!r})"
+
+    def to_position(self) -> BusPosition:
+        return BusPosition(**self.as_dict())
+
+    def as_dict(self) -> dict[str, Any]:
+        snap, i = self._snap, self._i
+        values = snap.strings.values
+        return {
+            "kapino": snap.kapino[i],
+            "latitude": snap.latitude[i],
+            "longitude": snap.longitude[i],
+            "speed": snap.speed[i],
+            "last_seen": snap.last_seen[i],
+            "plate": snap.plate[i],
+            "operator": values[snap.operator[i]],
+            "route_code": values[snap.route_code[i]],
+            "route_name": values[snap.route_name[i]],
+            "direction": values[snap.direction[i]],
+            "nearest_stop": values[snap.nearest_stop[i]],
+        }
+
+
+class FleetSnapshot:
+    """Immutable fleet stored as parallel columns.
+
+    Coordinates are ``array('d')``, speed ``array('H')`` and the repeated
+    text fields (operator, route, direction, nearest stop) are codes into a
+    :class:`StringTable` shared by every snapshot of one store. Indexing and
+    iteration yield :class:`FleetRow` views, so code written against
+    ``list[BusPosition]`` keeps working.
+    """
+
+    __slots__ = (
+        "strings",
+        "kapino",
+        "plate",
+        "last_seen",
+        "latitude",
+        "longitude",
+        "speed",
+        "operator",
+        "route_code",
+        "route_name",
+        "direction",
+        "nearest_stop",
+        "_index",
+        "_route_rows",
+        "_fingerprint",
+    )
+
+    def __init__(self, strings: StringTable) -> None:
+        self.strings = strings
+        self.kapino: list[str] = []
+        self.plate: list[str | None] = []
+        self.last_seen: list[str] = []
+        self.latitude = array("d")
+        self.longitude = array("d")
+        self.speed = array("H")
+        self.operator = array("I")
+        self.route_code = array("I")
+        self.route_name = array("I")
+        self.direction = array("I")
+        self.nearest_stop = array("I")
+        self._index: dict[str, int] = {}
+        self._route_rows: dict[str, list[int]] | None = None
+        self._fingerprint: int | None = None
+
+    @classmethod
+    def from_positions(
+        cls, buses: Iterable[BusPosition], strings: StringTable | None = None
+    ) -> FleetSnapshot:
+        snap = cls(strings if strings is not None else StringTable())
+        for bus in buses:
+            snap._put(bus)
+        return snap
+
+    def __len__(self) -> int:
+        return len(self.kapino)
+
+    def __iter__(self) -> Iterator[FleetRow]:
+        return (FleetRow(self, i) for i in range(len(self.kapino)))
+
+    def __getitem__(self, index: int) -> FleetRow:
+        if index < 0:
+            index += len(self.kapino)
+        if not 0 <= index < len(self.kapino):
+            raise IndexError(index)
+        return FleetRow(self, index)
+
+    def __contains__(self, kapino: object) -> bool:
+        return kapino in self._index
+
+    def __repr__(self) -> str:
+        return f"<FleetSnapshot {len(self)} buses>"
+
+    def get(self, kapino: str) -> FleetRow | None:
+        index = self._index.get(kapino)
+        return None if index is None else FleetRow(self, index)
+
+    def index_of(self, kapino: str) -> int | None:
+        """Row number of *kapino*, or ``None`` if it is not in the snapshot."""
+        return self._index.get(kapino)
+
+    def fingerprint(self) -> int:
+        """Content hash, equal for snapshots holding the same rows in order.
+
+        Hashes the raw column bytes; codes are only comparable within one
+        string table, so the table itself is part of the key.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = hash(
+                (
+                    self.strings,
+                    tuple(self.kapino),
+                    tuple(self.plate),
+                    tuple(self.last_seen),
+                    *(getattr(self, name).tobytes() for name in _ARRAYS),
+                )
+            )
+        return self._fingerprint
+
+    def to_positions(self) -> list[BusPosition]:
+        return [row.to_position() for row in self]
+
+    def route(self, hat_kodu: str) -> FleetSnapshot:
+        """Buses currently reporting *hat_kodu*, as their own snapshot."""
+        if self._route_rows is None:
+            values = self.strings.values
+            keys: dict[int, str] = {}
+            rows: dict[str, list[int]] = {}
+            for i, code in enumerate(self.route_code):
+                if not code:
+                    continue
+                if (key := keys.get(code)) is None:
+                    key = keys[code] = route_key(values[code]) or ""
+                rows.setdefault(key, []).append(i)
+            self._route_rows = rows
+        return self.take(self._route_rows.get(route_key(hat_kodu) or "", []))
+
+    def take(self, rows: list[int]) -> FleetSnapshot:
+        """A new snapshot holding only *rows*, sharing this string table."""
+        snap = FleetSnapshot(self.strings)
+        for name in _COLUMNS:
+            src = getattr(self, name)
+            getattr(snap, name).extend([src[i] for i in rows])
+        snap._index = {kapino: i for i, kapino in enumerate(snap.kapino)}
+        return snap
+
+    def updated(
+        self, changed: Iterable[BusPosition], removed: Iterable[str]
+    ) -> FleetSnapshot:
+        """Copy of this snapshot with a delta applied.
+
+        Columns are copied wholesale (memcpy for arrays); only removed and
+        changed rows are touched individually.
+        """
+        snap = FleetSnapshot(self.strings)
+        for name in _COLUMNS:
+            getattr(snap, name).extend(getattr(self, name))
+        snap._index = self._index.copy()
+        for kapino in removed:
+            snap._remove(kapino)
+        for bus in changed:
+            snap._put(bus)
+        return snap
+
+    def _put(self, bus: BusPosition) -> None:
+        encode = self.strings.encode
+        speed = min(max(int(bus.speed or 0), 0), _SPEED_MAX)
+        index = self._index.get(bus.kapino)
+        if index is None:
+            self._index[bus.kapino] = len(self.kapino)
+            self.kapino.append(bus.kapino)
+            self.plate.append(bus.plate)
+            self.last_seen.append(bus.last_seen)
+            self.latitude.append(bus.latitude)
+            self.longitude.append(bus.longitude)
+            self.speed.append(speed)
+            self.operator.append(encode(bus.operator))
+            self.route_code.append(encode(bus.route_code))
+            self.route_name.append(encode(bus.route_name))
+            self.direction.append(encode(bus.direction))
+            self.nearest_stop.append(encode(bus.nearest_stop))
+            return
+        self.plate[index] = bus.plate
+        self.last_seen[index] = bus.last_seen
+        self.latitude[index] = bus.latitude
+        self.longitude[index] = bus.longitude
+        self.speed[index] = speed
+        self.operator[index] = encode(bus.operator)
+        self.route_code[index] = encode(bus.route_code)
+        self.route_name[index] = encode(bus.route_name)
+        self.direction[index] = encode(bus.direction)
+        self.nearest_stop[index] = encode(bus.nearest_stop)
+
+    def _remove(self, kapino: str) -> None:
+        index = self._index.pop(kapino, None)
+        if index is None:
+            return
+        last = len(self.kapino) - 1
+        for name in _COLUMNS:
+            column = getattr(self, name)
+            if index != last:
+                column[index] = column[last]
+            column.pop()
+        if index != last:
+            self._index[self.kapino[index]] = index
+
+
+class FleetStore:
+    """The current fleet as a :class:`FleetSnapshot`, kept up to date by deltas.
+
+    Each change produces a new snapshot (so "changed" is visible by
+    identity) built by copying the columns and touching only the rows the
+    delta names; unchanged cycles keep the same snapshot object.
+
+    The checksum is ``"<count>-<xor of crc32(kapino)>"`` (hex, 8 digits),
+    the same formula iett-middle uses; it is maintained incrementally and
+    compared after every delta to catch drift.
+    """
+
+    def __init__(self) -> None:
+        self.snapshot = FleetSnapshot(StringTable())
+        self.cursor: str | None = None
+        self.delta_supported: bool | None = None
+        self._xor = 0
+        self._full: list[BusPosition] | None = None
+
+    def checksum(self) -> str:
+        return f"{len(self.snapshot)}-{self._xor:08x}"
+
+    def route_buses(self, hat_kodu: str) -> FleetSnapshot:
+        """Buses currently reporting *hat_kodu*."""
+        return self.snapshot.route(hat_kodu)
+
+    def replace(self, buses: Iterable[BusPosition]) -> None:
+        """Replace the whole fleet with *buses*.
+
+        A fresh string table is started so values no longer in use are
+        dropped.
+        """
+        self.snapshot = FleetSnapshot.from_positions(buses)
+        self._xor = 0
+        for kapino in self.snapshot.kapino:
+            self._xor ^= _kapino_hash(kapino)
+
+    def apply(self, delta: FleetDelta) -> bool:
+        """Apply *delta*; return whether anything changed."""
+        self.cursor = delta.cursor
+        if delta.reset:
+            self.replace(delta.changed)
+            return True
+        if not delta.changed and not delta.removed:
+            return False
+        snapshot = self.snapshot
+        removed = set(delta.removed)
+        for kapino in removed:
+            if kapino in snapshot:
+                self._xor ^= _kapino_hash(kapino)
+        added: set[str] = set()
+        for bus in delta.changed:
+            kapino = bus.kapino
+            if (kapino in removed or kapino not in snapshot) and kapino not in added:
+                added.add(kapino)
+                self._xor ^= _kapino_hash(kapino)
+        self.snapshot = self.snapshot.updated(delta.changed, delta.removed)
+        return True
+
+    async def async_sync(self, client: IettMiddleClient) -> bool:
+        """Bring the store up to date; return whether anything changed.
+
+        Falls back to full ``/v1/fleet`` downloads (still conditional) when
+        the server has no delta support, and resyncs from scratch when the
+        cursor expired or the checksum no longer matches.
+        """
+        if self.delta_supported is False:
+            buses = await client.get_all_buses()
+            if buses is self._full:
+                return False
+            self._full = buses
+            self.replace(buses)
+            return True
+
+        try:
+            delta = await client.get_fleet_delta(self.cursor)
+        except IettMiddleError as err:
+            if err.status != _CURSOR_EXPIRED or self.cursor is None:
+                raise
+            _LOGGER.debug("Fleet cursor %s expired, resyncing", self.cursor)
+            delta = await client.get_fleet_delta(None)
+
+        if delta.cursor is None:
+            _LOGGER.debug("iett-middle has no fleet delta support, using full fetches")
+            self.delta_supported = False
+            return self.apply(delta)
+        self.delta_supported = True
+
+        changed = self.apply(delta)
+        if delta.checksum is not None and delta.checksum != self.checksum():
+            _LOGGER.debug(
+                "Fleet checksum mismatch (%s != %s), resyncing",
+                self.checksum(),
+                delta.checksum,
+            )
+            self.apply(await client.get_fleet_delta(None))
+            changed = True
+        return changed
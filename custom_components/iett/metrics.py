@@ -0,0 +1,108 @@
+"""Rolling timings for the fetch, decode and state-write hot paths.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any
+
+# Samples kept per series; percentiles are over this window.
+DEFAULT_WINDOW = 128
+
+# Metric names shared by the recorders and the diagnostic sensors.
+LATENCY = "latency_ms"  # request sent → response headers
+DECODE = "decode_ms"  # body download + JSON decode (+ models when streamed)
+BUILD = "build_ms"  # model construction from decoded JSON
+BYTES = "bytes"  # decoded body size
+REFRESH = "refresh_ms"  # an entry's whole update, fetch or hub slice included
+ATTRIBUTES = "attributes_ms"  # sensor state/attribute rebuild
+WRITE = "write_ms"  # async_write_ha_state
+
+
+def _rank(ordered: list[float], q: float) -> float:
+    """Nearest-rank *q*-th percentile (0–100) of sorted, non-empty *ordered*."""
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+class Rolling:
+    """The last *window* samples of one quantity, plus lifetime count."""
+
+    __slots__ = ("_samples", "count")
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+
+    @property
+    def last(self) -> float | None:
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, q: float) -> float | None:
+        """Nearest-rank *q*-th percentile (0–100) of the window."""
+        return _rank(sorted(self._samples), q) if self._samples else None
+
+    def summary(self) -> dict[str, Any]:
+        if not self._samples:
+            return {"count": self.count}
+        ordered = sorted(self._samples)
+        return {
+            "count": self.count,
+            "last": round(self._samples[-1], 3),
+            "p50": round(_rank(ordered, 50), 3),
+            "p90": round(_rank(ordered, 90), 3),
+            "p99": round(_rank(ordered, 99), 3),
+            "max": round(ordered[-1], 3),
+        }
+
+
+class Timings:
+    """Rolling series keyed by ``(scope, metric)``; off until someone enables it.
+
+    Scopes are endpoint templates (``/v1/routes/{id}/schedule``) for the
+    client and entry ids for coordinators and sensors. Recorders check
+    :attr:`enabled` before timing anything, so a disabled instance costs a
+    single attribute read per call site.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self.window = window
+        self._series: dict[tuple[str, str], Rolling] = {}
+        self._owners: set[object] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._owners)
+
+    def enable(self, owner: object) -> None:
+        self._owners.add(owner)
+
+    def disable(self, owner: object) -> None:
+        """Drop *owner*'s claim; collected samples are kept."""
+        self._owners.discard(owner)
+
+    def record(self, scope: str, metric: str, value: float) -> None:
+        if not self._owners:
+            return
+        if (series := self._series.get((scope, metric))) is None:
+            series = self._series[(scope, metric)] = Rolling(self.window)
+        series.add(value)
+
+    def get(self, scope: str, metric: str) -> Rolling | None:
+        return self._series.get((scope, metric))
+
+    def as_dict(self, scopes: set[str] | None = None) -> dict[str, dict[str, Any]]:
+        """``{scope: {metric: summary}}``, optionally limited to *scopes*."""
+        out: dict[str, dict[str, Any]] = {}
+        for (scope, metric), series in sorted(self._series.items()):
+            if scopes is None or scope in scopes:
+                out.setdefault(scope, {})[metric] = series.summary()
+        return out
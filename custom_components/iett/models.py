@@ -4,11 +4,13 @@ Zero Home Assistant imports — usable in plain Python tests.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, asdict, fields, is_dataclass
+from operator import attrgetter
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class BusPosition:
     kapino: str
     latitude: float
@@ -78,5 +80,46 @@ class RouteStop:
         return asdict(self)
 
 
+@dataclass
+class FleetDelta:
+    """Changes to the fleet since a cursor (``/v1/fleet?since=<cursor>``).
+
+    ``reset`` means ``changed`` is the complete fleet and replaces whatever
+    the receiver held. ``cursor`` is ``None`` when the server does not speak
+    the delta protocol and answered with the plain fleet list.
+    """
+
+    cursor: str | None
+    reset: bool
+    changed: list[BusPosition]
+    removed: list[str]
+    checksum: str | None = None
+
+
+_ROW_KEYS: dict[type, Callable[[Any], Any]] = {}
+
+
+def _row_key(item: Any) -> Any:
+    cls = type(item)
+    if (key := _ROW_KEYS.get(cls)) is None:
+        if is_dataclass(cls):
+            key = attrgetter(*(f.name for f in fields(cls)))
+        elif cls is dict:
+            key = lambda d: tuple(d.items())  # noqa: E731
+        else:
+            key = lambda v: v  # noqa: E731
+        key = _ROW_KEYS[cls] = key
+    return key(item)
+
+
+def fingerprint(items: Iterable[Any]) -> int:
+    """Content hash of a list of models, equal for equal lists.
+
+    Hashes the field tuples directly, which is far cheaper than comparing
+    or serialising the models.
+    """
+    return hash(tuple(_row_key(item) for item in items))
+
+
 # Type alias for the coordinator payload
 FeedData = list[BusPosition] | list[Arrival] | list[ScheduledDeparture] | list[Announcement]
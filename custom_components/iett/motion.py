@@ -0,0 +1,176 @@
+"""Per-bus motion history: recent fixes and the heading, speed and dwell they imply.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Any
+
+from .fleet import FleetSnapshot
+
+# Fixes kept per bus.
+DEFAULT_CAPACITY = 8
+# A bus with no new fix for this long (seconds) is forgotten.
+DEFAULT_MAX_IDLE = 600.0
+# Moves shorter than this (metres) are GPS jitter: no new heading, and the
+# bus counts as standing still.
+STOPPED_RADIUS_M = 25.0
+# Dwell (seconds) after which a bus is reported as stopped.
+STOPPED_AFTER = 60.0
+# Weight of the newest segment in the smoothed speed.
+SPEED_SMOOTHING = 0.5
+
+_FIELDS = 3  # latitude, longitude, time
+_M_PER_DEGREE = math.pi * 6_371_000.0 / 180
+
+
+@dataclass(slots=True, frozen=True)
+class Motion:
+    """What a bus's recent fixes say about how it is moving."""
+
+    heading: float | None  # degrees clockwise from north, last real move
+    speed: float | None  # km/h, smoothed over successive fixes
+    dwell: float  # seconds spent within STOPPED_RADIUS_M of one spot
+    samples: int
+
+    @property
+    def stopped(self) -> bool:
+        return self.dwell >= STOPPED_AFTER
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "heading": None if self.heading is None else round(self.heading),
+            "speed_avg": None if self.speed is None else round(self.speed, 1),
+            "dwell": int(self.dwell),
+            "stopped": self.stopped,
+        }
+
+
+class _Track:
+    """Ring buffer of one bus's fixes plus the running derived values."""
+
+    __slots__ = (
+        "fixes", "head", "size", "last_seen",
+        "heading", "speed", "anchor_lat", "anchor_lon", "anchor_time",
+    )
+
+    def __init__(self, capacity: int) -> None:
+        self.fixes = array("d", bytes(8 * _FIELDS * capacity))
+        self.head = 0  # slot the next fix goes into
+        self.size = 0
+        self.last_seen: str | None = None
+        self.heading: float | None = None
+        self.speed: float | None = None
+        self.anchor_lat = self.anchor_lon = self.anchor_time = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return len(self.fixes) // _FIELDS
+
+    def fix(self, age: int) -> tuple[float, float, float]:
+        """``(latitude, longitude, time)`` of the fix *age* steps back (0 = newest)."""
+        i = (self.head - 1 - age) % self.capacity * _FIELDS
+        fixes = self.fixes
+        return fixes[i], fixes[i + 1], fixes[i + 2]
+
+    def add(self, lat: float, lon: float, now: float) -> None:
+        fixes, i = self.fixes, self.head * _FIELDS
+        if self.size:
+            # Local flat-earth metres: plenty at 15 s between fixes.
+            scale = math.cos(math.radians(lat))
+            j = (self.head - 1) % self.capacity * _FIELDS
+            dy = (lat - fixes[j]) * _M_PER_DEGREE
+            dx = (lon - fixes[j + 1]) * _M_PER_DEGREE * scale
+            moved = math.hypot(dx, dy)
+            if (dt := now - fixes[j + 2]) > 0:
+                kmh = moved / dt * 3.6
+                self.speed = (
+                    kmh
+                    if self.speed is None
+                    else SPEED_SMOOTHING * kmh + (1 - SPEED_SMOOTHING) * self.speed
+                )
+            if moved >= STOPPED_RADIUS_M:
+                self.heading = math.degrees(math.atan2(dx, dy)) % 360
+            if math.hypot(
+                (lat - self.anchor_lat) * _M_PER_DEGREE,
+                (lon - self.anchor_lon) * _M_PER_DEGREE * scale,
+            ) > STOPPED_RADIUS_M:
+                self.anchor_lat, self.anchor_lon, self.anchor_time = lat, lon, now
+        else:
+            self.anchor_lat, self.anchor_lon, self.anchor_time = lat, lon, now
+        fixes[i], fixes[i + 1], fixes[i + 2] = lat, lon, now
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def motion(self) -> Motion:
+        return Motion(
+            heading=self.heading,
+            speed=self.speed,
+            dwell=self.fix(0)[2] - self.anchor_time,
+            samples=self.size,
+        )
+
+
+class MotionTracker:
+    """Fixed-size fix history per ``kapino``, fed one fleet snapshot per cycle.
+
+    :meth:`update` is a single pass over the snapshot: a bus whose
+    ``last_seen`` is unchanged has no new fix and is skipped, any other gets
+    its fix appended and its heading, smoothed speed and dwell updated in
+    O(1). Memory is bounded by *capacity* fixes per bus; buses without a new
+    fix for *max_idle* seconds are dropped.
+    """
+
+    def __init__(
+        self, capacity: int = DEFAULT_CAPACITY, max_idle: float = DEFAULT_MAX_IDLE
+    ) -> None:
+        self.capacity = capacity
+        self.max_idle = max_idle
+        self._tracks: dict[str, _Track] = {}
+        self._snapshot: FleetSnapshot | None = None
+        self._next_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def update(self, snapshot: FleetSnapshot, now: float) -> int:
+        """Record the fixes in *snapshot* taken at *now*; return how many were new."""
+        if snapshot is self._snapshot:
+            return 0
+        self._snapshot = snapshot
+        tracks, capacity = self._tracks, self.capacity
+        fresh = 0
+        for kapino, lat, lon, seen in zip(
+            snapshot.kapino, snapshot.latitude, snapshot.longitude, snapshot.last_seen
+        ):
+            track = tracks.get(kapino)
+            if track is None:
+                track = tracks[kapino] = _Track(capacity)
+            elif track.last_seen == seen:
+                continue
+            track.last_seen = seen
+            track.add(lat, lon, now)
+            fresh += 1
+        if now >= self._next_sweep:
+            self._evict(now)
+        return fresh
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.max_idle
+        for kapino in [k for k, t in self._tracks.items() if t.fix(0)[2] < cutoff]:
+            del self._tracks[kapino]
+        self._next_sweep = now + self.max_idle / 10
+
+    def get(self, kapino: str) -> Motion | None:
+        track = self._tracks.get(kapino)
+        return None if track is None else track.motion()
+
+    def history(self, kapino: str) -> list[tuple[float, float, float]]:
+        """The bus's kept fixes as ``(latitude, longitude, time)``, oldest first."""
+        track = self._tracks.get(kapino)
+        if track is None:
+            return []
+        return [track.fix(age) for age in range(track.size - 1, -1, -1)]
@@ -0,0 +1,258 @@
+"""Adaptive poll intervals: faster near ETAs, slower for stale or idle feeds.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any
+
+from .schedule import ScheduleIndex
+
+# Unchanged cycles tolerated before the interval starts doubling.
+UNCHANGED_GRACE = 3
+# A bus this many minutes out (or closer) is polled at the floor interval.
+NEAR_ETA_MINUTES = 3
+# ETAs under this scale the interval down linearly towards the floor.
+SOON_ETA_MINUTES = 10
+# No scheduled departure for this long counts as outside service hours.
+IDLE_GAP_MINUTES = 60
+
+
+class ServiceCalendar:
+    """The loaded route schedules, by route, for telling when routes are idle.
+
+    Each route schedule entry registers its compiled :class:`ScheduleIndex`
+    under its route. A live feed asks about the routes it actually carries,
+    and only gets an answer when every one of them has a schedule loaded:
+    a route nobody loaded might be running right now. Lookups go through
+    the index, so they respect the day type of the service day.
+    """
+
+    def __init__(self) -> None:
+        self._by_owner: dict[object, tuple[str, ScheduleIndex]] = {}
+
+    def __len__(self) -> int:
+        return len({route for route, _ in self._by_owner.values()})
+
+    def set(self, owner: object, route: str, schedule: ScheduleIndex) -> None:
+        self._by_owner[owner] = (route, schedule)
+
+    def remove(self, owner: object) -> None:
+        self._by_owner.pop(owner, None)
+
+    def minutes_to_service(self, routes: Iterable[str], now: datetime) -> int | None:
+        """Minutes from *now* to the next departure on any of *routes*.
+
+        ``None`` when *routes* is empty, when any of them has no schedule
+        loaded, or when none has a departure within the next week, i.e.
+        nothing useful is known.
+        """
+        routes = set(routes)
+        if not routes:
+            return None
+        loaded: dict[str, list[ScheduleIndex]] = {}
+        for route, schedule in self._by_owner.values():
+            if route in routes:
+                loaded.setdefault(route, []).append(schedule)
+        if len(loaded) < len(routes):
+            return None
+        return min(
+            (
+                minutes
+                for schedules in loaded.values()
+                for schedule in schedules
+                if (minutes := schedule.minutes_to_next(now)) is not None
+            ),
+            default=None,
+        )
+
+
+class AdaptiveInterval:
+    """Next poll interval for one feed, kept within ``[floor, ceiling]``.
+
+    * Each unchanged cycle past :data:`UNCHANGED_GRACE` doubles the base
+      interval.
+    * An ETA within :data:`SOON_ETA_MINUTES` shortens it, down to the floor
+      at :data:`NEAR_ETA_MINUTES`.
+    * Outside service hours the ceiling is used, but never past the next
+      scheduled departure. A change seen in this cycle or a known ETA
+      within :data:`SOON_ETA_MINUTES` outranks that: buses are evidently
+      running, whatever the schedules say.
+    """
+
+    def __init__(self, base: timedelta, floor: timedelta, ceiling: timedelta) -> None:
+        self.base = base
+        self.floor = floor
+        self.ceiling = ceiling
+        self.unchanged = 0
+        self.interval = self._clamp(base.total_seconds())
+
+    def set_bounds(self, floor: timedelta, ceiling: timedelta) -> None:
+        self.floor = min(floor, ceiling)
+        self.ceiling = ceiling
+        self.interval = self._clamp(self.interval.total_seconds())
+
+    def _clamp(self, seconds: float) -> timedelta:
+        lo, hi = self.floor.total_seconds(), self.ceiling.total_seconds()
+        return timedelta(seconds=min(max(seconds, lo), hi))
+
+    def update(
+        self,
+        changed: bool,
+        min_eta: int | None = None,
+        minutes_to_service: int | None = None,
+    ) -> timedelta:
+        """Record one poll result and return the interval until the next."""
+        self.unchanged = 0 if changed else self.unchanged + 1
+        near = min_eta is not None and min_eta < SOON_ETA_MINUTES
+        if (
+            not changed
+            and not near
+            and minutes_to_service is not None
+            and minutes_to_service > IDLE_GAP_MINUTES
+        ):
+            seconds = min(self.ceiling.total_seconds(), minutes_to_service * 60)
+        else:
+            seconds = self.base.total_seconds()
+            if self.unchanged > UNCHANGED_GRACE:
+                seconds *= 2 ** min(self.unchanged - UNCHANGED_GRACE, 16)
+            if near:
+                assert min_eta is not None
+                if min_eta <= NEAR_ETA_MINUTES:
+                    seconds = 0.0
+                else:
+                    seconds = min(seconds, self.base.total_seconds() * min_eta / SOON_ETA_MINUTES)
+        self.interval = self._clamp(seconds)
+        return self.interval
+
+
+class StartupStagger:
+    """Hands out first-refresh delays so entries don't all fetch at once.
+
+    Each new *key* gets the next free slot, *spacing* seconds after the
+    previous one; callers sharing a key (entries on one hub) share a slot,
+    so their requests can still be batched. Slots in the past are free
+    again, so entries added long after startup start immediately.
+    """
+
+    def __init__(self, spacing: float) -> None:
+        self.spacing = spacing
+        self._next = 0.0
+        self._slots: dict[object, float] = {}
+
+    def delay(self, key: object, now: float) -> float:
+        """Seconds *key* should wait, measured from monotonic time *now*."""
+        self._slots = {k: at for k, at in self._slots.items() if at >= now}
+        if (at := self._slots.get(key)) is None:
+            at = self._slots[key] = max(now, self._next)
+            self._next = at + self.spacing
+        return at - now
+
+
+class PollPhases:
+    """Spreads the timers of everything polling one server over its interval.
+
+    Each registered poller holds a phase in ``[0, 1)``: with *n* of them,
+    the *k*-th (in order of registration) refreshes at ``k / n`` of its
+    interval, on a grid they all share, so pollers on one interval are
+    evenly spaced instead of firing in the same second. Adding or removing
+    a poller re-spreads the phases; each moves to its new one the next
+    time it schedules. Separately, at most *max_in_flight* refreshes hold
+    a :meth:`slot` at once.
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.waits = 0
+        self._phases: dict[str, float] = {}
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    def __len__(self) -> int:
+        return len(self._phases)
+
+    def add(self, key: str) -> None:
+        if key not in self._phases:
+            self._rebalance([*self._phases, key])
+
+    def remove(self, key: str) -> None:
+        if key in self._phases:
+            self._rebalance([k for k in self._phases if k != key])
+
+    def _rebalance(self, keys: list[str]) -> None:
+        self._phases = {key: i / len(keys) for i, key in enumerate(keys)}
+
+    def phase(self, key: str) -> float | None:
+        return self._phases.get(key)
+
+    def next_at(self, key: str, interval: float, now: float) -> float:
+        """When *key*, polling every *interval* seconds, should refresh next.
+
+        The first point of its phase at least half an interval after *now*:
+        a full interval apart in steady state, and never closer than half
+        of one while the poller moves to a new phase.
+        """
+        self.add(key)
+        offset = self._phases[key] * interval
+        return math.ceil((now + interval / 2 - offset) / interval) * interval + offset
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the :attr:`max_in_flight` refresh slots."""
+        if self._slots.locked():
+            self.waits += 1
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "waits": self.waits,
+            "phases": {key: round(phase, 3) for key, phase in self._phases.items()},
+        }
+
+
+class Cadence:
+    """Due times of several parts polled at different intervals by one timer.
+
+    A part is due once its interval has elapsed — or will within
+    :attr:`slack` of it — so parts falling due close together are fetched
+    in the same cycle instead of each waking the timer. A failed part is
+    tried again after *retry* seconds (or its own interval, if shorter).
+    All parts start out due.
+    """
+
+    def __init__(
+        self, intervals: dict[str, timedelta], slack: float = 0.1, retry: float = 60.0
+    ) -> None:
+        self.intervals = {part: i.total_seconds() for part, i in intervals.items()}
+        self.slack = slack
+        self.retry = retry
+        self._next: dict[str, float] = dict.fromkeys(intervals, float("-inf"))
+
+    def due(self, now: float) -> list[str]:
+        """Parts to fetch in the cycle starting at monotonic time *now*."""
+        return [
+            part
+            for part, at in self._next.items()
+            if at - self.slack * self.intervals[part] <= now
+        ]
+
+    def done(self, part: str, now: float, ok: bool = True) -> None:
+        """Record *part* as fetched at *now*, successfully or not."""
+        interval = self.intervals[part]
+        self._next[part] = now + (interval if ok else min(interval, self.retry))
+
+    def until_next(self, now: float) -> timedelta:
+        """Time from *now* until the next part is due (never negative)."""
+        return timedelta(seconds=max(min(self._next.values()) - now, 0.0))
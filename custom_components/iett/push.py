@@ -0,0 +1,197 @@
+"""Server-sent event streams from iett-middle, reopened whenever they drop.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any
+
+from .resilience import RetryPolicy
+
+_LOGGER = logging.getLogger(__name__)
+
+# Channels of ``/v1/stream``: the fleet's deltas, and one per stop.
+FLEET_CHANNEL = "fleet"
+STOP_CHANNEL_PREFIX = "stop:"
+# Not sent by the server: the client yields it once a stream is open.
+READY = "ready"
+
+# The server sends a heartbeat comment every 15 s; a stream silent for this
+# long (seconds) is treated as dropped.
+HEARTBEAT_TIMEOUT = 45.0
+# Reconnect backoff (seconds): full jitter, doubling up to the cap. After a
+# stream that was open the first retry starts from the base again.
+RECONNECT_BASE = 1.0
+RECONNECT_CAP = 60.0
+# A middle build without /v1/stream is asked again this rarely (seconds).
+UNSUPPORTED_RETRY = 300.0
+# Statuses meaning "no event streams here".
+_NO_STREAM = frozenset({404, 405, 501})
+# Channel changes made within this window (seconds) share one reconnect.
+_SETTLE = 0.05
+
+
+def stop_channel(dcode: str) -> str:
+    return f"{STOP_CHANNEL_PREFIX}{dcode}"
+
+
+@dataclass(slots=True)
+class PushEvent:
+    """One event from a stream: its channel and the parsed payload."""
+
+    channel: str
+    data: Any
+    id: str | None = None
+
+
+class SseParser:
+    """Splits ``text/event-stream`` text into ``(event, data, id)`` as it arrives.
+
+    Follows the WHATWG rules the server uses: ``data`` lines are joined
+    with newlines, comment lines (heartbeats) are skipped, and an event is
+    complete at the first blank line after it. Events without a name are
+    called ``message``.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._event = ""
+        self._data: list[str] = []
+        self._id: str | None = None
+
+    def feed(self, text: str) -> list[tuple[str, str, str | None]]:
+        lines = (self._buf + text).replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        self._buf = lines.pop()
+        events: list[tuple[str, str, str | None]] = []
+        for line in lines:
+            if not line:
+                if self._data:
+                    events.append((self._event or "message", "\n".join(self._data), self._id))
+                self._event, self._data = "", []
+                continue
+            if line.startswith(":"):
+                continue
+            name, _, value = line.partition(":")
+            value = value.removeprefix(" ")
+            if name == "event":
+                self._event = value
+            elif name == "data":
+                self._data.append(value)
+            elif name == "id":
+                self._id = value or None
+        return events
+
+
+class PushLink:
+    """One event stream kept open for a changing set of channels.
+
+    *connect* opens a stream for the given channels and yields
+    :class:`PushEvent`\\ s, :data:`READY` first. Every other event goes to
+    *on_event*; *on_state* hears when the stream opens (``True``) and when
+    it drops (``False``), so the caller can stop and resume polling. A
+    dropped stream is reopened after a jittered backoff — or after
+    :data:`UNSUPPORTED_RETRY` when the server has no streams at all — and
+    any change of channels reopens it with the new set.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[frozenset[str]], AsyncIterator[PushEvent]],
+        on_event: Callable[[PushEvent], None],
+        on_state: Callable[[bool], None],
+        retry: RetryPolicy | None = None,
+    ) -> None:
+        self._connect = connect
+        self._on_event = on_event
+        self._on_state = on_state
+        self.retry = retry if retry is not None else RetryPolicy(
+            base=RECONNECT_BASE, cap=RECONNECT_CAP
+        )
+        self.channels: frozenset[str] = frozenset()
+        self.connected = False
+        self.supported: bool | None = None
+        self.connects = 0
+        self.drops = 0
+        self.events = 0
+        self._last_event: float | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def set_channels(self, channels: Iterable[str]) -> None:
+        """Stream *channels* from now on; none closes the stream."""
+        channels = frozenset(channels)
+        if channels == self.channels:
+            return
+        self.channels = channels
+        self._cancel()
+        if channels:
+            self._task = asyncio.get_running_loop().create_task(self._run(channels))
+
+    async def stop(self) -> None:
+        self.channels = frozenset()
+        if (task := self._cancel()) is not None:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _cancel(self) -> asyncio.Task[None] | None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+        self._set_connected(False)
+        return task
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self.connected:
+            self.connected = connected
+            self._on_state(connected)
+
+    async def _run(self, channels: frozenset[str]) -> None:
+        failures = 0
+        await asyncio.sleep(_SETTLE)
+        while True:
+            status = None
+            try:
+                async with aclosing(self._connect(channels)) as stream:
+                    async for event in stream:
+                        if event.channel == READY:
+                            self.supported = True
+                            self.connects += 1
+                            failures = 0
+                            self._set_connected(True)
+                            continue
+                        self.events += 1
+                        self._last_event = time.monotonic()
+                        self._on_event(event)
+                _LOGGER.debug("Event stream closed by the server")
+            except Exception as err:  # noqa: BLE001 — any failure means "reconnect"
+                status = getattr(err, "status", None)  # IettMiddleError's HTTP status
+                _LOGGER.debug("Event stream failed: %s", err)
+            if self.connected:
+                self.drops += 1
+                self._set_connected(False)
+            if status in _NO_STREAM:
+                self.supported = False
+                delay = UNSUPPORTED_RETRY
+            else:
+                delay = self.retry.delay(failures)
+                failures = min(failures + 1, 16)
+            await asyncio.sleep(delay)
+
+    def as_dict(self) -> dict[str, Any]:
+        last = self._last_event
+        return {
+            "connected": self.connected,
+            "supported": self.supported,
+            "channels": sorted(self.channels),
+            "connects": self.connects,
+            "drops": self.drops,
+            "events": self.events,
+            "last_event_age": None if last is None else round(time.monotonic() - last, 1),
+        }
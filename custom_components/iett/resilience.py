@@ -0,0 +1,191 @@
+"""Retries, circuit breaking and hedging for iett-middle requests.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from .metrics import Rolling
+
+_T = TypeVar("_T")
+
+# Attempts per request, the first one included.
+DEFAULT_ATTEMPTS = 3
+# Upper bound of the first retry's delay (seconds); doubles per retry.
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+# No retry starts later than this after the first attempt (seconds), so a
+# timed-out fleet download is not sent again.
+RETRY_BUDGET = 20.0
+# Longest server-requested Retry-After honoured (seconds).
+RETRY_AFTER_CAP = 30.0
+
+# Consecutive failed attempts that open the breaker.
+FAILURE_THRESHOLD = 5
+# How long an open breaker rejects requests (seconds); doubles after each
+# failed probe, up to OPEN_CAP.
+OPEN_SECONDS = 30.0
+OPEN_CAP = 300.0
+
+# Hedge after this percentile of recent latencies, once enough are known.
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.05
+HEDGE_WINDOW = 64
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff."""
+
+    attempts: int = DEFAULT_ATTEMPTS
+    base: float = BACKOFF_BASE
+    cap: float = BACKOFF_CAP
+    budget: float = RETRY_BUDGET
+
+    def delay(
+        self,
+        retry: int,
+        retry_after: float | None = None,
+        rng: Callable[[], float] = random.random,
+    ) -> float:
+        """Seconds to wait before retry number *retry* (0 = first retry).
+
+        Drawn uniformly from ``[0, min(cap, base * 2**retry)]`` so that
+        entries failing together do not come back together; a server's
+        ``Retry-After`` is a lower bound.
+        """
+        delay = rng() * min(self.cap, self.base * 2**retry)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, RETRY_AFTER_CAP))
+        return delay
+
+
+class CircuitBreaker:
+    """Fail fast while a middle server keeps failing.
+
+    *threshold* consecutive failures open the breaker: :meth:`allow` then
+    refuses every request for the open period. After it, a single probe is
+    let through (half-open); its success closes the breaker, its failure
+    reopens it for twice as long, up to *open_cap*. Callers report each
+    allowed request with :meth:`success`, :meth:`failure` or, when it ended
+    without an answer either way (cancelled), :meth:`release`.
+    """
+
+    def __init__(
+        self,
+        threshold: int = FAILURE_THRESHOLD,
+        open_for: float = OPEN_SECONDS,
+        open_cap: float = OPEN_CAP,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.open_for = open_for
+        self.open_cap = open_cap
+        self.trips = 0
+        self._clock = clock
+        self._failures = 0
+        self._opened = False
+        self._open_until = 0.0
+        self._period = open_for
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if not self._opened:
+            return CLOSED
+        return OPEN if self._clock() < self._open_until else HALF_OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until a probe is allowed (0 when one may go now)."""
+        return max(self._open_until - self._clock(), 0.0) if self._opened else 0.0
+
+    def allow(self) -> bool:
+        if not self._opened:
+            return True
+        if self._probing or self._clock() < self._open_until:
+            return False
+        self._probing = True
+        return True
+
+    def success(self) -> None:
+        self._failures = 0
+        self._opened = self._probing = False
+        self._period = self.open_for
+
+    def failure(self) -> None:
+        if self._opened:
+            if not self._probing:
+                return
+            self._probing = False
+            self._period = min(self._period * 2, self.open_cap)
+            self._open_until = self._clock() + self._period
+            return
+        self._failures += 1
+        if self._failures >= self.threshold:
+            self._opened = True
+            self._open_until = self._clock() + self._period
+            self.trips += 1
+
+    def release(self) -> None:
+        self._probing = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "retry_after": round(self.retry_after(), 1),
+        }
+
+
+def hedge_delay(latency: Rolling) -> float | None:
+    """When to send a hedge (seconds), or ``None`` while too little is known."""
+    if len(latency) < HEDGE_MIN_SAMPLES:
+        return None
+    p = latency.percentile(HEDGE_PERCENTILE)
+    return None if p is None else max(p, HEDGE_MIN_DELAY)
+
+
+def _consume(task: asyncio.Future[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+async def hedged(call: Callable[[], Awaitable[_T]], delay: float) -> tuple[_T, bool]:
+    """Run *call*; if it is still pending after *delay*, race a second one.
+
+    Returns the first successful result and whether a hedge was sent. The
+    loser is cancelled; if both fail, the last error is raised.
+    """
+    first = asyncio.ensure_future(call())
+    first.add_done_callback(_consume)
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result(), False
+        second = asyncio.ensure_future(call())
+        second.add_done_callback(_consume)
+        tasks.add(second)
+        pending = set(tasks)
+        errors: list[BaseException] = []
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if (error := task.exception()) is None:
+                    return task.result(), True
+                errors.append(error)
+        raise errors[-1]
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,145 @@
+"""Precompiled route schedules: sorted departure minutes per day type.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from heapq import merge
+from typing import Any
+
+from .models import ScheduledDeparture
+
+WEEKDAY = "weekday"
+SATURDAY = "saturday"
+SUNDAY = "sunday"
+
+# iett-middle day_type codes. Unknown codes are treated as running every day.
+DAY_TYPE_KINDS: dict[str, str] = {
+    "H": WEEKDAY,  # hafta içi
+    "I": WEEKDAY,  # iş günü
+    "C": SATURDAY,  # cumartesi
+    "P": SUNDAY,  # pazar
+}
+
+_DAY = 1440
+# How far ahead to look for the next departure of a sparse schedule.
+_HORIZON_DAYS = 7
+
+
+def day_kind(day: date) -> str:
+    """Which service day *day* is."""
+    weekday = day.weekday()
+    return WEEKDAY if weekday < 5 else SATURDAY if weekday == 5 else SUNDAY
+
+
+def parse_minute(text: str) -> int:
+    """``"HH:MM"`` → minutes after midnight; raises ``ValueError`` if malformed."""
+    hours, minutes = text.split(":")
+    return (int(hours) * 60 + int(minutes)) % _DAY
+
+
+class _Timetable:
+    """Departures sorted by minute of day, with the minutes in their own list."""
+
+    __slots__ = ("minutes", "departures")
+
+    def __init__(self, rows: Iterable[tuple[int, ScheduledDeparture]]) -> None:
+        ordered = sorted(rows, key=lambda row: row[0])
+        self.minutes = [minute for minute, _ in ordered]
+        self.departures = [dep for _, dep in ordered]
+
+    def after(self, minute: int, offset: int) -> Iterable[tuple[int, ScheduledDeparture]]:
+        """``(minutes until, departure)`` from *minute* on, shifted by *offset*."""
+        start = bisect_left(self.minutes, minute)
+        return (
+            (self.minutes[i] - minute + offset, self.departures[i])
+            for i in range(start, len(self.minutes))
+        )
+
+
+class ScheduleIndex:
+    """A route schedule parsed once into per-(day type, direction, variant) tables.
+
+    Lookups bisect into the table for the service day instead of scanning
+    and re-parsing every departure, and only count departures that actually
+    run on that day.
+    """
+
+    def __init__(self, departures: Iterable[Any]) -> None:
+        rows: dict[tuple[str, str, str], list[tuple[int, ScheduledDeparture]]] = {}
+        for dep in departures:
+            try:
+                minute = parse_minute(dep.departure_time)
+                key = (dep.day_type, dep.direction, dep.route_variant)
+            except (ValueError, AttributeError):
+                continue
+            rows.setdefault(key, []).append((minute, dep))
+        self._tables = {key: _Timetable(r) for key, r in rows.items()}
+        self._by_kind: dict[str, _Timetable] = {}
+
+    def __len__(self) -> int:
+        return sum(len(t.minutes) for t in self._tables.values())
+
+    @property
+    def keys(self) -> list[tuple[str, str, str]]:
+        """The ``(day_type, direction, route_variant)`` groups present."""
+        return sorted(self._tables)
+
+    def _runs_on(self, day_type: str, kind: str) -> bool:
+        return DAY_TYPE_KINDS.get(day_type, kind) == kind
+
+    def _table(
+        self, kind: str, direction: str | None, variant: str | None
+    ) -> Iterable[_Timetable]:
+        if direction is None and variant is None:
+            # The common, unfiltered case is merged once per day kind.
+            if (table := self._by_kind.get(kind)) is None:
+                table = self._by_kind[kind] = _Timetable(
+                    row
+                    for key, t in self._tables.items()
+                    if self._runs_on(key[0], kind)
+                    for row in zip(t.minutes, t.departures)
+                )
+            return (table,)
+        return [
+            t
+            for (day_type, d, v), t in self._tables.items()
+            if self._runs_on(day_type, kind)
+            and direction in (None, d)
+            and variant in (None, v)
+        ]
+
+    def next_departures(
+        self,
+        now: datetime,
+        count: int = 1,
+        direction: str | None = None,
+        variant: str | None = None,
+    ) -> list[tuple[int, ScheduledDeparture]]:
+        """The next *count* departures as ``(minutes until, departure)``.
+
+        Rolls over into the following service days (up to a week) when
+        today has nothing left.
+        """
+        found: list[tuple[int, ScheduledDeparture]] = []
+        minute = now.hour * 60 + now.minute
+        for offset in range(_HORIZON_DAYS + 1):
+            kind = day_kind(now.date() + timedelta(days=offset))
+            start = minute if offset == 0 else 0
+            base = offset * _DAY - (0 if offset == 0 else minute)
+            tables = self._table(kind, direction, variant)
+            for row in merge(*(t.after(start, base) for t in tables), key=lambda r: r[0]):
+                found.append(row)
+                if len(found) >= count:
+                    return found
+        return found
+
+    def minutes_to_next(
+        self, now: datetime, direction: str | None = None, variant: str | None = None
+    ) -> int | None:
+        """Minutes until the next departure, or ``None`` if none is scheduled."""
+        upcoming = self.next_departures(now, 1, direction, variant)
+        return upcoming[0][0] if upcoming else None
@@ -2,28 +2,56 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import asdict
+import time
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
+import voluptuous as vol
+
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, ServiceResponse, SupportsResponse, callback
+from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
+from .attributes import build_attributes, page_items
 from .const import (
+    ARRIVAL_FEEDS,
+    ATTR_FAILED_STOPS,
+    ATTR_LIMIT,
+    ATTR_NEXT_DEPARTURES,
+    ATTR_OFFSET,
+    ATTR_POLL_INTERVAL,
+    ATTR_ROUTE_NAME,
+    ATTR_SKIPPED_WRITES,
+    BUNDLE_PARTS,
+    CONF_ATTRIBUTE_LIMIT,
+    CONF_ATTRIBUTE_MODE,
     DATA_KEY,
+    DEFAULT_ATTRIBUTE_LIMIT,
+    DEFAULT_ATTRIBUTE_MODE,
     DOMAIN,
-    FEED_ALL_FLEET,
     FEED_ROUTE_ANNOUNCEMENTS,
     FEED_ROUTE_FLEET,
     FEED_ROUTE_SCHEDULE,
-    FEED_STOP_ARRIVALS,
+    FEED_STOP_BOARD,
+    FLEET_FEEDS,
+    MAX_ATTRIBUTE_LIMIT,
+    NEXT_DEPARTURES_COUNT,
     SENSOR_ICON,
     SENSOR_UNIT,
+    SERVICE_GET_ITEMS,
 )
-from .coordinator import IettCoordinator
-from .models import Arrival, ScheduledDeparture
+from .bundle import RouteBundle
+from .coordinator import IettCoordinator, IettRouteBundleCoordinator
+from .metrics import ATTRIBUTES, BUILD, BYTES, DECODE, LATENCY, REFRESH, WRITE
+from .models import Arrival
+from .schedule import ScheduleIndex
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,65 +62,305 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     coordinator: IettCoordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([IettSensor(coordinator, entry)])
+    if isinstance(coordinator, IettRouteBundleCoordinator):
+        feeds = [IettSensor(coordinator, entry, part) for part in BUNDLE_PARTS]
+    else:
+        feeds = [IettSensor(coordinator, entry)]
+    async_add_entities(
+        [
+            *feeds,
+            *(IettTimingSensor(coordinator, entry, d) for d in TIMING_SENSORS),
+        ]
+    )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_GET_ITEMS,
+        {
+            vol.Optional(ATTR_OFFSET, default=0): vol.All(
+                vol.Coerce(int), vol.Range(min=0)
+            ),
+            vol.Optional(ATTR_LIMIT, default=DEFAULT_ATTRIBUTE_LIMIT): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_ATTRIBUTE_LIMIT)
+            ),
+        },
+        "async_get_items",
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+# Appended to the entry title for each route bundle part's sensor.
+_PART_NAMES: dict[str, str] = {
+    FEED_ROUTE_FLEET: "buses",
+    FEED_ROUTE_SCHEDULE: "next departure",
+    FEED_ROUTE_ANNOUNCEMENTS: "announcements",
+}
+
 
+def _state_value(
+    feed_type: str, data: list[Any], schedule: ScheduleIndex | None = None
+) -> int | None:
+    """Compute the sensor's native_value from the coordinator data.
 
-def _state_value(feed_type: str, data: list[Any]) -> int | None:
-    """Compute the sensor's native_value from the coordinator data."""
+    Schedule feeds use *schedule* (the coordinator's precompiled index) when
+    given, otherwise index *data* on the spot.
+    """
     if not data:
         return 0
-    if feed_type in (FEED_ALL_FLEET, FEED_ROUTE_FLEET):
+    if feed_type in FLEET_FEEDS:
         return len(data)
-    if feed_type == FEED_STOP_ARRIVALS:
+    if feed_type in ARRIVAL_FEEDS:
         arrivals: list[Arrival] = data  # type: ignore[assignment]
         etas = [a.eta_minutes for a in arrivals if a.eta_minutes is not None]
         return min(etas) if etas else None
     if feed_type == FEED_ROUTE_SCHEDULE:
-        deps: list[ScheduledDeparture] = data  # type: ignore[assignment]
-        from datetime import datetime
-        now = datetime.now()
-        now_min = now.hour * 60 + now.minute
-        diffs: list[int] = []
-        for d in deps:
-            try:
-                h, m = map(int, d.departure_time.split(":"))
-                dep_min = h * 60 + m
-                diff = dep_min - now_min
-                if diff < 0:
-                    diff += 1440  # next day
-                diffs.append(diff)
-            except (ValueError, AttributeError):
-                continue
-        return min(diffs) if diffs else None
+        if schedule is None:
+            schedule = ScheduleIndex(data)
+        return schedule.minutes_to_next(dt_util.now())
     if feed_type == FEED_ROUTE_ANNOUNCEMENTS:
         return len(data)
     return len(data)
 
 
 class IettSensor(CoordinatorEntity[IettCoordinator], SensorEntity):  # pyright: ignore[reportIncompatibleVariableOverride]
-    """Single sensor for any IETT feed type."""
+    """Single sensor for any IETT feed type.
+
+    How much of the feed lands in the attributes is set by the entry's
+    ``attribute_mode`` option; the item lists are never recorded, and the
+    ``iett.get_items`` service pages through the full data on demand.
+    Buses listed by fleet feeds carry the derived ``heading``, ``speed_avg``,
+    ``dwell`` and ``stopped`` from the fleet's motion history.
+    ``skipped_writes`` reports how many unchanged refreshes were not written
+    and ``poll_interval`` the adaptive interval currently in force (seconds).
+    Departure boards list the stops whose last fetch failed in
+    ``failed_stops``.
+
+    A route bundle gets one sensor per *part*, each shown like the feed of
+    the same name and carrying the line's ``route_name``. A part's sensor
+    is unavailable until the part loads and while its last fetch failed,
+    and skips its write when the bundle changed but its own part did not.
+
+    Schedule sensors also tick every minute on a local timer, recomputing
+    the countdown from the precompiled index without refetching the feed.
+    """
+
+    _unrecorded_attributes = frozenset(
+        {*DATA_KEY.values(), ATTR_SKIPPED_WRITES, ATTR_POLL_INTERVAL, ATTR_NEXT_DEPARTURES}
+    )
 
-    def __init__(self, coordinator: IettCoordinator, entry: ConfigEntry) -> None:
+    def __init__(
+        self, coordinator: IettCoordinator, entry: ConfigEntry, part: str | None = None
+    ) -> None:
         super().__init__(coordinator)
         self._entry = entry
-        ft = coordinator.feed_type
+        self._part = part
+        ft = self._feed_type = part or coordinator.feed_type
+        self._shown: tuple[Any, bool] | None = None
+        self._attribute_mode: str = entry.options.get(
+            CONF_ATTRIBUTE_MODE, DEFAULT_ATTRIBUTE_MODE[ft]
+        )
+        self._attribute_limit: int = entry.options.get(
+            CONF_ATTRIBUTE_LIMIT, DEFAULT_ATTRIBUTE_LIMIT
+        )
         self._attr_unique_id = entry.unique_id or entry.entry_id
         self._attr_name = entry.title
+        if part is not None:
+            self._attr_unique_id += f"_{part}"
+            self._attr_name += f" {_PART_NAMES[part]}"
         self._attr_icon = SENSOR_ICON[ft]
         self._attr_native_unit_of_measurement = SENSOR_UNIT[ft]
         self._refresh_attributes()
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self._feed_type == FEED_ROUTE_SCHEDULE:
+            self.async_on_remove(
+                async_track_time_change(self.hass, self._async_minute_tick, second=0)
+            )
+
+    @callback
+    def _async_minute_tick(self, _now: datetime) -> None:
+        previous = self._attr_native_value
+        self._refresh_schedule()
+        if self._attr_native_value != previous:
+            self.async_write_ha_state()
+
+    def _refresh_schedule(self) -> None:
+        schedule = self.coordinator.schedule
+        if schedule is None:
+            return
+        upcoming = schedule.next_departures(dt_util.now(), NEXT_DEPARTURES_COUNT)
+        self._attr_native_value = upcoming[0][0] if upcoming else None
+        self._attr_extra_state_attributes[ATTR_NEXT_DEPARTURES] = [
+            dep.departure_time for _, dep in upcoming
+        ]
+
+    def _bundle(self) -> RouteBundle | None:
+        data = self.coordinator.data
+        return data if isinstance(data, RouteBundle) else None
+
+    def _feed_data(self) -> Any:
+        """This sensor's items: the coordinator data, or its bundle part."""
+        if self._part is None:
+            return self.coordinator.data or []
+        bundle = self._bundle()
+        return (bundle.part(self._part) if bundle is not None else None) or []
+
+    @property
+    def available(self) -> bool:
+        if not super().available:
+            return False
+        if self._part is None:
+            return True
+        bundle = self._bundle()
+        return (
+            bundle is not None
+            and bundle.part(self._part) is not None
+            and self._part not in bundle.failed
+        )
+
     @callback
     def _handle_coordinator_update(self) -> None:
+        if self._part is not None:
+            bundle = self._bundle()
+            part = bundle.part(self._part) if bundle is not None else None
+            # Bundles share unchanged parts, so this is mostly an identity check.
+            if (shown := (part, self.available)) == self._shown:
+                return
+            self._shown = shown
+        timings = self.coordinator.timings
+        if not timings.enabled:
+            self._refresh_attributes()
+            self.async_write_ha_state()
+            return
+        start = time.perf_counter()
         self._refresh_attributes()
+        built = time.perf_counter()
         self.async_write_ha_state()
+        scope = self.coordinator.metrics_scope
+        timings.record(scope, ATTRIBUTES, (built - start) * 1000)
+        timings.record(scope, WRITE, (time.perf_counter() - built) * 1000)
 
     def _refresh_attributes(self) -> None:
-        data = self.coordinator.data or []
-        self._attr_native_value = _state_value(self.coordinator.feed_type, data)
-        data_key = DATA_KEY[self.coordinator.feed_type]
-        self._attr_extra_state_attributes = {
-            "feed_type": self.coordinator.feed_type,
-            data_key: [asdict(item) for item in data],  # type: ignore[call-overload]
+        ft = self._feed_type
+        data = self._feed_data()
+        self._attr_native_value = _state_value(ft, data, self.coordinator.schedule)
+        self._attr_extra_state_attributes = build_attributes(
+            ft,
+            data,
+            self._attribute_mode,
+            self._attribute_limit,
+        )
+        self._add_motion(self._attr_extra_state_attributes.get(DATA_KEY[ft]))
+        self._attr_extra_state_attributes[ATTR_SKIPPED_WRITES] = (
+            self.coordinator.skipped_writes
+        )
+        interval = self.coordinator.effective_interval
+        if self._part is not None:
+            assert isinstance(self.coordinator, IettRouteBundleCoordinator)
+            interval = self.coordinator.part_interval(self._part)
+            if (bundle := self._bundle()) is not None:
+                self._attr_extra_state_attributes[ATTR_ROUTE_NAME] = bundle.route_name
+        if interval is not None:
+            self._attr_extra_state_attributes[ATTR_POLL_INTERVAL] = int(
+                interval.total_seconds()
+            )
+        if ft == FEED_ROUTE_SCHEDULE:
+            self._refresh_schedule()
+        if ft == FEED_STOP_BOARD:
+            self._attr_extra_state_attributes[ATTR_FAILED_STOPS] = sorted(
+                self.coordinator.stop_errors
+            )
+
+    def _add_motion(self, items: list[dict[str, Any]] | None) -> None:
+        if not items or self._feed_type not in FLEET_FEEDS:
+            return
+        if (motion := self.coordinator.motion) is None:
+            return
+        for item in items:
+            if (derived := motion.get(item["kapino"])) is not None:
+                item.update(derived.as_dict())
+
+    async def async_get_items(self, offset: int, limit: int) -> ServiceResponse:
+        """Return one page of the current feed items (``iett.get_items``)."""
+        data = self._feed_data()
+        items = page_items(data, offset, limit)
+        self._add_motion(items)
+        return {
+            "feed_type": self._feed_type,
             "count": len(data),
+            "offset": offset,
+            DATA_KEY[self._feed_type]: items,
         }
+
+
+@dataclass(frozen=True, slots=True)
+class TimingSensorDescription:
+    """One rolling metric surfaced as a diagnostic sensor."""
+
+    key: str
+    name: str
+    metric: str
+    per_endpoint: bool  # scoped to the entry's endpoint, else to the entry
+    unit: str
+
+
+TIMING_SENSORS: tuple[TimingSensorDescription, ...] = (
+    TimingSensorDescription("latency", "fetch latency", LATENCY, True, UnitOfTime.MILLISECONDS),
+    TimingSensorDescription("payload_size", "payload size", BYTES, True, UnitOfInformation.BYTES),
+    TimingSensorDescription("decode_time", "decode time", DECODE, True, UnitOfTime.MILLISECONDS),
+    TimingSensorDescription("build_time", "build time", BUILD, True, UnitOfTime.MILLISECONDS),
+    TimingSensorDescription("refresh_time", "refresh time", REFRESH, False, UnitOfTime.MILLISECONDS),
+    TimingSensorDescription("attributes_time", "attributes time", ATTRIBUTES, False, UnitOfTime.MILLISECONDS),
+    TimingSensorDescription("write_time", "state write time", WRITE, False, UnitOfTime.MILLISECONDS),
+)
+
+
+class IettTimingSensor(CoordinatorEntity[IettCoordinator], SensorEntity):  # pyright: ignore[reportIncompatibleVariableOverride]
+    """p90 of one hot-path metric over the rolling window; disabled by default.
+
+    Timings are only collected while at least one of these sensors is
+    enabled — each claims the shared registry when added and releases it
+    when removed. The full window summary (count, last, p50, p90, p99,
+    max) is in the attributes.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:timer-outline"
+    _unrecorded_attributes = frozenset({"count", "last", "p50", "p90", "p99", "max"})
+
+    def __init__(
+        self,
+        coordinator: IettCoordinator,
+        entry: ConfigEntry,
+        description: TimingSensorDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self._description = description
+        self._attr_unique_id = f"{entry.unique_id or entry.entry_id}_{description.key}"
+        self._attr_name = f"{entry.title} {description.name}"
+        self._attr_native_unit_of_measurement = description.unit
+
+    @property
+    def _scope(self) -> str:
+        if self._description.per_endpoint:
+            return self.coordinator.endpoint
+        return self.coordinator.metrics_scope
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.coordinator.timings.enable(self)
+        self.async_on_remove(lambda: self.coordinator.timings.disable(self))
+
+    @property
+    def native_value(self) -> float | None:
+        series = self.coordinator.timings.get(self._scope, self._description.metric)
+        if series is None or (p90 := series.percentile(90)) is None:
+            return None
+        return round(p90, 3)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        series = self.coordinator.timings.get(self._scope, self._description.metric)
+        return {"scope": self._scope, **(series.summary() if series else {"count": 0})}
@@ -0,0 +1,112 @@
+"""Uniform lat/lon grid over a fleet snapshot for radius and box queries.
+
+Zero Home Assistant imports — usable in plain Python tests.
+"""
+from __future__ import annotations
+
+import math
+
+from .fleet import FleetSnapshot
+
+# Cell edge in degrees: ~1.1 km north-south, ~0.8 km east-west in Istanbul.
+DEFAULT_CELL_DEGREES = 0.01
+
+_EARTH_RADIUS_M = 6_371_000.0
+_M_PER_DEGREE = math.pi * _EARTH_RADIUS_M / 180
+
+Cell = tuple[int, int]
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Equirectangular distance in metres; accurate to well under 1 % at city scale."""
+    x = (lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    return math.hypot(lat2 - lat1, x) * _M_PER_DEGREE
+
+
+class FleetGrid:
+    """Buses bucketed by grid cell, kept in step with successive snapshots.
+
+    :meth:`sync` only moves buses whose cell changed (and drops those no
+    longer in the fleet), so a cycle costs one pass over the coordinates
+    rather than a rebuild. Queries scan just the cells overlapping the
+    area and return row indices into the synced snapshot.
+    """
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES) -> None:
+        self.cell_degrees = cell_degrees
+        self.snapshot = FleetSnapshot.from_positions(())
+        self.moved = 0  # buses that changed cell in the last sync
+        self._cells: dict[Cell, set[str]] = {}
+        self._cell_of: dict[str, Cell] = {}
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        size = self.cell_degrees
+        return math.floor(lat / size), math.floor(lon / size)
+
+    def sync(self, snapshot: FleetSnapshot) -> None:
+        """Bring the grid up to date with *snapshot*; a no-op for the same object."""
+        if snapshot is self.snapshot:
+            return
+        cells, cell_of, size = self._cells, self._cell_of, self.cell_degrees
+        floor = math.floor
+        moved = 0
+        for kapino, lat, lon in zip(snapshot.kapino, snapshot.latitude, snapshot.longitude):
+            cell = (floor(lat / size), floor(lon / size))
+            old = cell_of.get(kapino)
+            if old == cell:
+                continue
+            moved += 1
+            if old is not None:
+                self._discard(old, kapino)
+            cells.setdefault(cell, set()).add(kapino)
+            cell_of[kapino] = cell
+        if len(cell_of) != len(snapshot):
+            for kapino in [k for k in cell_of if k not in snapshot]:
+                self._discard(cell_of.pop(kapino), kapino)
+        self.snapshot = snapshot
+        self.moved = moved
+
+    def _discard(self, cell: Cell, kapino: str) -> None:
+        bucket = self._cells[cell]
+        bucket.discard(kapino)
+        if not bucket:
+            del self._cells[cell]
+
+    def _rows_in_cells(
+        self, south: float, west: float, north: float, east: float
+    ) -> list[int]:
+        (lat0, lon0), (lat1, lon1) = self._cell(south, west), self._cell(north, east)
+        index_of = self.snapshot.index_of
+        rows: list[int] = []
+        for cell_lat in range(lat0, lat1 + 1):
+            for cell_lon in range(lon0, lon1 + 1):
+                for kapino in self._cells.get((cell_lat, cell_lon), ()):
+                    if (i := index_of(kapino)) is not None:
+                        rows.append(i)
+        return rows
+
+    def in_bbox(self, south: float, west: float, north: float, east: float) -> list[int]:
+        """Rows inside the box, in no particular order."""
+        lat, lon = self.snapshot.latitude, self.snapshot.longitude
+        return [
+            i
+            for i in self._rows_in_cells(south, west, north, east)
+            if south <= lat[i] <= north and west <= lon[i] <= east
+        ]
+
+    def within(self, latitude: float, longitude: float, radius_m: float) -> list[int]:
+        """Rows within *radius_m* metres of a point, nearest first."""
+        dlat = radius_m / _M_PER_DEGREE
+        dlon = dlat / max(math.cos(math.radians(latitude)), 1e-6)
+        lat, lon = self.snapshot.latitude, self.snapshot.longitude
+        hits: list[tuple[float, int]] = []
+        for i in self._rows_in_cells(
+            latitude - dlat, longitude - dlon, latitude + dlat, longitude + dlon
+        ):
+            if (d := distance_m(latitude, longitude, lat[i], lon[i])) <= radius_m:
+                hits.append((d, i))
+        hits.sort()
+        return [i for _, i in hits]
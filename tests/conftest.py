@@ -11,6 +11,7 @@ from typing import Any
 
 import aiohttp
 import pytest
+from aiohttp.test_utils import TestServer
 
 # Ensure selector event loop on Windows
 if sys.platform == "win32":
@@ -130,3 +131,17 @@ MIDDLE_BASE = "http://iett-middle.test"
 async def session() -> AsyncGenerator[aiohttp.ClientSession, None]:
     async with aiohttp.ClientSession() as s:
         yield s
+
+
+@pytest.fixture()
+async def middle_server() -> AsyncGenerator[Any, None]:
+    """A running local stand-in for iett-middle (see ``tests.fake_middle``)."""
+    from tests.fake_middle import FakeMiddle
+
+    fake = FakeMiddle()
+    server = TestServer(fake.app())
+    await server.start_server()
+    fake.url = str(server.make_url("")).rstrip("/")
+    yield fake
+    fake.close_streams()
+    await server.close()
@@ -0,0 +1,124 @@
+"""Local stand-in for iett-middle, served with aiohttp's test server.
+
+Serves the captured fixtures from ``conftest`` and records every request
+path so tests can assert on request counts.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from aiohttp import web
+
+from tests.conftest import (
+    ANNOUNCEMENTS_JSON,
+    ARRIVALS_JSON,
+    FLEET_JSON,
+    GARAGE_LIST_JSON,
+    ROUTE_FLEET_JSON,
+    ROUTE_STOPS_JSON,
+    SCHEDULE_JSON,
+    STOP_DETAIL_JSON,
+)
+
+
+class FakeMiddle:
+    """Configurable iett-middle double."""
+
+    def __init__(self) -> None:
+        self.url = ""
+        self.requests: list[str] = []
+        self.bulk_arrivals = True
+        self.failing_stops: set[str] = set()
+        self.fleet: list[dict[str, Any]] = FLEET_JSON
+        self.arrivals: dict[str, list[dict[str, Any]]] = {}
+        self.compress = False
+        self.stream_supported = True
+        self._streams: list[tuple[frozenset[str], asyncio.Queue[bytes | None]]] = []
+
+    def count(self, prefix: str) -> int:
+        return sum(1 for path in self.requests if path.startswith(prefix))
+
+    def push(self, channel: str, data: Any) -> None:
+        """Send one event to every open stream subscribed to *channel*."""
+        frame = f"event: {channel}\ndata: {json.dumps(data)}\n\n".encode()
+        for channels, queue in self._streams:
+            if channel in channels:
+                queue.put_nowait(frame)
+
+    def close_streams(self) -> None:
+        for _, queue in self._streams:
+            queue.put_nowait(None)
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._record])
+        app.router.add_get("/health", self._health)
+        app.router.add_get("/v1/fleet", self._fleet)
+        app.router.add_get("/v1/stream", self._stream)
+        app.router.add_get("/v1/garages", self._json(GARAGE_LIST_JSON))
+        app.router.add_get("/v1/stops/arrivals", self._bulk)
+        app.router.add_get("/v1/stops/{dcode}/arrivals", self._stop_arrivals)
+        app.router.add_get("/v1/stops/{dcode}", self._json(STOP_DETAIL_JSON))
+        app.router.add_get("/v1/routes/{hat}/buses", self._json(ROUTE_FLEET_JSON))
+        app.router.add_get("/v1/routes/{hat}/schedule", self._json(SCHEDULE_JSON))
+        app.router.add_get(
+            "/v1/routes/{hat}/announcements", self._json(ANNOUNCEMENTS_JSON)
+        )
+        app.router.add_get("/v1/routes/{hat}/stops", self._json(ROUTE_STOPS_JSON))
+        return app
+
+    @web.middleware
+    async def _record(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        self.requests.append(request.path_qs)
+        return await handler(request)
+
+    @staticmethod
+    def _json(payload: Any) -> Any:
+        async def handler(_request: web.Request) -> web.Response:
+            return web.json_response(payload)
+
+        return handler
+
+    async def _health(self, _request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def _fleet(self, _request: web.Request) -> web.Response:
+        resp = web.json_response(self.fleet)
+        if self.compress:
+            resp.enable_compression()
+        return resp
+
+    def _arrivals_for(self, dcode: str) -> list[dict[str, Any]]:
+        return self.arrivals.get(dcode, ARRIVALS_JSON)
+
+    async def _bulk(self, request: web.Request) -> web.Response:
+        if not self.bulk_arrivals:
+            raise web.HTTPNotFound()
+        dcodes = request.query.get("dcodes", "").split(",")
+        return web.json_response({d: self._arrivals_for(d) for d in dcodes if d})
+
+    async def _stop_arrivals(self, request: web.Request) -> web.Response:
+        dcode = request.match_info["dcode"]
+        if dcode in self.failing_stops:
+            raise web.HTTPBadGateway()
+        return web.json_response(self._arrivals_for(dcode))
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        if not self.stream_supported:
+            raise web.HTTPNotFound()
+        channels = frozenset(request.query.get("channels", "").split(","))
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        entry = (channels, queue)
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        # Subscribed before the headers go out, so a client that has seen
+        # them can push straight away.
+        self._streams.append(entry)
+        try:
+            await resp.prepare(request)
+            await resp.write(b": open\n\n")
+            while (frame := await queue.get()) is not None:
+                await resp.write(frame)
+        finally:
+            self._streams.remove(entry)
+        return resp
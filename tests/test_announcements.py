@@ -0,0 +1,80 @@
+"""Tests for announcements.py — keys, diffs and the saved seen set."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+from custom_components.iett.announcements import (
+    ADDED,
+    REMOVED,
+    UPDATED,
+    AnnouncementTracker,
+    announcement_key,
+)
+from custom_components.iett.models import Announcement
+from tests.conftest import ANNOUNCEMENTS_JSON
+
+DETOUR = Announcement(**ANNOUNCEMENTS_JSON[0])
+STRIKE = Announcement("500T", DETOUR.route_name, "Sürekli", "Kayit Saati: 08:00", "GREV.")
+
+
+def _primed(*items: Announcement) -> AnnouncementTracker:
+    tracker = AnnouncementTracker()
+    assert tracker.update(items) == []
+    return tracker
+
+
+class TestAnnouncementKey:
+    def test_depends_on_type_message_and_time_only(self) -> None:
+        key = announcement_key(DETOUR)
+        assert key == announcement_key(replace(DETOUR, route_name="renamed"))
+        assert key != announcement_key(replace(DETOUR, message="other"))
+        assert key != announcement_key(replace(DETOUR, updated_at="Kayit Saati: 09:05"))
+        assert key != announcement_key(replace(DETOUR, type="Sürekli"))
+        assert len(key) == 16
+
+
+class TestAnnouncementTracker:
+    def test_first_list_is_the_baseline(self) -> None:
+        tracker = _primed(DETOUR)
+        assert tracker.primed and len(tracker) == 1
+        assert tracker.update([DETOUR]) == []
+
+    def test_added_and_removed(self) -> None:
+        tracker = _primed(DETOUR)
+        (added,) = tracker.update([DETOUR, STRIKE])
+        assert (added.kind, added.announcement) == (ADDED, STRIKE)
+        (removed,) = tracker.update([STRIKE])
+        assert (removed.kind, removed.announcement) == (REMOVED, DETOUR)
+        assert removed.key == announcement_key(DETOUR)
+
+    def test_edit_of_same_route_and_type_is_an_update(self) -> None:
+        tracker = _primed(DETOUR, STRIKE)
+        edited = replace(DETOUR, updated_at="Kayit Saati: 09:30", message="YOL AÇILDI.")
+        (change,) = tracker.update([STRIKE, edited])
+        assert change.kind == UPDATED
+        assert change.announcement == edited
+        assert change.previous == DETOUR
+        assert change.previous_key == announcement_key(DETOUR)
+
+    def test_reordering_is_no_change(self) -> None:
+        tracker = _primed(DETOUR, STRIKE)
+        assert tracker.update([STRIKE, DETOUR]) == []
+
+    def test_dump_and_load_round_trip(self) -> None:
+        tracker = _primed(DETOUR)
+        restored = AnnouncementTracker()
+        restored.load(tracker.dump())
+        assert restored.primed
+        assert restored.update([DETOUR]) == []
+        assert [c.kind for c in restored.update([DETOUR, STRIKE])] == [ADDED]
+
+    def test_load_of_nothing_leaves_it_unprimed(self) -> None:
+        tracker = AnnouncementTracker()
+        tracker.load(None)
+        assert not tracker.primed
+
+    def test_load_drops_rows_that_no_longer_fit(self) -> None:
+        tracker = AnnouncementTracker()
+        tracker.load({"seen": {"k1": {"message": "only"}, "k2": DETOUR.as_dict()}})
+        assert tracker.primed
+        assert list(tracker.seen) == ["k2"]
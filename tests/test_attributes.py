@@ -0,0 +1,124 @@
+"""Tests for attributes.py — attribute modes and paging."""
+from __future__ import annotations
+
+from custom_components.iett.attributes import build_attributes, page_items, summarize
+from custom_components.iett.const import (
+    ATTRIBUTE_MODE_FULL,
+    ATTRIBUTE_MODE_SUMMARY,
+    ATTRIBUTE_MODE_TOP_N,
+    FEED_ALL_FLEET,
+    FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ROUTE_SCHEDULE,
+    FEED_STOP_ARRIVALS,
+    FEED_STOP_BOARD,
+)
+from custom_components.iett.board import BoardDeparture
+from custom_components.iett.fleet import FleetSnapshot
+from custom_components.iett.models import Announcement, Arrival, BusPosition, ScheduledDeparture
+
+
+def _bus(kapino: str, route: str | None = "500T", speed: int = 0,
+         lat: float = 41.0, lon: float = 29.0, operator: str | None = "IETT") -> BusPosition:
+    return BusPosition(
+        kapino=kapino, latitude=lat, longitude=lon, speed=speed,
+        last_seen="12:00:00", route_code=route, operator=operator,
+    )
+
+
+def _arrival(eta: int | None, route: str = "500T") -> Arrival:
+    return Arrival(route_code=route, destination="X", eta_raw="?", eta_minutes=eta)
+
+
+def _dep(time: str, day_type: str = "I", direction: str = "G") -> ScheduledDeparture:
+    return ScheduledDeparture(
+        route_code="500T", route_name="TUZLA - LEVENT", route_variant="500T_G_D0",
+        direction=direction, day_type=day_type, service_type="ÖHO",
+        departure_time=time,
+    )
+
+
+class TestBuildAttributes:
+    def test_full_lists_every_item(self) -> None:
+        snap = FleetSnapshot.from_positions([_bus("A"), _bus("B")])
+        attrs = build_attributes(FEED_ALL_FLEET, snap, ATTRIBUTE_MODE_FULL, 1)
+        assert [b["kapino"] for b in attrs["buses"]] == ["A", "B"]
+        assert attrs["count"] == 2
+        assert "summary" not in attrs
+
+    def test_top_n_truncates(self) -> None:
+        snap = FleetSnapshot.from_positions([_bus(str(i)) for i in range(5)])
+        attrs = build_attributes(FEED_ALL_FLEET, snap, ATTRIBUTE_MODE_TOP_N, 2)
+        assert len(attrs["buses"]) == 2
+        assert attrs["truncated"] is True
+        assert attrs["count"] == 5
+
+    def test_top_n_not_truncated_when_under_limit(self) -> None:
+        attrs = build_attributes(FEED_STOP_ARRIVALS, [_arrival(3)], ATTRIBUTE_MODE_TOP_N, 5)
+        assert attrs["truncated"] is False
+
+    def test_top_n_arrivals_are_soonest(self) -> None:
+        arrivals = [_arrival(None), _arrival(9), _arrival(2), _arrival(5)]
+        attrs = build_attributes(FEED_STOP_ARRIVALS, arrivals, ATTRIBUTE_MODE_TOP_N, 2)
+        assert [a["eta_minutes"] for a in attrs["arrivals"]] == [2, 5]
+
+    def test_summary_has_no_list(self) -> None:
+        snap = FleetSnapshot.from_positions([_bus("A")])
+        attrs = build_attributes(FEED_ALL_FLEET, snap, ATTRIBUTE_MODE_SUMMARY, 50)
+        assert "buses" not in attrs
+        assert attrs["summary"]["by_route"] == {"500T": 1}
+
+
+class TestSummarize:
+    def test_fleet(self) -> None:
+        snap = FleetSnapshot.from_positions([
+            _bus("A", "500T", speed=30, lat=41.1, lon=29.2),
+            _bus("B", "500T", lat=40.9, lon=28.9, operator="OHO"),
+            _bus("C", None, lat=41.0, lon=29.0),
+        ])
+        summary = summarize(FEED_ALL_FLEET, snap)
+        assert summary["by_route"] == {"500T": 2}
+        assert summary["by_operator"] == {"IETT": 2, "OHO": 1}
+        assert summary["moving"] == 1
+        assert summary["bbox"] == [40.9, 28.9, 41.1, 29.2]
+
+    def test_fleet_accepts_plain_list(self) -> None:
+        assert summarize(FEED_ALL_FLEET, [_bus("A")])["by_route"] == {"500T": 1}
+
+    def test_empty_fleet(self) -> None:
+        assert summarize(FEED_ALL_FLEET, [])["bbox"] is None
+
+    def test_arrivals(self) -> None:
+        arrivals = [_arrival(7, "15F"), _arrival(3, "15F"), _arrival(None, "14M")]
+        assert summarize(FEED_STOP_ARRIVALS, arrivals) == {"next_by_route": {"15F": 3}}
+
+    def test_board(self) -> None:
+        board = [
+            BoardDeparture("A", "15F", "X", "3 dk", 3),
+            BoardDeparture("B", "15F", "X", "5 dk", 5),
+            BoardDeparture("B", "14M", "X", "?", None),
+        ]
+        assert summarize(FEED_STOP_BOARD, board) == {
+            "next_by_route": {"15F": 3},
+            "next_by_stop": {"A": 3, "B": 5},
+        }
+
+    def test_schedule(self) -> None:
+        deps = [_dep("06:30"), _dep("05:45", "C"), _dep("23:10", direction="D")]
+        summary = summarize(FEED_ROUTE_SCHEDULE, deps)
+        assert summary["by_day_type"] == {"I": 2, "C": 1}
+        assert summary["by_direction"] == {"G": 2, "D": 1}
+        assert (summary["first"], summary["last"]) == ("05:45", "23:10")
+
+    def test_announcements(self) -> None:
+        anns = [
+            Announcement("500T", "X", "Günlük", "10:00", "a"),
+            Announcement("500T", "X", "Günlük", "11:00", "b"),
+        ]
+        assert summarize(FEED_ROUTE_ANNOUNCEMENTS, anns) == {"by_type": {"Günlük": 2}}
+
+
+class TestPageItems:
+    def test_pages(self) -> None:
+        snap = FleetSnapshot.from_positions([_bus(str(i)) for i in range(5)])
+        assert [b["kapino"] for b in page_items(snap, 3, 10)] == ["3", "4"]
+        assert page_items(snap, 10, 10) == []
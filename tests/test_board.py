@@ -0,0 +1,56 @@
+"""Tests for board.py — board stop specs and the merged departure list."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.iett.board import BoardDeparture, BoardStop, merge
+from custom_components.iett.models import Arrival
+
+
+def _arrival(route: str, eta: int | None) -> Arrival:
+    return Arrival(route_code=route, destination="X", eta_raw=f"{eta} dk", eta_minutes=eta)
+
+
+class TestBoardStop:
+    @pytest.mark.parametrize(("spec", "expected"), [
+        ("220602", BoardStop("220602")),
+        (" 220602@301341 ", BoardStop("220602", "301341")),
+        ("220602:500t, 34 ", BoardStop("220602", None, frozenset({"500T", "34"}))),
+        ("220602 @ 301341 : 14M", BoardStop("220602", "301341", frozenset({"14M"}))),
+    ])
+    def test_parse(self, spec: str, expected: BoardStop) -> None:
+        assert BoardStop.parse(spec) == expected
+
+    @pytest.mark.parametrize("spec", ["", "@301341", "220602@", "220602:", "220602 301341"])
+    def test_parse_rejects_malformed(self, spec: str) -> None:
+        with pytest.raises(ValueError):
+            BoardStop.parse(spec)
+
+    def test_config_and_spec_round_trip(self) -> None:
+        stop = BoardStop.parse("220602@301341:500T,34")
+        assert BoardStop.from_config(stop.as_config()) == stop
+        assert BoardStop.parse(str(stop)) == stop
+        assert str(stop) == "220602@301341:34,500T"
+
+    def test_route_filter(self) -> None:
+        stop = BoardStop.parse("220602:500T")
+        assert stop.wants(" 500t")
+        assert not stop.wants("34")
+        assert BoardStop("220602").wants("34")
+
+
+class TestMerge:
+    def test_filters_tags_and_sorts_soonest_first(self) -> None:
+        a = BoardStop("A", via="V")
+        b = BoardStop("B", routes=frozenset({"34"}))
+        board = merge([
+            (a, [_arrival("500T", 7), _arrival("14M", None)]),
+            (b, [_arrival("34", 2), _arrival("500T", 1)]),
+        ])
+        assert [(d.dcode, d.route_code, d.eta_minutes) for d in board] == [
+            ("B", "34", 2), ("A", "500T", 7), ("A", "14M", None),
+        ]
+        assert board[1] == BoardDeparture("A", "500T", "X", "7 dk", 7, "V")
+
+    def test_empty(self) -> None:
+        assert merge([]) == []
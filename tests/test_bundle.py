@@ -0,0 +1,60 @@
+"""Tests for bundle.py — route bundles and their part-wise updates."""
+from __future__ import annotations
+
+from custom_components.iett.bundle import RouteBundle, part_fingerprint
+from custom_components.iett.const import (
+    FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ROUTE_FLEET,
+    FEED_ROUTE_SCHEDULE,
+)
+from custom_components.iett.fleet import FleetSnapshot
+from custom_components.iett.models import Announcement, BusPosition, ScheduledDeparture
+from tests.conftest import ANNOUNCEMENTS_JSON, ROUTE_FLEET_JSON, SCHEDULE_JSON
+
+
+def _schedule() -> list[ScheduledDeparture]:
+    return [ScheduledDeparture(**d) for d in SCHEDULE_JSON]
+
+
+def _fleet() -> FleetSnapshot:
+    return FleetSnapshot.from_positions(BusPosition(**d) for d in ROUTE_FLEET_JSON)
+
+
+class TestRouteBundle:
+    def test_parts_start_unloaded(self) -> None:
+        bundle = RouteBundle("500T")
+        assert bundle.part(FEED_ROUTE_FLEET) is None
+        assert bundle.route_name is None
+        assert part_fingerprint(None) == 0
+
+    def test_with_parts_swaps_in_changed_parts_only(self) -> None:
+        schedule, fleet = _schedule(), _fleet()
+        bundle = RouteBundle("500T").with_parts(
+            {FEED_ROUTE_SCHEDULE: schedule, FEED_ROUTE_FLEET: fleet}
+        )
+        assert bundle.part(FEED_ROUTE_SCHEDULE) is schedule
+        # Equal content is not a change: the held part and bundle are kept.
+        same = bundle.with_parts({FEED_ROUTE_SCHEDULE: _schedule(), FEED_ROUTE_FLEET: fleet})
+        assert same is bundle
+        announcements = [Announcement(**d) for d in ANNOUNCEMENTS_JSON]
+        updated = bundle.with_parts({FEED_ROUTE_ANNOUNCEMENTS: announcements})
+        assert updated is not bundle
+        assert updated.schedule is schedule and updated.fleet is bundle.fleet
+        assert updated.fingerprint() != bundle.fingerprint()
+
+    def test_failed_parts_are_part_of_the_content(self) -> None:
+        bundle = RouteBundle("500T", schedule=_schedule())
+        failed = bundle.with_parts({}, frozenset({FEED_ROUTE_SCHEDULE}))
+        assert failed is not bundle and failed.schedule is bundle.schedule
+        assert failed.fingerprint() != bundle.fingerprint()
+        assert failed.with_parts({}, frozenset({FEED_ROUTE_SCHEDULE})) is failed
+
+    def test_route_name_and_as_dict(self) -> None:
+        bundle = RouteBundle("500T", schedule=_schedule())
+        assert bundle.route_name == SCHEDULE_JSON[0]["route_name"]
+        assert bundle.as_dict() == {
+            "hat_kodu": "500T",
+            FEED_ROUTE_FLEET: None,
+            FEED_ROUTE_SCHEDULE: SCHEDULE_JSON,
+            FEED_ROUTE_ANNOUNCEMENTS: None,
+        }
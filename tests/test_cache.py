@@ -0,0 +1,67 @@
+"""Tests for cache.py — the persistent response cache."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from custom_components.iett.cache import CachedResponse, ResponseCache
+
+
+def _entry(data: Any = 1) -> CachedResponse:
+    return CachedResponse(data, time.time(), '"v1"', None)
+
+
+class TestResponseCache:
+    def test_evicts_least_recently_used(self) -> None:
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", _entry())
+        cache.put("b", _entry())
+        assert cache.get("a") is not None  # "b" is now the oldest use
+        cache.put("c", _entry())
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache
+        assert cache.stats.evictions == 1
+
+    async def test_round_trips_through_dump(self) -> None:
+        saved: list[dict[str, Any]] = []
+        cache = ResponseCache(save=lambda dump: saved.append(dump()))
+        cache.put("a", _entry([{"x": 1}]))
+        cache.put("b", _entry())
+        cache.get("a")
+        cache.refresh("b")
+
+        async def load() -> dict[str, Any]:
+            return saved[-1]
+
+        restored = ResponseCache(load=load, max_entries=2)
+        await restored.async_load()
+        await restored.async_load()
+        assert restored.get("a").data == [{"x": 1}]  # type: ignore[union-attr]
+        # Use order survives the reload: "b" is now the oldest.
+        restored.put("c", _entry())
+        assert "b" not in restored
+        assert "a" in restored
+        assert len(saved) == 3
+
+    async def test_unreadable_store_starts_empty(self) -> None:
+        async def load() -> dict[str, Any]:
+            raise ValueError("corrupt")
+
+        cache = ResponseCache(load=load)
+        await cache.async_load()
+        assert len(cache) == 0
+
+    async def test_mismatched_rows_are_skipped_and_load_runs_once(self) -> None:
+        good = {"data": 1, "fetched": time.time(), "etag": None, "last_modified": None}
+        loads: list[int] = []
+
+        async def load() -> dict[str, Any]:
+            loads.append(1)
+            return {"entries": [["old", {**good, "retired": True}], ["new", good]]}
+
+        cache = ResponseCache(load=load)
+        await cache.async_load()
+        await cache.async_load()
+        assert "old" not in cache
+        assert cache.get("new").data == 1  # type: ignore[union-attr]
+        assert loads == [1]
@@ -1,14 +1,31 @@
 """Tests for IettMiddleClient — all HTTP mocked with aioresponses."""
 from __future__ import annotations
 
+import asyncio
+import json
+import random
 import re
+import time
+from typing import Any
+from unittest.mock import patch
 
 import aiohttp
 import pytest
 from aioresponses import aioresponses
 
-from custom_components.iett.client import IettMiddleClient, IettMiddleError
+from custom_components.iett.cache import CachedResponse, ResponseCache
+from custom_components.iett.client import (
+    IettMiddleClient,
+    IettMiddleError,
+    _JsonArrayScanner,  # type: ignore[reportPrivateUsage]
+    IettMiddleTimeout,
+    IettMiddleUnavailable,
+    endpoint,
+)
+from custom_components.iett.metrics import BUILD, BYTES, DECODE, LATENCY, Rolling, Timings
 from custom_components.iett.models import Arrival, Announcement, BusPosition, ScheduledDeparture
+from custom_components.iett.push import FLEET_CHANNEL, READY, stop_channel
+from custom_components.iett.resilience import OPEN, CircuitBreaker, RetryPolicy
 from tests.conftest import (
     ANNOUNCEMENTS_JSON,
     ARRIVALS_JSON,
@@ -25,6 +42,7 @@ from tests.conftest import (
 FLEET_RE    = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/fleet.*")
 BUSES_RE    = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/routes/.*?/buses.*")
 ARRIVES_RE  = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/stops/.*?/arrivals.*")
+BULK_RE     = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/stops/arrivals\?dcodes=.*")
 SCHED_RE    = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/routes/.*?/schedule.*")
 ANNS_RE     = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/routes/.*?/announcements.*")
 DETAIL_RE   = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/stops/\w+$")
@@ -32,10 +50,13 @@ NEARBY_RE   = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/stops/nearby.*")
 GARAGES_RE  = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/garages.*")
 RSTOPS_RE   = re.compile(rf"{re.escape(MIDDLE_BASE)}/v1/routes/.*?/stops.*")
 
+# Retries without the backoff sleeps.
+NO_BACKOFF = RetryPolicy(base=0.0)
+
 
 @pytest.fixture()
 async def client(session: aiohttp.ClientSession) -> IettMiddleClient:
-    return IettMiddleClient(session, MIDDLE_BASE)
+    return IettMiddleClient(session, MIDDLE_BASE, retry=NO_BACKOFF)
 
 
 class TestGetAllBuses:
@@ -54,6 +75,342 @@ class TestGetAllBuses:
                 await client.get_all_buses()
 
 
+class TestLenientDecoding:
+    async def test_skips_bad_rows_and_ignores_new_fields(self, client: IettMiddleClient) -> None:
+        rows = [
+            {**FLEET_JSON[0], "occupancy": 0.4},
+            {**FLEET_JSON[0], "kapino": "A-002", "latitude": None},
+            {**FLEET_JSON[0], "kapino": "A-003", "speed": 12.5},
+        ]
+        with aioresponses() as m:
+            m.get(FLEET_RE, payload=rows)  # type: ignore[misc]
+            buses = await client.get_all_buses()
+        assert [bus.kapino for bus in buses] == ["A-001", "A-003"]
+        assert buses[1].speed == 12
+
+
+class TestConditionalGet:
+    async def test_sends_validators_and_reuses_parsed_models(
+        self, client: IettMiddleClient
+    ) -> None:
+        with aioresponses() as m:
+            m.get(  # type: ignore[misc]
+                SCHED_RE,
+                payload=SCHEDULE_JSON,
+                headers={"ETag": '"v1"', "Last-Modified": "Fri, 27 Feb 2026 00:00:00 GMT"},
+            )
+            m.get(SCHED_RE, status=304)  # type: ignore[misc]
+            first = await client.get_route_schedule("500T")
+            second = await client.get_route_schedule("500T")
+            sent = list(m.requests.values())[0][1].kwargs["headers"]
+        assert second is first
+        assert sent["If-None-Match"] == '"v1"'
+        assert sent["If-Modified-Since"] == "Fri, 27 Feb 2026 00:00:00 GMT"
+        assert client.stats.not_modified == 1
+        assert client.stats.full_responses == 1
+
+    async def test_changed_body_replaces_cached_models(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(FLEET_RE, payload=FLEET_JSON, headers={"ETag": '"v1"'})  # type: ignore[misc]
+            m.get(FLEET_RE, payload=FLEET_JSON * 2, headers={"ETag": '"v2"'})  # type: ignore[misc]
+            first = await client.get_all_buses()
+            second = await client.get_all_buses()
+        assert second is not first
+        assert len(second) == 2
+        assert client.stats.full_responses == 2
+
+    async def test_no_validators_means_unconditional(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(ARRIVES_RE, payload=ARRIVALS_JSON)  # type: ignore[misc]
+            m.get(ARRIVES_RE, payload=ARRIVALS_JSON)  # type: ignore[misc]
+            await client.get_stop_arrivals("220602")
+            await client.get_stop_arrivals("220602")
+            sent = list(m.requests.values())[0][1].kwargs["headers"]
+        assert "If-None-Match" not in sent
+        assert client.stats.not_modified == 0
+
+    async def test_repeated_body_is_not_decoded_again(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(ARRIVES_RE, payload=ARRIVALS_JSON)  # type: ignore[misc]
+            m.get(ARRIVES_RE, payload=ARRIVALS_JSON)  # type: ignore[misc]
+            first = await client.get_stop_arrivals("220602")
+            with patch(
+                "custom_components.iett.client.json_loads", side_effect=AssertionError
+            ):
+                second = await client.get_stop_arrivals("220602")
+        assert second is first
+        assert client.stats.unchanged_bodies == 1
+        assert client.stats.full_responses == 1
+
+    async def test_repeated_streamed_body_returns_the_held_models(
+        self, client: IettMiddleClient
+    ) -> None:
+        with aioresponses() as m:
+            m.get(FLEET_RE, payload=FLEET_JSON)  # type: ignore[misc]
+            m.get(FLEET_RE, payload=FLEET_JSON)  # type: ignore[misc]
+            m.get(FLEET_RE, payload=FLEET_JSON * 2)  # type: ignore[misc]
+            first = await client.get_all_buses()
+            second = await client.get_all_buses()
+            third = await client.get_all_buses()
+        assert second is first
+        assert third is not first
+        assert len(third) == 2
+        assert client.stats.unchanged_bodies == 1
+
+
+class TestOwnSession:
+    async def test_reuses_connections_and_counts_compression(self, middle_server: Any) -> None:
+        middle_server.compress = True
+        middle_server.fleet = FLEET_JSON * 200
+        client = IettMiddleClient(None, middle_server.url)
+        try:
+            for _ in range(3):
+                buses = await client.get_all_buses()
+        finally:
+            await client.close()
+        assert len(buses) == 200
+        assert client.stats.connections_created == 1
+        assert client.stats.connections_reused == 2
+        assert client.stats.compressed_responses == 3
+        assert client.stats.bytes_saved > client.stats.bytes_received
+
+    async def test_uncompressed_body_saves_nothing(self, middle_server: Any) -> None:
+        client = IettMiddleClient(None, middle_server.url)
+        try:
+            await client.get_route_schedule("500T")
+        finally:
+            await client.close()
+        assert client.stats.bytes_decoded > 0
+        assert client.stats.bytes_saved == 0
+
+    async def test_injected_session_is_left_open(self, session: aiohttp.ClientSession) -> None:
+        await IettMiddleClient(session, MIDDLE_BASE).close()
+        assert not session.closed
+
+
+class TestPersistentCache:
+    def _client(self, session: aiohttp.ClientSession, cache: ResponseCache) -> IettMiddleClient:
+        return IettMiddleClient(session, MIDDLE_BASE, cache, retry=NO_BACKOFF)
+
+    async def test_miss_fetches_and_stores(self, session: aiohttp.ClientSession) -> None:
+        cache = ResponseCache()
+        with aioresponses() as m:
+            m.get(SCHED_RE, payload=SCHEDULE_JSON, headers={"ETag": '"v1"'})  # type: ignore[misc]
+            deps = await self._client(session, cache).get_route_schedule("500T")
+        assert isinstance(deps[0], ScheduledDeparture)
+        entry = cache.get(f"{MIDDLE_BASE}/v1/routes/500T/schedule")
+        assert entry is not None and entry.data == SCHEDULE_JSON and entry.etag == '"v1"'
+        assert cache.stats.misses == 1
+
+    async def test_fresh_copy_is_served_without_a_request(
+        self, session: aiohttp.ClientSession
+    ) -> None:
+        cache = ResponseCache()
+        cache.put(
+            f"{MIDDLE_BASE}/v1/routes/500T/schedule",
+            CachedResponse(SCHEDULE_JSON, time.time()),
+        )
+        client = self._client(session, cache)
+        with aioresponses():
+            first = await client.get_route_schedule("500T")
+            second = await client.get_route_schedule("500T")
+        assert first[0].departure_time == "05:55"
+        assert second is first
+        assert cache.stats.hits == 2
+
+    async def test_stale_copy_is_served_then_revalidated(
+        self, session: aiohttp.ClientSession
+    ) -> None:
+        cache = ResponseCache()
+        url = f"{MIDDLE_BASE}/v1/routes/500T/schedule"
+        cache.put(url, CachedResponse(SCHEDULE_JSON, time.time() - 7 * 24 * 3600, '"v1"'))
+        client = self._client(session, cache)
+        newer = [{**SCHEDULE_JSON[0], "departure_time": "06:10"}]
+        with aioresponses() as m:
+            m.get(SCHED_RE, payload=newer, headers={"ETag": '"v2"'})  # type: ignore[misc]
+            stale = await client.get_route_schedule("500T")
+            assert stale[0].departure_time == "05:55"
+            await asyncio.gather(*client._revalidating.values())  # type: ignore[reportPrivateUsage]
+            sent = list(m.requests.values())[0][0].kwargs["headers"]
+        assert sent["If-None-Match"] == '"v1"'
+        fresh = await client.get_route_schedule("500T")
+        assert fresh[0].departure_time == "06:10"
+        assert cache.stats.stale_hits == 1
+        assert cache.get(url).etag == '"v2"'  # type: ignore[union-attr]
+
+    async def test_failed_revalidation_keeps_copy(self, session: aiohttp.ClientSession) -> None:
+        cache = ResponseCache()
+        url = f"{MIDDLE_BASE}/v1/garages"
+        cache.put(url, CachedResponse(GARAGE_LIST_JSON, 0.0))
+        client = self._client(session, cache)
+        with aioresponses() as m:
+            m.get(GARAGES_RE, status=503)  # type: ignore[misc]
+            assert await client.get_garages() == GARAGE_LIST_JSON
+            await asyncio.gather(
+                *client._revalidating.values(),  # type: ignore[reportPrivateUsage]
+                return_exceptions=True,
+            )
+        assert cache.get(url) is not None
+
+    async def test_live_endpoints_bypass_cache(self, session: aiohttp.ClientSession) -> None:
+        cache = ResponseCache()
+        with aioresponses() as m:
+            m.get(ARRIVES_RE, payload=ARRIVALS_JSON)  # type: ignore[misc]
+            await self._client(session, cache).get_stop_arrivals("220602")
+        assert len(cache) == 0
+
+
+class TestGetFleetDelta:
+    async def test_parses_delta(self, client: IettMiddleClient) -> None:
+        body = {
+            "cursor": 42,
+            "reset": False,
+            "changed": ROUTE_FLEET_JSON,
+            "removed": ["A-001"],
+            "checksum": "1-00000000",
+        }
+        with aioresponses() as m:
+            m.get(FLEET_RE, payload=body)  # type: ignore[misc]
+            delta = await client.get_fleet_delta("41")
+            url = str(list(m.requests)[0][1])
+        assert url.endswith("/v1/fleet?since=41")
+        assert delta.cursor == "42"
+        assert not delta.reset
+        assert delta.changed[0].kapino == "C-325"
+        assert delta.removed == ["A-001"]
+
+    async def test_full_resync_is_streamed(self, client: IettMiddleClient) -> None:
+        body = {"cursor": 1, "reset": True, "changed": FLEET_JSON + ROUTE_FLEET_JSON}
+        with (
+            aioresponses() as m,
+            patch("custom_components.iett.client.json_loads", side_effect=AssertionError),
+        ):
+            m.get(FLEET_RE, payload=body)  # type: ignore[misc]
+            delta = await client.get_fleet_delta(None)
+        assert (delta.cursor, delta.reset, delta.removed) == ("1", True, [])
+        assert [bus.kapino for bus in delta.changed] == ["A-001", "C-325"]
+
+    async def test_plain_list_means_no_delta_support(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(FLEET_RE, payload=FLEET_JSON)  # type: ignore[misc]
+            delta = await client.get_fleet_delta(None)
+        assert delta.cursor is None
+        assert delta.reset
+        assert delta.changed[0].kapino == "A-001"
+
+
+class TestStream:
+    async def test_yields_parsed_events(self, middle_server: Any) -> None:
+        client = IettMiddleClient(None, middle_server.url)
+        stop = stop_channel("220602")
+        try:
+            stream = client.stream([stop, FLEET_CHANNEL], since="41")
+            assert (await anext(stream)).channel == READY
+            middle_server.push(stop, "not a list of arrivals")
+            middle_server.push(stop, ARRIVALS_JSON)
+            middle_server.push(
+                FLEET_CHANNEL, {"cursor": 42, "changed": ROUTE_FLEET_JSON, "removed": []}
+            )
+            middle_server.close_streams()
+            events = [event async for event in stream]
+        finally:
+            await client.close()
+        assert middle_server.requests[-1] == "/v1/stream?channels=fleet,stop:220602&since=41"
+        assert [e.channel for e in events] == [stop, FLEET_CHANNEL]
+        assert events[0].data[0] == Arrival(**ARRIVALS_JSON[0])
+        assert events[1].data.cursor == "42"
+        assert events[1].data.changed[0].kapino == "C-325"
+
+    async def test_missing_endpoint_raises_with_status(self, middle_server: Any) -> None:
+        middle_server.stream_supported = False
+        client = IettMiddleClient(None, middle_server.url)
+        try:
+            with pytest.raises(IettMiddleError) as exc_info:
+                await anext(client.stream([FLEET_CHANNEL]))
+        finally:
+            await client.close()
+        assert exc_info.value.status == 404
+
+
+class TestStreamingDecode:
+    def _scan(
+        self, text: str, cut: int, scanner: _JsonArrayScanner | None = None
+    ) -> list[object]:
+        scanner = scanner or _JsonArrayScanner()
+        items: list[object] = []
+        for i in range(0, len(text), cut):
+            items += scanner.feed(text[i:i + cut])
+        items += scanner.feed("", final=True)
+        return items
+
+    def test_member_array_of_an_object_is_streamed(self) -> None:
+        body = {
+            "cursor": 7,
+            "reset": True,
+            "changed": FLEET_JSON * 3 + [{"changed": [1, "]}"]}],
+            "removed": [],
+            "checksum": "3-abc",
+        }
+        text = json.dumps(body, indent=1)
+        for cut in (1, 2, 5, 13, len(text)):
+            scanner = _JsonArrayScanner("changed")
+            assert self._scan(text, cut, scanner) == body["changed"], cut
+            assert scanner.wrapped
+            assert scanner.members == {
+                "cursor": 7, "reset": True, "removed": [], "checksum": "3-abc"
+            }
+
+    def test_member_scanner_still_takes_a_bare_array(self) -> None:
+        scanner = _JsonArrayScanner("changed")
+        assert self._scan(json.dumps(FLEET_JSON), 4, scanner) == FLEET_JSON
+        assert not scanner.wrapped and scanner.members == {}
+
+    @pytest.mark.parametrize("text", ['{"cursor": 1', '{"cursor" 1}', '{"changed": [1, 2]', '{1: 2}'])
+    def test_malformed_object_raises(self, text: str) -> None:
+        with pytest.raises(ValueError):
+            self._scan(text, 3, _JsonArrayScanner("changed"))
+
+    @pytest.mark.parametrize("text", [
+        "[-2500.0, 1e+5, 2.5E-3, 7]",
+        '{"cursor": -2500.0, "changed": [1.5e-2, -3.0], "removed": 4E+1}',
+    ])
+    def test_numbers_split_anywhere_decode_whole(self, text: str) -> None:
+        expected = json.loads(text)
+        for cut in range(1, len(text)):
+            scanner = _JsonArrayScanner("changed")
+            items = scanner.feed(text[:cut]) + scanner.feed(text[cut:])
+            items += scanner.feed("", final=True)
+            if isinstance(expected, list):
+                assert items == expected, cut
+            else:
+                assert items == expected["changed"], cut
+                assert scanner.members == {"cursor": -2500.0, "removed": 40.0}, cut
+
+    def test_any_chunking_yields_same_items(self) -> None:
+        payload = FLEET_JSON * 5 + ROUTE_FLEET_JSON + [{"k": "a, ] \\\" {"}, 12, [1, [2]]]
+        text = json.dumps(payload, ensure_ascii=False, indent=1)
+        rng = random.Random(7)
+        for cut in [1, 2, 3, 7, 64, len(text)] + [rng.randint(1, 50) for _ in range(20)]:
+            assert self._scan(text, cut) == payload, cut
+
+    def test_empty_array(self) -> None:
+        assert self._scan("  [ ]  ", 1) == []
+
+    def test_truncated_body_raises(self) -> None:
+        with pytest.raises(ValueError):
+            self._scan(json.dumps(FLEET_JSON)[:-5], 10)
+
+    def test_non_array_raises(self) -> None:
+        with pytest.raises(ValueError):
+            self._scan('{"a": 1}', 4)
+
+    async def test_truncated_fleet_is_middle_error(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(FLEET_RE, body=json.dumps(FLEET_JSON)[:-3])  # type: ignore[misc]
+            with pytest.raises(IettMiddleError):
+                await client.get_all_buses()
+
+
 class TestGetRouteBuses:
     async def test_returns_buses(self, client: IettMiddleClient) -> None:
         with aioresponses() as m:
@@ -79,6 +436,22 @@ class TestGetStopArrivals:
         assert arrivals == []
 
 
+class TestGetStopsArrivals:
+    async def test_returns_arrivals_per_stop(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(BULK_RE, payload={"220602": ARRIVALS_JSON})  # type: ignore[misc]
+            result = await client.get_stops_arrivals(["220602", "301341"])
+        assert [a.eta_minutes for a in result["220602"]] == [4, 12]
+        assert result["301341"] == []
+
+    async def test_error_carries_status(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(BULK_RE, status=404)  # type: ignore[misc]
+            with pytest.raises(IettMiddleError) as exc_info:
+                await client.get_stops_arrivals(["220602"])
+        assert exc_info.value.status == 404
+
+
 class TestGetRouteSchedule:
     async def test_returns_schedule(self, client: IettMiddleClient) -> None:
         with aioresponses() as m:
@@ -88,6 +461,159 @@ class TestGetRouteSchedule:
         assert deps[0].departure_time == "05:55"
 
 
+class TestTimings:
+    def test_endpoint_templates(self) -> None:
+        assert endpoint("/v1/stops/220602/arrivals") == "/v1/stops/{id}/arrivals"
+        assert endpoint("/v1/routes/500T/schedule?day=I") == "/v1/routes/{id}/schedule"
+        assert endpoint("/v1/stops/arrivals?dcodes=1,2") == "/v1/stops/arrivals"
+        assert endpoint("/v1/stops/nearby?lat=41") == "/v1/stops/nearby"
+        assert endpoint("/v1/fleet") == "/v1/fleet"
+
+    async def test_records_per_endpoint_only_when_enabled(
+        self, session: aiohttp.ClientSession
+    ) -> None:
+        timings = Timings()
+        client = IettMiddleClient(session, MIDDLE_BASE, timings=timings)
+        with aioresponses() as m:
+            m.get(SCHED_RE, payload=SCHEDULE_JSON)  # type: ignore[misc]
+            m.get(SCHED_RE, payload=SCHEDULE_JSON)  # type: ignore[misc]
+            await client.get_route_schedule("500T")
+            assert timings.as_dict() == {}
+            timings.enable(self)
+            await client.get_route_schedule("34")
+        scope = "/v1/routes/{id}/schedule"
+        for metric in (LATENCY, DECODE, BUILD):
+            assert timings.get(scope, metric).count == 1  # type: ignore[union-attr]
+        assert timings.get(scope, BYTES).last == len(json.dumps(SCHEDULE_JSON))  # type: ignore[union-attr]
+
+
+class TestResilience:
+    async def test_transient_failure_is_retried(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(SCHED_RE, status=503)  # type: ignore[misc]
+            m.get(SCHED_RE, payload=SCHEDULE_JSON)  # type: ignore[misc]
+            deps = await client.get_route_schedule("500T")
+        assert deps[0].departure_time == "05:55"
+        assert client.stats.retries == 1
+
+    async def test_client_errors_are_not_retried(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(DETAIL_RE, status=404)  # type: ignore[misc]
+            m.get(DETAIL_RE, payload=STOP_DETAIL_JSON)  # type: ignore[misc]
+            with pytest.raises(IettMiddleError) as exc_info:
+                await client.get_stop_detail("301341")
+        assert not exc_info.value.retryable
+        assert client.stats.retries == 0
+
+    async def test_attempts_are_bounded(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            for _ in range(4):
+                m.get(SCHED_RE, status=500)  # type: ignore[misc]
+            with pytest.raises(IettMiddleError) as exc_info:
+                await client.get_route_schedule("500T")
+        assert exc_info.value.status == 500
+        assert client.stats.retries == NO_BACKOFF.attempts - 1
+
+    async def test_timeout_is_its_own_error(self, session: aiohttp.ClientSession) -> None:
+        client = IettMiddleClient(session, MIDDLE_BASE, retry=RetryPolicy(attempts=1))
+        with aioresponses() as m:
+            m.get(SCHED_RE, exception=asyncio.TimeoutError())  # type: ignore[misc]
+            with pytest.raises(IettMiddleTimeout):
+                await client.get_route_schedule("500T")
+
+    async def test_open_breaker_short_circuits(self, session: aiohttp.ClientSession) -> None:
+        client = IettMiddleClient(
+            session, MIDDLE_BASE, retry=NO_BACKOFF, breaker=CircuitBreaker(threshold=3)
+        )
+        with aioresponses() as m:
+            for _ in range(3):
+                m.get(SCHED_RE, status=502)  # type: ignore[misc]
+            with pytest.raises(IettMiddleError):
+                await client.get_route_schedule("500T")
+            assert client.breaker.state == OPEN
+            with pytest.raises(IettMiddleUnavailable) as exc_info:
+                await client.get_announcements("500T")
+        assert exc_info.value.retry_after == pytest.approx(30, abs=1)
+        assert client.stats.short_circuited == 1
+        assert len(m.requests) == 1  # only the schedule URL was ever requested
+
+    async def test_slow_arrivals_are_hedged(self, client: IettMiddleClient) -> None:
+        for _ in range(20):
+            client._hedge_latency.setdefault(  # type: ignore[reportPrivateUsage]
+                "/v1/stops/{id}/arrivals", Rolling()
+            ).add(0.01)
+        calls = 0
+
+        async def slow_then_fast(url: Any, **kwargs: Any) -> None:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(1)
+
+        with aioresponses() as m:
+            m.get(ARRIVES_RE, payload=ARRIVALS_JSON, callback=slow_then_fast, repeat=True)  # type: ignore[misc]
+            arrivals = await client.get_stop_arrivals("220602", hedge=True)
+        assert isinstance(arrivals[0], Arrival)
+        assert client.stats.hedged == 1
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_share_one_request(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(SCHED_RE, payload=SCHEDULE_JSON)  # type: ignore[misc]
+            results = await asyncio.gather(
+                *(client.get_route_schedule("500T") for _ in range(3))
+            )
+        assert sum(len(calls) for calls in m.requests.values()) == 1
+        assert results[0] is results[1] is results[2]
+        assert client.stats.coalesced == 2
+
+    async def test_failure_reaches_every_caller(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(DETAIL_RE, status=404)  # type: ignore[misc]
+            results = await asyncio.gather(
+                client.get_stop_detail("301341"),
+                client.get_stop_detail("301341"),
+                return_exceptions=True,
+            )
+        assert all(isinstance(r, IettMiddleError) for r in results)
+
+    async def test_cancelled_caller_leaves_request_running(
+        self, client: IettMiddleClient
+    ) -> None:
+        async def slow(url: Any, **kwargs: Any) -> None:
+            await asyncio.sleep(0.05)
+
+        with aioresponses() as m:
+            m.get(SCHED_RE, payload=SCHEDULE_JSON, callback=slow)  # type: ignore[misc]
+            first = asyncio.ensure_future(client.get_route_schedule("500T"))
+            second = asyncio.ensure_future(client.get_route_schedule("500T"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            deps = await second
+        assert deps[0].departure_time == "05:55"
+
+    async def test_recent_result_is_reused_briefly(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(ANNS_RE, payload=ANNOUNCEMENTS_JSON, repeat=True)  # type: ignore[misc]
+            first = await client.get_announcements("500T")
+            again = await client.get_announcements("500T")
+            assert again is first
+            assert client.stats.reused == 1
+            url = f"{MIDDLE_BASE}/v1/routes/500T/announcements"
+            client._recent[url] = (time.monotonic() - 60, first)  # type: ignore[reportPrivateUsage]
+            await client.get_announcements("500T")
+        assert sum(len(calls) for calls in m.requests.values()) == 2
+
+    async def test_live_feeds_are_not_reused(self, client: IettMiddleClient) -> None:
+        with aioresponses() as m:
+            m.get(ARRIVES_RE, payload=ARRIVALS_JSON, repeat=True)  # type: ignore[misc]
+            await client.get_stop_arrivals("220602")
+            await client.get_stop_arrivals("220602")
+        assert client.stats.reused == 0
+        assert sum(len(calls) for calls in m.requests.values()) == 2
+
+
 class TestGetAnnouncements:
     async def test_returns_announcements(self, client: IettMiddleClient) -> None:
         with aioresponses() as m:
@@ -165,7 +691,7 @@ class TestGetRouteStops:
 
 @pytest.fixture()
 async def client(session: aiohttp.ClientSession) -> IettMiddleClient:
-    return IettMiddleClient(session, MIDDLE_BASE)
+    return IettMiddleClient(session, MIDDLE_BASE, retry=NO_BACKOFF)
 
 
 class TestGetAllBuses:
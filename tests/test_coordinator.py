@@ -1,23 +1,68 @@
 """Tests for IettCoordinator — mocks IettMiddleClient & HomeAssistant."""
 from __future__ import annotations
 
+import asyncio
+import time
+from dataclasses import replace
+from datetime import datetime, timedelta
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers.update_coordinator import UpdateFailed
 
 from custom_components.iett.const import (
     CONF_DCODE,
     CONF_HAT_KODU,
+    CONF_HEDGE,
     CONF_MIDDLE_URL,
+    CONF_POLL_CEILING,
+    CONF_POLL_FLOOR,
+    CONF_PUSH,
+    CONF_STOPS,
+    DATA_CLIENTS,
+    EVENT_ANNOUNCEMENT_ADDED,
+    EVENT_ANNOUNCEMENT_REMOVED,
+    EVENT_ANNOUNCEMENT_UPDATED,
     FEED_ALL_FLEET,
     FEED_ROUTE_ANNOUNCEMENTS,
+    FEED_ROUTE_BUNDLE,
     FEED_ROUTE_FLEET,
     FEED_ROUTE_SCHEDULE,
     FEED_STOP_ARRIVALS,
+    FEED_STOP_BOARD,
+    FEED_ZONE_FLEET,
+    SNAPSHOT_SAVE_DELAY,
 )
-from custom_components.iett.coordinator import IettCoordinator
+from custom_components.iett.coordinator import (
+    IettArrivalsHub,
+    IettCoordinator,
+    IettFleetHub,
+    IettRouteBundleCoordinator,
+    _IettHub,  # type: ignore[reportPrivateUsage]
+    async_get_client,
+    async_get_hub,
+    async_get_phases,
+    async_get_push,
+    async_release_shared,
+    async_remove_snapshot,
+    create_coordinator,
+)
+from custom_components.iett.board import BoardDeparture, BoardStop
+from custom_components.iett.bundle import RouteBundle
 from custom_components.iett.client import IettMiddleError
+from custom_components.iett.fleet import FleetSnapshot
+from custom_components.iett.metrics import REFRESH
+from custom_components.iett.models import (
+    Announcement,
+    Arrival,
+    BusPosition,
+    FleetDelta,
+    ScheduledDeparture,
+)
+from custom_components.iett.push import FLEET_CHANNEL, PushEvent, stop_channel
+from custom_components.iett.schedule import ScheduleIndex
 from tests.conftest import (
     ANNOUNCEMENTS_JSON,
     ARRIVALS_JSON,
@@ -32,6 +77,8 @@ def _make_hass() -> MagicMock:
     hass = MagicMock()
     hass.loop = MagicMock()
     hass.config = MagicMock()
+    hass.data = {}
+    hass.is_stopping = False
     return hass
 
 
@@ -45,6 +92,11 @@ def _entry_data(feed_type: str, **extra: Any) -> dict[str, Any]:
     }
 
 
+def _reset(buses: list[BusPosition]) -> FleetDelta:
+    """A delta-protocol full snapshot of *buses*."""
+    return FleetDelta(cursor="1", reset=True, changed=buses, removed=[])
+
+
 @pytest.fixture()
 def hass() -> MagicMock:
     return _make_hass()
@@ -57,55 +109,342 @@ def hass() -> MagicMock:
 class TestCoordinatorAllFleet:
     async def test_returns_fleet(self, hass: MagicMock) -> None:
         coord = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET))
+        buses = [BusPosition(**item) for item in FLEET_JSON]
         mock_client = MagicMock()
-        mock_client.get_all_buses = AsyncMock(return_value=FLEET_JSON)
-        with (
-            patch("custom_components.iett.coordinator.async_get_clientsession"),
-            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
-        ):
+        mock_client.get_fleet_delta = AsyncMock(return_value=_reset(buses))
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
             result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
-        assert result == FLEET_JSON
+        assert result.to_positions() == buses
 
     async def test_raises_update_failed(self, hass: MagicMock) -> None:
         from homeassistant.helpers.update_coordinator import UpdateFailed
         coord = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET))
         mock_client = MagicMock()
-        mock_client.get_all_buses = AsyncMock(side_effect=IettMiddleError("down"))
-        with (
-            patch("custom_components.iett.coordinator.async_get_clientsession"),
-            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
-        ):
+        mock_client.get_fleet_delta = AsyncMock(side_effect=IettMiddleError("down"))
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
             with pytest.raises(UpdateFailed):
                 await coord._async_update_data()  # type: ignore[reportPrivateUsage]
 
+    async def test_does_not_poll_on_its_own(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET))
+        assert coord.update_interval is None
+
 
 # ---------------------------------------------------------------------------
 # FEED_ROUTE_FLEET
 # ---------------------------------------------------------------------------
 
+def _route_fleet() -> list[BusPosition]:
+    buses = [BusPosition(**item) for item in ROUTE_FLEET_JSON]
+    buses.append(BusPosition(**{**ROUTE_FLEET_JSON[0], "kapino": "C-400", "route_code": "14M"}))
+    buses.append(BusPosition(**FLEET_JSON[0]))
+    return buses
+
+
 class TestCoordinatorRouteFleet:
-    async def test_returns_route_buses(self, hass: MagicMock) -> None:
+    async def test_returns_route_slice_of_fleet(self, hass: MagicMock) -> None:
         coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET))
         mock_client = MagicMock()
-        mock_client.get_route_buses = AsyncMock(return_value=ROUTE_FLEET_JSON)
-        with (
-            patch("custom_components.iett.coordinator.async_get_clientsession"),
-            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
-        ):
+        mock_client.get_fleet_delta = AsyncMock(return_value=_reset(_route_fleet()))
+        mock_client.get_route_buses = AsyncMock()
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
             result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
-        assert result == ROUTE_FLEET_JSON
-        mock_client.get_route_buses.assert_called_once_with("500T")
+        assert [b.kapino for b in result] == ["C-325"]
+        mock_client.get_route_buses.assert_not_called()
+
+    async def test_route_code_lookup_is_case_insensitive(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET, hat_kodu="14m"))
+        mock_client = MagicMock()
+        mock_client.get_fleet_delta = AsyncMock(return_value=_reset(_route_fleet()))
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        assert [b.kapino for b in result] == ["C-400"]
 
     async def test_raises_update_failed_on_error(self, hass: MagicMock) -> None:
         from homeassistant.helpers.update_coordinator import UpdateFailed
         coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET))
         mock_client = MagicMock()
-        mock_client.get_route_buses = AsyncMock(side_effect=IettMiddleError("bad"))
+        mock_client.get_fleet_delta = AsyncMock(side_effect=IettMiddleError("bad"))
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            with pytest.raises(UpdateFailed):
+                await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+
+
+# ---------------------------------------------------------------------------
+# Hub base class
+# ---------------------------------------------------------------------------
+
+async def _fetch(self: Any, context: str) -> None:
+    return None
+
+
+_HUB_HOOKS: dict[str, Any] = {
+    "hub_slice": lambda self, context: None,
+    "async_fetch": _fetch,
+    "push_channels": lambda self: set(),
+    "async_handle_push": lambda self, event: None,
+}
+
+
+class TestHubBase:
+    @pytest.mark.parametrize("missing", sorted(_HUB_HOOKS))
+    def test_hub_missing_a_hook_cannot_be_created(self, hass: MagicMock, missing: str) -> None:
+        hooks = {name: hook for name, hook in _HUB_HOOKS.items() if name != missing}
+        hub_cls = type("PartialHub", (_IettHub,), hooks)
+        with pytest.raises(TypeError, match=missing):
+            hub_cls(hass, "http://iett-middle.test")
+
+
+# ---------------------------------------------------------------------------
+# Shared fleet hub
+# ---------------------------------------------------------------------------
+
+class TestFleetHub:
+    async def test_one_fetch_for_many_route_entries(self, hass: MagicMock) -> None:
+        coords = [
+            IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET, hat_kodu=code))
+            for code in ("500T", "14M", "34", "15F")
+        ]
+        coords.append(IettCoordinator(hass, _entry_data(FEED_ALL_FLEET)))
+        mock_client = MagicMock()
+        mock_client.get_fleet_delta = AsyncMock(return_value=_reset(_route_fleet()))
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            results = await asyncio.gather(
+                *(c._async_update_data() for c in coords)  # type: ignore[reportPrivateUsage]
+            )
+        mock_client.get_fleet_delta.assert_awaited_once()
+        assert [len(r) for r in results] == [1, 1, 0, 0, 3]
+
+    async def test_idles_only_on_the_schedules_of_its_own_routes(self, hass: MagicMock) -> None:
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        with patch.object(hub, "_schedule_refresh"):
+            hub.async_add_listener(lambda: None, "500T")
+        night = ScheduleIndex(
+            [ScheduledDeparture(**{**SCHEDULE_JSON[0], "departure_time": "02:00"})]
+        )
+        for code in ("N1", "500T"):
+            coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE, hat_kodu=code))
+            coord.metrics_scope = code
+            coord.schedule = night
+            coord._adapt([], True)  # type: ignore[reportPrivateUsage]
+            with patch(
+                "custom_components.iett.coordinator.dt_util.now",
+                return_value=datetime(2024, 1, 5, 10, 0),
+            ):
+                hub._adapt(False)  # type: ignore[reportPrivateUsage]
+            if code == "N1":
+                # Another route's night-only schedule says nothing about 500T.
+                assert hub.update_interval < hub.poller.ceiling
+        assert hub.update_interval == hub.poller.ceiling
+        assert hub.service_routes() == {"500T"}
+        with patch.object(hub, "_schedule_refresh"):
+            hub.async_add_listener(lambda: None, FEED_ALL_FLEET)
+        assert hub.service_routes() == set()
+
+    async def test_hub_is_shared_per_middle_url(self, hass: MagicMock) -> None:
+        a = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        b = async_get_hub(hass, IettFleetHub, "http://iett-middle.test/")
+        c = async_get_hub(hass, IettFleetHub, "http://other.test")
+        assert a is b
+        assert a is not c
+
+    async def test_hub_update_is_pushed_to_subscribers(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET))
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        updates: list[int] = []
+        with patch.object(hub, "_schedule_refresh"), patch.object(coord, "_schedule_refresh"):
+            unsub = coord.async_add_listener(lambda: updates.append(len(coord.data)))
+            mock_client = MagicMock()
+            mock_client.get_fleet_delta = AsyncMock(return_value=_reset(_route_fleet()))
+            mock_client.close = AsyncMock()
+            with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+                await hub.async_refresh()
+            assert updates == [1]
+
+            unsub()
+            await async_release_shared(hass, "http://iett-middle.test")
+        assert async_get_hub(hass, IettFleetHub, "http://iett-middle.test") is not hub
+        mock_client.close.assert_awaited_once()
+
+    async def test_clients_close_when_home_assistant_stops(self, hass: MagicMock) -> None:
+        client = async_get_client(hass, "http://iett-middle.test")
+        assert async_get_client(hass, "http://other.test") is not client
+        (event, on_stop), _ = hass.bus.async_listen_once.call_args
+        assert event == EVENT_HOMEASSISTANT_STOP
+        hass.bus.async_listen_once.assert_called_once()
+        await on_stop(MagicMock())
+        assert client._session.closed  # type: ignore[reportPrivateUsage]
+        assert DATA_CLIENTS not in hass.data
+
+    async def test_unchanged_route_slice_is_not_pushed(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET))
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        other_route = BusPosition(
+            kapino="Z-999", latitude=41.0, longitude=29.0, speed=10,
+            last_seen="12:00:00", route_code="14M",
+        )
+        updates: list[int] = []
+        with patch.object(hub, "_schedule_refresh"), patch.object(coord, "_schedule_refresh"):
+            coord.async_add_listener(lambda: updates.append(len(coord.data)))
+            mock_client = MagicMock()
+            mock_client.get_fleet_delta = AsyncMock(side_effect=[
+                _reset(_route_fleet()),
+                FleetDelta(cursor="2", reset=False, changed=[other_route], removed=[]),
+            ])
+            with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+                await hub.async_refresh()
+                await hub.async_refresh()
+        assert updates == [1]
+        assert coord.skipped_writes == 1
+
+    async def test_hub_polls_within_tightest_entry_bounds(self, hass: MagicMock) -> None:
+        eager = IettCoordinator(
+            hass, _entry_data(FEED_ROUTE_FLEET), {CONF_POLL_FLOOR: 5, CONF_POLL_CEILING: 60}
+        )
+        lazy = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET), {CONF_POLL_FLOOR: 30})
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        with patch.object(hub, "_schedule_refresh"), patch.object(eager, "_schedule_refresh"):
+            unsub_eager = eager.async_add_listener(lambda: None)
+            lazy.async_add_listener(lambda: None)
+            assert (hub.poller.floor, hub.poller.ceiling) == (
+                timedelta(seconds=5), timedelta(seconds=60)
+            )
+            mock_client = MagicMock()
+            mock_client.get_fleet_delta = AsyncMock(side_effect=[
+                _reset(_route_fleet()),
+                *(FleetDelta(cursor="1", reset=False, changed=[], removed=[]) for _ in range(9)),
+            ])
+            with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+                for _ in range(10):
+                    await hub.async_refresh()
+            # Unchanged fleet backs off to the eager entry's ceiling.
+            assert eager.effective_interval == timedelta(seconds=60)
+            unsub_eager()
+        assert hub.poller.ceiling == timedelta(seconds=120)
+
+    async def test_changed_fleet_feeds_motion_history(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET))
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        moved = BusPosition(**{**_route_fleet()[0].as_dict(), "latitude": 41.01, "last_seen": "x"})
+        mock_client = MagicMock()
+        mock_client.get_fleet_delta = AsyncMock(side_effect=[
+            _reset(_route_fleet()),
+            FleetDelta(cursor="2", reset=False, changed=[moved], removed=[]),
+        ])
         with (
-            patch("custom_components.iett.coordinator.async_get_clientsession"),
             patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(hub, "_schedule_refresh"),
         ):
-            with pytest.raises(UpdateFailed):
+            await hub.async_refresh()
+            await hub.async_refresh()
+        assert coord.motion is hub.motion
+        assert hub.motion.history(moved.kapino)[-1][0] == 41.01
+        assert len(hub.motion.history(moved.kapino)) == 2
+
+    async def test_hub_failure_marks_subscribers_unavailable(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET))
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        with patch.object(hub, "_schedule_refresh"), patch.object(coord, "_schedule_refresh"):
+            coord.async_add_listener(lambda: None)
+            mock_client = MagicMock()
+            mock_client.get_fleet_delta = AsyncMock(side_effect=IettMiddleError("down"))
+            with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+                await hub.async_refresh()
+        assert coord.last_update_success is False
+
+    async def test_pushed_delta_updates_subscribers(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_FLEET))
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        moved = BusPosition(**{**_route_fleet()[0].as_dict(), "latitude": 41.01, "last_seen": "x"})
+        with patch.object(hub, "_schedule_refresh"), patch.object(coord, "_schedule_refresh"):
+            coord.async_add_listener(lambda: None)
+            hub.async_handle_push(PushEvent(FLEET_CHANNEL, _reset(_route_fleet())))
+            hub.async_handle_push(
+                PushEvent(FLEET_CHANNEL, FleetDelta("2", False, [moved], []))
+            )
+        assert coord.data[0].latitude == 41.01
+        assert hub.store.cursor == "2"
+        assert len(hub.motion.history(moved.kapino)) == 2
+
+        # A delta that leaves the store off the server's checksum forces a resync.
+        hub.async_handle_push(
+            PushEvent(FLEET_CHANNEL, FleetDelta("3", False, [], [], checksum="0-bogus"))
+        )
+        assert hub.store.cursor is None
+        hass.async_create_task.assert_called_once()
+        hass.async_create_task.call_args.args[0].close()
+
+    async def test_pushed_hub_polls_at_its_ceiling(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET), {CONF_PUSH: True})
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        with patch.object(hub, "_schedule_refresh") as schedule:
+            unsub = coord.async_add_listener(lambda: None)
+            assert hub.push_channels() == {FLEET_CHANNEL}
+            link = async_get_push(hass, "http://iett-middle.test")
+            assert link.channels == {FLEET_CHANNEL}
+            schedule.reset_mock()
+            hub.async_set_pushed(True)
+            assert coord.effective_interval == hub.poller.ceiling
+            hub.async_set_pushed(False)
+            assert coord.effective_interval == hub.poller.interval
+            assert schedule.call_count == 2
+            unsub()
+        assert link.channels == frozenset()
+
+
+def _zone_state(hass: MagicMock, **attrs: Any) -> None:
+    state = MagicMock()
+    state.attributes = attrs
+    hass.states.get = MagicMock(side_effect=lambda entity_id: state if entity_id == "zone.home" else None)
+
+
+def _near(kapino: str, metres_north: float) -> BusPosition:
+    return BusPosition(
+        kapino=kapino, latitude=41.0 + metres_north / 111_195, longitude=29.0,
+        speed=0, last_seen="12:00:00",
+    )
+
+
+class TestZoneFleet:
+    async def test_counts_buses_within_zone_radius(self, hass: MagicMock) -> None:
+        _zone_state(hass, latitude=41.0, longitude=29.0, radius=500)
+        coord = IettCoordinator(hass, _entry_data(FEED_ZONE_FLEET))
+        near = IettCoordinator(hass, _entry_data(FEED_ZONE_FLEET, radius=150))
+        buses = [_near("far", 900), _near("mid", 300), _near("close", 100)]
+        mock_client = MagicMock()
+        mock_client.get_fleet_delta = AsyncMock(return_value=_reset(buses))
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+            nearest = await near._async_update_data()  # type: ignore[reportPrivateUsage]
+        mock_client.get_fleet_delta.assert_awaited_once()
+        assert list(result.kapino) == ["close", "mid"]
+        assert list(nearest.kapino) == ["close"]
+
+    async def test_hub_update_moves_buses_in_and_out(self, hass: MagicMock) -> None:
+        _zone_state(hass, latitude=41.0, longitude=29.0, radius=500)
+        coord = IettCoordinator(hass, _entry_data(FEED_ZONE_FLEET))
+        hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+        updates: list[list[str]] = []
+        with patch.object(hub, "_schedule_refresh"), patch.object(coord, "_schedule_refresh"):
+            coord.async_add_listener(lambda: updates.append(list(coord.data.kapino)))
+            mock_client = MagicMock()
+            mock_client.get_fleet_delta = AsyncMock(side_effect=[
+                _reset([_near("a", 100), _near("b", 900)]),
+                FleetDelta(cursor="2", reset=False, changed=[_near("a", 200)], removed=[]),
+                FleetDelta(cursor="3", reset=False, changed=[_near("b", 50)], removed=["a"]),
+            ])
+            with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+                for _ in range(3):
+                    await hub.async_refresh()
+        assert updates == [["a"], ["a"], ["b"]]
+
+    async def test_missing_zone_marks_entry_unavailable(self, hass: MagicMock) -> None:
+        _zone_state(hass, latitude=41.0, longitude=29.0)
+        coord = IettCoordinator(hass, _entry_data(FEED_ZONE_FLEET, zone="zone.gone"))
+        mock_client = MagicMock()
+        mock_client.get_fleet_delta = AsyncMock(return_value=_reset([_near("a", 0)]))
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            with pytest.raises(UpdateFailed, match="zone.gone"):
                 await coord._async_update_data()  # type: ignore[reportPrivateUsage]
 
 
@@ -117,14 +456,159 @@ class TestCoordinatorStopArrivals:
     async def test_returns_arrivals(self, hass: MagicMock) -> None:
         coord = IettCoordinator(hass, _entry_data(FEED_STOP_ARRIVALS))
         mock_client = MagicMock()
-        mock_client.get_stop_arrivals = AsyncMock(return_value=ARRIVALS_JSON)
+        mock_client.get_stops_arrivals = AsyncMock(return_value={"220602": ARRIVALS_JSON})
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        assert result == ARRIVALS_JSON
+        mock_client.get_stops_arrivals.assert_called_once_with(["220602"], hedge=False)
+
+    async def test_hedge_option_hedges_the_hub(self, hass: MagicMock) -> None:
+        plain = IettCoordinator(hass, _entry_data(FEED_STOP_ARRIVALS))
+        hedging = IettCoordinator(
+            hass, _entry_data(FEED_STOP_ARRIVALS, dcode="301341"), {CONF_HEDGE: True}
+        )
+        hub = async_get_hub(hass, IettArrivalsHub, "http://iett-middle.test")
+        mock_client = MagicMock()
+        mock_client.get_stops_arrivals = AsyncMock(return_value={})
         with (
-            patch("custom_components.iett.coordinator.async_get_clientsession"),
             patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(hub, "_schedule_refresh"),
         ):
-            result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
-        assert result == ARRIVALS_JSON
-        mock_client.get_stop_arrivals.assert_called_once_with("220602")
+            plain.async_add_listener(lambda: None)
+            remove = hedging.async_add_listener(lambda: None)
+            await hub.async_refresh()
+            assert mock_client.get_stops_arrivals.call_args.kwargs == {"hedge": True}
+            remove()
+            await hub.async_refresh()
+            assert mock_client.get_stops_arrivals.call_args.kwargs == {"hedge": False}
+
+    async def test_does_not_poll_on_its_own(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_STOP_ARRIVALS))
+        assert coord.update_interval is None
+
+
+# ---------------------------------------------------------------------------
+# Batched arrivals against the local stand-in middle server
+# ---------------------------------------------------------------------------
+
+_STOPS = ("220602", "301341", "113333", "114411", "220001")
+
+
+class TestArrivalsHub:
+    @pytest.fixture(autouse=True)
+    async def _close_clients(self, hass: MagicMock) -> Any:
+        yield
+        for client in hass.data.get(DATA_CLIENTS, {}).values():
+            await client.close()
+
+    def _coords(self, hass: MagicMock, url: str) -> list[IettCoordinator]:
+        return [
+            IettCoordinator(hass, _entry_data(FEED_STOP_ARRIVALS, middle_url=url, dcode=d))
+            for d in _STOPS
+        ]
+
+    async def test_first_refreshes_share_one_bulk_request(
+        self, hass: MagicMock, middle_server: Any
+    ) -> None:
+        middle_server.arrivals = {"301341": ARRIVALS_JSON[:1]}
+        coords = self._coords(hass, middle_server.url)
+        results = await asyncio.gather(
+            *(c._async_update_data() for c in coords)  # type: ignore[reportPrivateUsage]
+        )
+        assert middle_server.requests == [f"/v1/stops/arrivals?dcodes={','.join(sorted(_STOPS))}"]
+        assert [len(r) for r in results] == [2, 1, 2, 2, 2]
+
+    async def test_falls_back_to_per_stop_gather(
+        self, hass: MagicMock, middle_server: Any
+    ) -> None:
+        middle_server.bulk_arrivals = False
+        hub = async_get_hub(hass, IettArrivalsHub, middle_server.url)
+        coords = self._coords(hass, middle_server.url)
+        await asyncio.gather(
+            *(c._async_update_data() for c in coords)  # type: ignore[reportPrivateUsage]
+        )
+        assert middle_server.count("/v1/stops/arrivals") == 1
+        assert sum(p.endswith("/arrivals") for p in middle_server.requests) == len(_STOPS)
+
+        # The unsupported bulk endpoint is not probed again.
+        middle_server.requests.clear()
+        with patch.object(hub, "_schedule_refresh"), patch.object(IettCoordinator, "_schedule_refresh"):
+            for c in coords:
+                c.async_add_listener(lambda: None)
+            await hub.async_refresh()
+        assert len(middle_server.requests) == len(_STOPS)
+        assert all("/arrivals?" not in path for path in middle_server.requests)
+
+    async def test_hub_refresh_fans_out_to_each_entry(
+        self, hass: MagicMock, middle_server: Any
+    ) -> None:
+        middle_server.arrivals = {"113333": []}
+        hub = async_get_hub(hass, IettArrivalsHub, middle_server.url)
+        coords = self._coords(hass, middle_server.url)
+        with patch.object(hub, "_schedule_refresh"), patch.object(IettCoordinator, "_schedule_refresh"):
+            for c in coords:
+                c.async_add_listener(lambda: None)
+            await hub.async_refresh()
+        assert len(middle_server.requests) == 1
+        assert [len(c.data) for c in coords] == [2, 2, 0, 2, 2]
+
+    async def test_failing_stop_only_affects_its_entry(
+        self, hass: MagicMock, middle_server: Any
+    ) -> None:
+        from homeassistant.helpers.update_coordinator import UpdateFailed
+        middle_server.bulk_arrivals = False
+        middle_server.failing_stops = {"113333"}
+        coords = self._coords(hass, middle_server.url)
+        results = await asyncio.gather(
+            *(c._async_update_data() for c in coords),  # type: ignore[reportPrivateUsage]
+            return_exceptions=True,
+        )
+        assert isinstance(results[2], UpdateFailed)
+        assert all(isinstance(r, list) for i, r in enumerate(results) if i != 2)
+
+    async def test_stream_feeds_stops_until_it_drops(
+        self, hass: MagicMock, middle_server: Any
+    ) -> None:
+        url = middle_server.url
+        hub = async_get_hub(hass, IettArrivalsHub, url)
+        plain = IettCoordinator(hass, _entry_data(FEED_STOP_ARRIVALS, middle_url=url))
+        pushed = IettCoordinator(
+            hass,
+            _entry_data(FEED_STOP_ARRIVALS, middle_url=url, dcode="301341"),
+            {CONF_PUSH: True},
+        )
+        link = async_get_push(hass, url)
+        try:
+            with patch.object(hub, "_schedule_refresh"), patch.object(IettCoordinator, "_schedule_refresh"):
+                plain.async_add_listener(lambda: None)
+                pushed.async_add_listener(lambda: None)
+                await hub.async_refresh()
+                for _ in range(50):
+                    if hub.pushed:
+                        break
+                    await asyncio.sleep(0.01)
+                assert hub.update_interval == hub.poller.ceiling
+                # The hub streams every stop it serves once anyone asks for push.
+                assert link.channels == {stop_channel("220602"), stop_channel("301341")}
+
+                middle_server.push(stop_channel("301341"), ARRIVALS_JSON[:1])
+                for _ in range(50):
+                    if len(pushed.data) == 1:
+                        break
+                    await asyncio.sleep(0.01)
+                assert len(pushed.data) == 1
+                assert len(plain.data) == 2
+                assert middle_server.count("/v1/stops/arrivals") == 1
+
+                middle_server.stream_supported = False
+                middle_server.close_streams()
+                for _ in range(50):
+                    if not hub.pushed:
+                        break
+                    await asyncio.sleep(0.01)
+                assert hub.update_interval == hub.poller.interval
+        finally:
+            await link.stop()
 
 
 # ---------------------------------------------------------------------------
@@ -136,30 +620,571 @@ class TestCoordinatorRouteSchedule:
         coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE))
         mock_client = MagicMock()
         mock_client.get_route_schedule = AsyncMock(return_value=SCHEDULE_JSON)
-        with (
-            patch("custom_components.iett.coordinator.async_get_clientsession"),
-            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
-        ):
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
             result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
         assert result == SCHEDULE_JSON
         mock_client.get_route_schedule.assert_called_once_with("500T")
 
+    async def test_not_modified_skips_listeners(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE))
+        unchanged = list(SCHEDULE_JSON)
+        mock_client = MagicMock()
+        mock_client.get_route_schedule = AsyncMock(return_value=unchanged)
+        updates: list[int] = []
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            coord.async_add_listener(lambda: updates.append(1))
+            await coord.async_refresh()
+            await coord.async_refresh()
+        assert updates == [1]
+        assert mock_client.get_route_schedule.await_count == 2
+
+    async def test_unchanged_schedule_backs_off(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE), {CONF_POLL_FLOOR: 60})
+        mock_client = MagicMock()
+        mock_client.get_route_schedule = AsyncMock(return_value=SCHEDULE_JSON)
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            coord.async_add_listener(lambda: None)
+            for _ in range(6):
+                await coord.async_refresh()
+        assert coord.effective_interval == timedelta(seconds=4 * 3600)
+
+    async def test_equal_payload_skips_listeners_and_counts(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE))
+        mock_client = MagicMock()
+        mock_client.get_route_schedule = AsyncMock(
+            side_effect=[list(SCHEDULE_JSON), list(SCHEDULE_JSON), []]
+        )
+        updates: list[int] = []
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            coord.async_add_listener(lambda: updates.append(len(coord.data)))
+            for _ in range(3):
+                await coord.async_refresh()
+        assert updates == [len(SCHEDULE_JSON), 0]
+        assert coord.skipped_writes == 1
+
+    async def test_refresh_is_timed_only_when_enabled(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE))
+        mock_client = MagicMock()
+        mock_client.get_route_schedule = AsyncMock(return_value=SCHEDULE_JSON)
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+            coord.timings.enable(self)
+            await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        assert coord.endpoint == "/v1/routes/{id}/schedule"
+        series = coord.timings.get(coord.metrics_scope, REFRESH)
+        assert series is not None and series.count == 1
+
+
+# ---------------------------------------------------------------------------
+# Startup snapshot
+# ---------------------------------------------------------------------------
+
+def _with_snapshot(coord: IettCoordinator, stored: Any = None) -> MagicMock:
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=stored)
+    coord._snapshot_store = store  # type: ignore[reportPrivateUsage]
+    return store
+
+
+class _FakeStore:
+    """A Store whose delayed save stays pending until :meth:`fire` runs it."""
+
+    def __init__(self, disk: dict[str, Any], key: str) -> None:
+        self.disk, self.key = disk, key
+        self.pending: Any = None
+
+    def async_delay_save(self, data_func: Any, delay: float = 0) -> None:
+        self.pending = data_func
+
+    async def async_save(self, data: Any) -> None:
+        self.pending = None
+        self.disk[self.key] = data
+
+    async def async_remove(self) -> None:
+        self.pending = None
+        self.disk.pop(self.key, None)
+
+    async def async_load(self) -> Any:
+        return self.disk.get(self.key)
+
+    def fire(self) -> None:
+        if self.pending is not None:
+            self.disk[self.key] = self.pending()
+            self.pending = None
+
+
+class TestPollPhases:
+    async def test_entries_on_one_url_take_turns(self, hass: MagicMock) -> None:
+        hass.loop.time = MagicMock(return_value=1000.0)
+        coords = []
+        for code in ("500T", "14M", "34"):
+            coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_ANNOUNCEMENTS, hat_kodu=code))
+            coord.metrics_scope = code  # stands in for the config entry id
+            coords.append(coord)
+        arrivals = IettCoordinator(hass, _entry_data(FEED_STOP_ARRIVALS))
+        with patch("custom_components.iett.coordinator.event.async_call_at") as call_at:
+            removers = [c.async_add_listener(lambda: None) for c in coords]
+            arrivals.async_add_listener(lambda: None)
+            # Rebalanced as each joined; rescheduling moves everyone to their phase.
+            for c in coords:
+                c._schedule_refresh()  # type: ignore[reportPrivateUsage]
+            times = [call.args[2] for call in call_at.call_args_list[-3:]]
+        assert [c.poll_phase for c in coords] == [0.0, 0.25, 0.5]
+        assert times == [1200.0, 1275.0, 1350.0]
+        # Arrivals entries are polled by their hub, which holds the last phase.
+        assert arrivals.poll_phase == 0.75
+        phases = async_get_phases(hass, "http://iett-middle.test/")
+        assert len(phases) == 4
+
+        removers[0]()
+        await coords[1].async_shutdown()
+        assert phases.as_dict()["phases"] == {"34": 0.0, "iett_stop_arrivals_hub": 0.5}
+
+
+class TestSnapshot:
+    async def test_fleet_snapshot_round_trips(self, hass: MagicMock) -> None:
+        source = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET))
+        source.data = FleetSnapshot.from_positions(BusPosition(**d) for d in FLEET_JSON)
+        coord = IettCoordinator(hass, _entry_data(FEED_ALL_FLEET))
+        _with_snapshot(coord, source._dump_snapshot())  # type: ignore[reportPrivateUsage]
+        assert await coord.async_restore_snapshot() is True
+        assert [b.kapino for b in coord.data] == [d["kapino"] for d in FLEET_JSON]
+        assert coord.fingerprint == coord.data.fingerprint()
+        assert coord.last_update_success is True
+
+    async def test_schedule_snapshot_rebuilds_index(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE))
+        _with_snapshot(coord, {
+            "feed_type": FEED_ROUTE_SCHEDULE, "saved": time.time() - 3600, "data": SCHEDULE_JSON,
+        })
+        assert await coord.async_restore_snapshot() is True
+        assert coord.schedule is not None and len(coord.schedule) == len(SCHEDULE_JSON)
+
+    @pytest.mark.parametrize("stored", [
+        None,
+        {"feed_type": FEED_STOP_ARRIVALS, "saved": 0, "data": ARRIVALS_JSON},
+        {"feed_type": FEED_STOP_ARRIVALS, "saved": time.time(), "data": [{"bogus": 1}]},
+        {"feed_type": FEED_ROUTE_SCHEDULE, "saved": time.time(), "data": SCHEDULE_JSON},
+    ])
+    async def test_missing_stale_or_bad_snapshot_is_ignored(
+        self, hass: MagicMock, stored: Any
+    ) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_STOP_ARRIVALS))
+        _with_snapshot(coord, stored)
+        assert await coord.async_restore_snapshot() is False
+        assert coord.data is None
+        assert coord.last_update_success is False
+
+    async def test_new_data_schedules_a_save(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE))
+        store = _with_snapshot(coord)
+        departures = [ScheduledDeparture(**d) for d in SCHEDULE_JSON]
+        mock_client = MagicMock()
+        mock_client.get_route_schedule = AsyncMock(return_value=departures)
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            await coord.async_refresh()
+            await coord.async_refresh()
+        store.async_delay_save.assert_called_once()
+        dump, delay = store.async_delay_save.call_args.args
+        assert delay == SNAPSHOT_SAVE_DELAY
+        assert dump()["data"] == SCHEDULE_JSON
+
+    async def test_frequent_changes_do_not_postpone_the_save(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE))
+        store = _with_snapshot(coord)
+        mock_client = MagicMock()
+        mock_client.get_route_schedule = AsyncMock(side_effect=[
+            [ScheduledDeparture(**{**SCHEDULE_JSON[0], "departure_time": f"06:0{i}"})]
+            for i in range(4)
+        ])
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            for _ in range(3):
+                await coord.async_refresh()
+            assert store.async_delay_save.call_count == 1
+            # Once the first save has run, the next change schedules another.
+            coord._snapshot_due -= SNAPSHOT_SAVE_DELAY  # type: ignore[reportPrivateUsage]
+            await coord.async_refresh()
+        assert store.async_delay_save.call_count == 2
+        dump, _ = store.async_delay_save.call_args.args
+        assert dump()["data"][0]["departure_time"] == "06:03"
+
+    async def test_removing_the_entry_with_a_save_pending_leaves_no_file(
+        self, hass: MagicMock
+    ) -> None:
+        disk: dict[str, Any] = {}
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE))
+        store = _FakeStore(disk, "snapshot")
+        coord._snapshot_store = store  # type: ignore[reportPrivateUsage,assignment]
+        mock_client = MagicMock()
+        mock_client.get_route_schedule = AsyncMock(
+            return_value=[ScheduledDeparture(**d) for d in SCHEDULE_JSON]
+        )
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            await coord.async_refresh()
+        assert store.pending is not None
+
+        await coord.async_shutdown()
+        assert disk["snapshot"]["data"] == SCHEDULE_JSON
+        # Removal goes through a fresh Store, which cannot cancel the old timer.
+        with (
+            patch(
+                "custom_components.iett.coordinator._snapshot_store",
+                return_value=_FakeStore(disk, "snapshot"),
+            ),
+            patch(
+                "custom_components.iett.coordinator._announcement_store",
+                return_value=_FakeStore(disk, "announcements"),
+            ),
+        ):
+            await async_remove_snapshot(hass, "entry")
+        store.fire()
+        assert disk == {}
+
+    async def test_startup_refresh_is_staggered_and_timed(self, hass: MagicMock) -> None:
+        coords = [
+            IettCoordinator(hass, _entry_data(FEED_ROUTE_SCHEDULE)),
+            IettCoordinator(hass, _entry_data(FEED_ROUTE_ANNOUNCEMENTS)),
+        ]
+        sleeps: list[float] = []
+
+        async def _sleep(delay: float) -> None:
+            sleeps.append(delay)
+
+        with patch("custom_components.iett.coordinator.asyncio.sleep", _sleep):
+            for coord in coords:
+                with patch.object(coord, "async_refresh", AsyncMock()):
+                    await coord.async_startup_refresh(time.monotonic())
+        assert len(sleeps) == 1 and 0 < sleeps[0] <= 0.25
+        assert all(c.startup_time is not None for c in coords)
+
+
+# ---------------------------------------------------------------------------
+# FEED_STOP_BOARD
+# ---------------------------------------------------------------------------
+
+def _board_entry(*specs: str) -> dict[str, Any]:
+    return _entry_data(
+        FEED_STOP_BOARD, **{CONF_STOPS: [BoardStop.parse(s).as_config() for s in specs]}
+    )
+
+
+def _arrivals(*etas: tuple[str, int]) -> list[Arrival]:
+    return [Arrival(route_code=r, destination="X", eta_raw=f"{e} dk", eta_minutes=e) for r, e in etas]
+
+
+class TestStopBoard:
+    async def test_fetches_every_stop_concurrently_and_merges(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _board_entry("A@V", "B:34", "C"))
+        in_flight = peak = 0
+        by_stop = {"A": _arrivals(("500T", 9)), "B": _arrivals(("34", 4), ("14M", 1)), "C": _arrivals(("14M", 6))}
+
+        async def get_stop_arrivals(dcode: str, via: str | None, hedge: bool) -> list[Arrival]:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return by_stop[dcode]
+
+        mock_client = MagicMock()
+        mock_client.get_stop_arrivals = AsyncMock(side_effect=get_stop_arrivals)
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            board = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        assert peak == 3
+        assert [(d.dcode, d.route_code) for d in board] == [("B", "34"), ("C", "14M"), ("A", "500T")]
+        mock_client.get_stop_arrivals.assert_any_await("A", "V", hedge=False)
+        # The soonest bus (4 min) tightens polling, as for single stops.
+        assert coord.effective_interval < timedelta(seconds=30)
+
+    async def test_failing_stop_is_left_off(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _board_entry("A", "B"))
+
+        async def get_stop_arrivals(dcode: str, via: str | None, hedge: bool) -> list[Arrival]:
+            if dcode == "B":
+                raise IettMiddleError("boom", 404)
+            return _arrivals(("500T", 5))
+
+        mock_client = MagicMock()
+        mock_client.get_stop_arrivals = AsyncMock(side_effect=get_stop_arrivals)
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            board = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+            assert [d.dcode for d in board] == ["A"]
+            assert list(coord.stop_errors) == ["B"]
+            mock_client.get_stop_arrivals.side_effect = IettMiddleError("down")
+            with pytest.raises(UpdateFailed):
+                await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+
+    async def test_snapshot_round_trips(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _board_entry("A"))
+        coord.data = [BoardDeparture("A", "500T", "X", "3 dk", 3, None)]
+        _with_snapshot(coord, coord._dump_snapshot())  # type: ignore[reportPrivateUsage]
+        restored = IettCoordinator(hass, _board_entry("A"))
+        _with_snapshot(restored, coord._dump_snapshot())  # type: ignore[reportPrivateUsage]
+        assert await restored.async_restore_snapshot()
+        assert restored.data == coord.data
+
+
+# ---------------------------------------------------------------------------
+# FEED_ROUTE_BUNDLE
+# ---------------------------------------------------------------------------
+
+def _bundle_client(**overrides: Any) -> MagicMock:
+    mock_client = MagicMock()
+    mock_client.get_fleet_delta = AsyncMock(return_value=_reset(_route_fleet()))
+    mock_client.get_route_schedule = AsyncMock(
+        return_value=[ScheduledDeparture(**d) for d in SCHEDULE_JSON]
+    )
+    mock_client.get_announcements = AsyncMock(
+        return_value=[Announcement(**d) for d in ANNOUNCEMENTS_JSON]
+    )
+    for name, mock in overrides.items():
+        setattr(mock_client, name, mock)
+    return mock_client
+
+
+class TestRouteBundle:
+    def test_created_for_bundle_entries(self, hass: MagicMock) -> None:
+        assert isinstance(
+            create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE)), IettRouteBundleCoordinator
+        )
+        assert type(create_coordinator(hass, _entry_data(FEED_ROUTE_FLEET))) is IettCoordinator
+
+    async def test_first_cycle_loads_every_part_in_one_gather(self, hass: MagicMock) -> None:
+        coord = create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE))
+        mock_client = _bundle_client()
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            bundle = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        assert isinstance(bundle, RouteBundle)
+        assert [b.kapino for b in bundle.fleet or []] == ["C-325"]
+        assert len(bundle.schedule or []) == len(SCHEDULE_JSON)
+        assert len(bundle.announcements or []) == len(ANNOUNCEMENTS_JSON)
+        assert not bundle.failed
+        assert coord.schedule is not None
+        mock_client.get_route_schedule.assert_awaited_once_with("500T")
+        mock_client.get_announcements.assert_awaited_once_with("500T")
+        # Next wake-up: the announcements, 5 min out; the fleet is pushed.
+        assert timedelta(seconds=299) < coord.update_interval <= timedelta(seconds=300)
+
+    async def test_later_cycles_fetch_only_due_parts(self, hass: MagicMock) -> None:
+        coord = create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE))
+        assert isinstance(coord, IettRouteBundleCoordinator)
+        mock_client = _bundle_client()
+        updates: list[RouteBundle] = []
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            coord.async_add_listener(lambda: updates.append(coord.data))
+            await coord.async_refresh()
+            await coord.async_refresh()  # nothing due
+            coord.cadence.done(FEED_ROUTE_ANNOUNCEMENTS, time.monotonic() - 300)
+            mock_client.get_announcements.return_value = []
+            await coord.async_refresh()
+        assert mock_client.get_fleet_delta.await_count == 1
+        assert mock_client.get_route_schedule.await_count == 1
+        assert mock_client.get_announcements.await_count == 2
+        # The hub's first push, the first cycle, then the announcements only.
+        assert len(updates) == 3
+        previous, last = updates[1:]
+        assert last.announcements == []
+        # Unchanged parts are shared, so their sensors can skip the write.
+        assert last.schedule is previous.schedule
+        assert last.fleet is previous.fleet
+
+    async def test_failed_part_keeps_its_data_and_retries_sooner(self, hass: MagicMock) -> None:
+        coord = create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE))
+        assert isinstance(coord, IettRouteBundleCoordinator)
+        mock_client = _bundle_client()
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            first = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+            coord.data = first
+            coord.cadence.done(FEED_ROUTE_ANNOUNCEMENTS, time.monotonic() - 300)
+            mock_client.get_announcements.side_effect = IettMiddleError("down", 503)
+            bundle = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        assert bundle.failed == {FEED_ROUTE_ANNOUNCEMENTS}
+        assert bundle.announcements is first.announcements
+        assert coord.update_interval <= timedelta(seconds=60)
+
+    async def test_fails_only_when_nothing_loaded(self, hass: MagicMock) -> None:
+        coord = create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE))
+        error = AsyncMock(side_effect=IettMiddleError("down"))
+        mock_client = _bundle_client(
+            get_fleet_delta=error, get_route_schedule=error, get_announcements=error
+        )
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            with pytest.raises(UpdateFailed):
+                await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+
+    async def test_fleet_failure_marks_only_the_fleet_part(self, hass: MagicMock) -> None:
+        coord = create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE))
+        mock_client = _bundle_client()
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            coord.async_add_listener(lambda: None)
+            await coord.async_refresh()
+            hub = async_get_hub(hass, IettFleetHub, "http://iett-middle.test")
+            hub.last_update_success = False
+            coord._handle_hub_update()  # type: ignore[reportPrivateUsage]
+        assert coord.last_update_success
+        assert coord.data.failed == {FEED_ROUTE_FLEET}
+        assert coord.data.fleet is not None
+
+    async def test_snapshot_round_trips(self, hass: MagicMock) -> None:
+        coord = create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE))
+        with patch(
+            "custom_components.iett.coordinator.IettMiddleClient", return_value=_bundle_client()
+        ):
+            coord.data = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        restored = create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE))
+        _with_snapshot(restored, coord._dump_snapshot())  # type: ignore[reportPrivateUsage]
+        assert await restored.async_restore_snapshot()
+        assert restored.data.as_dict() == coord.data.as_dict()
+        assert restored.fingerprint == restored.data.fingerprint()
+        assert restored.schedule is not None and len(restored.schedule) == len(SCHEDULE_JSON)
+
 
 # ---------------------------------------------------------------------------
 # FEED_ROUTE_ANNOUNCEMENTS
 # ---------------------------------------------------------------------------
 
+def _announcements(*messages: str) -> list[Announcement]:
+    base = ANNOUNCEMENTS_JSON[0]
+    return [Announcement(**{**base, "message": m}) for m in messages]
+
+
+def _fired(hass: MagicMock) -> list[tuple[str, str]]:
+    return [(c.args[0], c.args[1]["message"]) for c in hass.bus.async_fire.call_args_list]
+
+
 class TestCoordinatorAnnouncements:
     async def test_returns_announcements(self, hass: MagicMock) -> None:
         coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_ANNOUNCEMENTS))
         mock_client = MagicMock()
-        mock_client.get_announcements = AsyncMock(return_value=ANNOUNCEMENTS_JSON)
+        announcements = [Announcement(**d) for d in ANNOUNCEMENTS_JSON]
+        mock_client.get_announcements = AsyncMock(return_value=announcements)
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        assert result == announcements
+
+    async def test_fires_events_only_for_changes(self, hass: MagicMock) -> None:
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_ANNOUNCEMENTS))
+        mock_client = MagicMock()
+        mock_client.get_announcements = AsyncMock(return_value=_announcements("a"))
         with (
-            patch("custom_components.iett.coordinator.async_get_clientsession"),
             patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
         ):
-            result = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
-        assert result == ANNOUNCEMENTS_JSON
+            coord.async_add_listener(lambda: None)
+            await coord.async_refresh()
+            assert _fired(hass) == []  # the baseline
+            mock_client.get_announcements.return_value = _announcements("a")
+            await coord.async_refresh()
+            assert _fired(hass) == []
+            assert coord.skipped_writes == 1
+            mock_client.get_announcements.return_value = _announcements("a", "b")
+            await coord.async_refresh()
+            mock_client.get_announcements.return_value = [
+                replace(_announcements("b")[0], type="Sürekli")
+            ]
+            await coord.async_refresh()
+        assert _fired(hass) == [
+            (EVENT_ANNOUNCEMENT_ADDED, "b"),
+            (EVENT_ANNOUNCEMENT_ADDED, "b"),  # new type, so not an edit of "b"
+            (EVENT_ANNOUNCEMENT_REMOVED, "a"),
+            (EVENT_ANNOUNCEMENT_REMOVED, "b"),
+        ]
+        event = hass.bus.async_fire.call_args_list[0].args[1]
+        assert event["route_code"] == "500T" and len(event["key"]) == 16
+
+    async def test_seen_set_survives_a_restart(self, hass: MagicMock) -> None:
+        mock_client = MagicMock()
+        mock_client.get_announcements = AsyncMock(return_value=_announcements("a"))
+        first = IettCoordinator(hass, _entry_data(FEED_ROUTE_ANNOUNCEMENTS))
+        store = MagicMock()
+        first._announcement_store = store  # type: ignore[reportPrivateUsage]
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            first.data = await first._async_update_data()  # type: ignore[reportPrivateUsage]
+            dump = store.async_delay_save.call_args.args[0]
+
+            restarted = IettCoordinator(hass, _entry_data(FEED_ROUTE_ANNOUNCEMENTS))
+            store = MagicMock()
+            store.async_load = AsyncMock(return_value=dump())
+            restarted._announcement_store = store  # type: ignore[reportPrivateUsage]
+            mock_client.get_announcements.return_value = [
+                replace(_announcements("a")[0], updated_at="Kayit Saati: 10:00", message="a2")
+            ]
+            await restarted._async_update_data()  # type: ignore[reportPrivateUsage]
+        (call,) = hass.bus.async_fire.call_args_list
+        kind, data = call.args
+        assert (kind, data["message"]) == (EVENT_ANNOUNCEMENT_UPDATED, "a2")
+        assert data["previous"]["message"] == "a"
+        store.async_load.assert_awaited_once()
+
+    async def test_removing_the_entry_with_a_save_pending_leaves_no_file(
+        self, hass: MagicMock
+    ) -> None:
+        disk: dict[str, Any] = {}
+        coord = IettCoordinator(hass, _entry_data(FEED_ROUTE_ANNOUNCEMENTS))
+        store = _FakeStore(disk, "announcements")
+        coord._announcement_store = store  # type: ignore[reportPrivateUsage,assignment]
+        mock_client = MagicMock()
+        mock_client.get_announcements = AsyncMock(return_value=_announcements("a"))
+        with patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client):
+            coord.data = await coord._async_update_data()  # type: ignore[reportPrivateUsage]
+        assert store.pending is not None
+
+        await coord.async_shutdown()
+        assert len(disk["announcements"]["seen"]) == 1
+        with (
+            patch(
+                "custom_components.iett.coordinator._snapshot_store",
+                return_value=_FakeStore(disk, "snapshot"),
+            ),
+            patch(
+                "custom_components.iett.coordinator._announcement_store",
+                return_value=_FakeStore(disk, "announcements"),
+            ),
+        ):
+            await async_remove_snapshot(hass, "entry")
+        store.fire()
+        assert disk == {}
+
+    async def test_bundle_tracks_its_announcements_part(self, hass: MagicMock) -> None:
+        coord = create_coordinator(hass, _entry_data(FEED_ROUTE_BUNDLE))
+        assert isinstance(coord, IettRouteBundleCoordinator)
+        mock_client = _bundle_client()
+        with (
+            patch("custom_components.iett.coordinator.IettMiddleClient", return_value=mock_client),
+            patch.object(coord, "_schedule_refresh"),
+        ):
+            coord.async_add_listener(lambda: None)
+            await coord.async_refresh()
+            coord.cadence.done(FEED_ROUTE_ANNOUNCEMENTS, time.monotonic() - 300)
+            mock_client.get_announcements.return_value = []
+            await coord.async_refresh()
+        assert [c.args[0] for c in hass.bus.async_fire.call_args_list] == [
+            EVENT_ANNOUNCEMENT_REMOVED
+        ]
 
     async def test_raises_on_unknown_feed(self, hass: MagicMock) -> None:
         with pytest.raises(ValueError, match="Unknown feed type"):
@@ -0,0 +1,81 @@
+"""Tests for decode.py — tolerant, coercing model construction."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pytest
+
+from custom_components.iett.decode import ModelDecoder, decode_stats, decoder, json_loads
+from custom_components.iett.models import Arrival, BusPosition
+from tests.conftest import ARRIVALS_JSON, FLEET_JSON
+
+
+class TestModelDecoder:
+    def test_matches_plain_construction(self) -> None:
+        rows = json_loads(b'[{"route_code": "500T", "destination": "X", "eta_raw": "3 dk"}]')
+        assert ModelDecoder(Arrival).many(rows) == [Arrival("500T", "X", "3 dk")]
+        assert ModelDecoder(BusPosition).many(FLEET_JSON) == [BusPosition(**r) for r in FLEET_JSON]
+
+    def test_coerces_known_fields(self) -> None:
+        row = {**FLEET_JSON[0], "kapino": 1234, "latitude": "41.05", "speed": 12.0}
+        bus = ModelDecoder(BusPosition).one(row)
+        assert bus is not None
+        assert (bus.kapino, bus.latitude, bus.speed) == ("1234", 41.05, 12)
+        assert type(bus.speed) is int
+
+    @pytest.mark.parametrize(("speed", "expected"), [
+        (12.5, 12), (12.7, 13), ("12.7", 13), (" 8 ", 8), ("-0.2", 0),
+    ])
+    def test_fractional_ints_are_rounded(self, speed: object, expected: int) -> None:
+        bus = ModelDecoder(BusPosition).one({**FLEET_JSON[0], "speed": speed})
+        assert bus is not None
+        assert bus.speed == expected
+        assert type(bus.speed) is int
+
+    @pytest.mark.parametrize("speed", ["fast", "", True, None, [12], float("nan"), "inf"])
+    def test_non_numeric_ints_are_refused(self, speed: object) -> None:
+        assert ModelDecoder(BusPosition).one({**FLEET_JSON[0], "speed": speed}) is None
+
+    def test_bad_optional_field_becomes_none(self) -> None:
+        arrival = ModelDecoder(Arrival).one({**ARRIVALS_JSON[0], "eta_minutes": "soon"})
+        assert arrival is not None
+        assert arrival.eta_minutes is None
+
+    def test_unknown_fields_are_dropped_and_counted(self) -> None:
+        decoder_ = ModelDecoder(Arrival)
+        rows = [{**row, "platform": "B"} for row in ARRIVALS_JSON]
+        assert decoder_.many(rows) == [Arrival(**row) for row in ARRIVALS_JSON]
+        assert decoder_.stats.unknown_fields == {"platform": len(rows)}
+
+    @pytest.mark.parametrize("bad", [
+        {"destination": "X", "eta_raw": "3 dk"},  # missing required field
+        {"route_code": None, "destination": "X", "eta_raw": "3 dk"},
+        {"route_code": "500T", "destination": ["X"], "eta_raw": "3 dk"},
+        {"route_code": "500T", "destination": "X", "eta_raw": True},
+        "not an object",
+    ])
+    def test_bad_rows_are_skipped_and_counted(self, bad: object) -> None:
+        decoder_ = ModelDecoder(Arrival)
+        assert decoder_.many([ARRIVALS_JSON[0], bad, ARRIVALS_JSON[1]]) == [
+            Arrival(**ARRIVALS_JSON[0]), Arrival(**ARRIVALS_JSON[1])
+        ]
+        assert (decoder_.stats.rows, decoder_.stats.skipped) == (3, 1)
+        assert decoder_.stats.last_error is not None
+        assert decoder_.one(bad) is None
+
+    def test_non_list_body_fails_the_batch(self) -> None:
+        with pytest.raises(TypeError):
+            ModelDecoder(Arrival).many({"error": "upstream down"})
+
+    def test_unsupported_annotation_is_refused(self) -> None:
+        @dataclass
+        class Nested:
+            items: list[str]
+
+        with pytest.raises(TypeError, match="cannot decode"):
+            ModelDecoder(Nested)
+
+    def test_decoders_are_shared_per_model(self) -> None:
+        assert decoder(Arrival) is decoder(Arrival)
+        decoder(Arrival).many(ARRIVALS_JSON)
+        assert decode_stats()["Arrival"]["rows"] >= len(ARRIVALS_JSON)
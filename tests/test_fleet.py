@@ -0,0 +1,197 @@
+"""Tests for FleetSnapshot and FleetStore — columnar fleet and delta sync."""
+from __future__ import annotations
+
+import zlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.iett.client import IettMiddleError
+from custom_components.iett.fleet import FleetSnapshot, FleetStore
+from custom_components.iett.models import BusPosition, FleetDelta
+from tests.conftest import FLEET_JSON, ROUTE_FLEET_JSON
+
+
+def _bus(kapino: str, route: str | None = "500T", speed: int = 0) -> BusPosition:
+    return BusPosition(
+        kapino=kapino,
+        latitude=41.0,
+        longitude=29.0,
+        speed=speed,
+        last_seen="00:00:00",
+        route_code=route,
+    )
+
+
+def _checksum(*kapinos: str) -> str:
+    x = 0
+    for k in kapinos:
+        x ^= zlib.crc32(k.encode())
+    return f"{len(kapinos)}-{x:08x}"
+
+
+def _client(*deltas: FleetDelta | Exception) -> MagicMock:
+    client = MagicMock()
+    client.get_fleet_delta = AsyncMock(side_effect=list(deltas))
+    return client
+
+
+def _kapinos(store: FleetStore) -> list[str]:
+    return sorted(store.snapshot.kapino)
+
+
+class TestSnapshot:
+    def test_rows_round_trip_to_positions(self) -> None:
+        buses = [BusPosition(**item) for item in FLEET_JSON + ROUTE_FLEET_JSON]
+        snap = FleetSnapshot.from_positions(buses)
+        assert len(snap) == 2
+        assert snap.to_positions() == buses
+        assert [row.as_dict() for row in snap] == FLEET_JSON + ROUTE_FLEET_JSON
+
+    def test_row_view_matches_bus_attributes(self) -> None:
+        snap = FleetSnapshot.from_positions([BusPosition(**ROUTE_FLEET_JSON[0])])
+        row = snap[0]
+        assert row.kapino == "C-325"
+        assert row.speed == 42
+        assert row.route_code == "500T"
+        assert row.operator is None
+        assert snap.get("C-325") is not None
+        assert snap.get("nope") is None
+        with pytest.raises(IndexError):
+            snap[1]  # pylint: disable=pointless-statement
+
+    def test_repeated_strings_are_stored_once(self) -> None:
+        snap = FleetSnapshot.from_positions([_bus(f"K{i}") for i in range(100)])
+        # None + "500T"
+        assert len(snap.strings) == 2
+        assert set(snap.route_code) == {1}
+
+    def test_speed_is_clamped_to_column_range(self) -> None:
+        snap = FleetSnapshot.from_positions([_bus("A", speed=-3), _bus("B", speed=70000)])
+        assert list(snap.speed) == [0, 0xFFFF]
+
+    def test_route_slice_is_case_insensitive(self) -> None:
+        snap = FleetSnapshot.from_positions(
+            [_bus("A", "500T"), _bus("B", "14M"), _bus("C", "500t"), _bus("D", None)]
+        )
+        assert [row.kapino for row in snap.route(" 500T")] == ["A", "C"]
+        assert len(snap.route("unknown")) == 0
+
+    def test_updated_leaves_original_untouched(self) -> None:
+        snap = FleetSnapshot.from_positions([_bus("A"), _bus("B"), _bus("C")])
+        new = snap.updated([_bus("B", speed=9), _bus("D")], ["A"])
+        assert sorted(new.kapino) == ["B", "C", "D"]
+        assert new.get("B").speed == 9  # type: ignore[union-attr]
+        assert snap.kapino == ["A", "B", "C"]
+        assert snap.get("B").speed == 0  # type: ignore[union-attr]
+        for kapino in new.kapino:
+            assert new.get(kapino).kapino == kapino  # type: ignore[union-attr]
+
+    def test_fingerprint_tracks_content(self) -> None:
+        snap = FleetSnapshot.from_positions([_bus("A"), _bus("B", "14M")])
+        same = snap.updated([_bus("A")], [])
+        moved = snap.updated([_bus("A", speed=5)], [])
+        assert same is not snap
+        assert same.fingerprint() == snap.fingerprint()
+        assert moved.fingerprint() != snap.fingerprint()
+        assert snap.route("500T").fingerprint() == same.route("500T").fingerprint()
+
+
+class TestApply:
+    def test_reset_replaces_everything(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A"), _bus("B")], []))
+        store.apply(FleetDelta("2", True, [_bus("C")], []))
+        assert _kapinos(store) == ["C"]
+        assert store.cursor == "2"
+
+    def test_delta_updates_only_named_buses(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A", speed=5), _bus("B")], []))
+        assert store.apply(FleetDelta("2", False, [_bus("B", speed=30)], []))
+        assert store.snapshot.get("A").speed == 5  # type: ignore[union-attr]
+        assert store.snapshot.get("B").speed == 30  # type: ignore[union-attr]
+
+    def test_removed_buses_leave_route_slices(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A"), _bus("B", "14M")], []))
+        store.apply(FleetDelta("2", False, [], ["A"]))
+        assert len(store.route_buses("500T")) == 0
+        assert [b.kapino for b in store.route_buses("14m")] == ["B"]
+
+    def test_route_change_moves_bus_between_slices(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A", "500T")], []))
+        store.apply(FleetDelta("2", False, [_bus("A", "14M")], []))
+        assert len(store.route_buses("500T")) == 0
+        assert [b.kapino for b in store.route_buses("14M")] == ["A"]
+
+    def test_empty_delta_is_unchanged_and_keeps_snapshot(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A")], []))
+        snap = store.snapshot
+        assert not store.apply(FleetDelta("2", False, [], []))
+        assert store.snapshot is snap
+
+    def test_checksum_is_maintained_incrementally(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A"), _bus("B"), _bus("C")], []))
+        store.apply(FleetDelta("2", False, [_bus("D"), _bus("A", speed=5)], ["B"]))
+        assert store.checksum() == _checksum("A", "C", "D")
+        store.apply(FleetDelta("3", False, [_bus("A"), _bus("E"), _bus("E")], ["A", "X"]))
+        assert store.checksum() == _checksum("A", "C", "D", "E")
+
+
+class TestSync:
+    async def test_follows_cursor(self) -> None:
+        store = FleetStore()
+        client = _client(
+            FleetDelta("1", True, [_bus("A")], [], _checksum("A")),
+            FleetDelta("2", False, [_bus("B")], [], _checksum("A", "B")),
+        )
+        assert await store.async_sync(client)
+        assert await store.async_sync(client)
+        assert [c.args[0] for c in client.get_fleet_delta.await_args_list] == [None, "1"]
+        assert _kapinos(store) == ["A", "B"]
+
+    async def test_expired_cursor_triggers_full_resync(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A")], []))
+        client = _client(
+            IettMiddleError("gone", 410),
+            FleetDelta("9", True, [_bus("Z")], []),
+        )
+        assert await store.async_sync(client)
+        assert _kapinos(store) == ["Z"]
+        assert store.cursor == "9"
+
+    async def test_other_errors_propagate(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A")], []))
+        with pytest.raises(IettMiddleError):
+            await store.async_sync(_client(IettMiddleError("boom", 502)))
+
+    async def test_checksum_mismatch_triggers_full_resync(self) -> None:
+        store = FleetStore()
+        store.apply(FleetDelta("1", True, [_bus("A"), _bus("B")], []))
+        client = _client(
+            # Server thinks B is gone but never told us.
+            FleetDelta("2", False, [], [], _checksum("A")),
+            FleetDelta("3", True, [_bus("A")], [], _checksum("A")),
+        )
+        assert await store.async_sync(client)
+        assert _kapinos(store) == ["A"]
+        assert [c.args[0] for c in client.get_fleet_delta.await_args_list] == ["1", None]
+
+    async def test_falls_back_to_full_fetch_without_delta_support(self) -> None:
+        store = FleetStore()
+        buses = [_bus("A")]
+        client = _client(FleetDelta(None, True, buses, []))
+        client.get_all_buses = AsyncMock(return_value=buses)
+        assert await store.async_sync(client)
+        assert store.delta_supported is False
+        assert await store.async_sync(client)
+        # Same object again = 304 from the conditional GET.
+        assert not await store.async_sync(client)
+        assert client.get_fleet_delta.await_count == 1
+        assert client.get_all_buses.await_count == 2
@@ -0,0 +1,62 @@
+"""Tests for metrics.py — rolling percentiles and the opt-in registry."""
+from __future__ import annotations
+
+from custom_components.iett.metrics import LATENCY, REFRESH, Rolling, Timings
+
+
+class TestRolling:
+    def test_percentiles_over_window(self) -> None:
+        series = Rolling(window=100)
+        for v in range(1, 101):
+            series.add(float(v))
+        assert series.percentile(50) == 50.0
+        assert series.percentile(90) == 90.0
+        assert series.percentile(100) == 100.0
+        assert series.summary() == {
+            "count": 100, "last": 100.0, "p50": 50.0, "p90": 90.0, "p99": 99.0, "max": 100.0,
+        }
+
+    def test_window_drops_oldest_but_counts_all(self) -> None:
+        series = Rolling(window=3)
+        for v in (100.0, 1.0, 2.0, 3.0):
+            series.add(v)
+        assert series.count == 4
+        assert series.summary()["max"] == 3.0
+        assert series.last == 3.0
+
+    def test_empty(self) -> None:
+        series = Rolling()
+        assert series.percentile(90) is None
+        assert series.last is None
+        assert series.summary() == {"count": 0}
+
+
+class TestTimings:
+    def test_disabled_records_nothing(self) -> None:
+        timings = Timings()
+        timings.record("/v1/fleet", LATENCY, 12.0)
+        assert not timings.enabled
+        assert timings.get("/v1/fleet", LATENCY) is None
+
+    def test_enabled_while_any_owner_holds_it(self) -> None:
+        timings = Timings()
+        a, b = object(), object()
+        timings.enable(a)
+        timings.enable(b)
+        timings.disable(a)
+        assert timings.enabled
+        timings.record("entry", REFRESH, 3.0)
+        timings.disable(b)
+        timings.record("entry", REFRESH, 4.0)
+        assert not timings.enabled
+        assert timings.get("entry", REFRESH).count == 1  # type: ignore[union-attr]
+
+    def test_as_dict_filters_scopes(self) -> None:
+        timings = Timings()
+        timings.enable(self)
+        timings.record("/v1/fleet", LATENCY, 5.0)
+        timings.record("entry", REFRESH, 1.0)
+        assert timings.as_dict({"entry"}) == {
+            "entry": {REFRESH: {"count": 1, "last": 1.0, "p50": 1.0, "p90": 1.0, "p99": 1.0, "max": 1.0}}
+        }
+        assert set(timings.as_dict()) == {"/v1/fleet", "entry"}
@@ -0,0 +1,86 @@
+"""Tests for motion.py — per-bus ring buffers and derived motion."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.iett.fleet import FleetSnapshot
+from custom_components.iett.models import BusPosition
+from custom_components.iett.motion import (
+    STOPPED_AFTER,
+    MotionTracker,
+)
+
+_M = 1 / 111_195  # degrees of latitude per metre
+
+
+def _snap(*buses: tuple[str, float, float, str]) -> FleetSnapshot:
+    return FleetSnapshot.from_positions(
+        BusPosition(kapino=k, latitude=lat, longitude=lon, speed=0, last_seen=seen)
+        for k, lat, lon, seen in buses
+    )
+
+
+class TestMotionTracker:
+    def test_heading_and_smoothed_speed(self) -> None:
+        tracker = MotionTracker()
+        # North at 10 m/s (36 km/h), then 20 m/s (72 km/h), one fix every 10 s.
+        for t, metres in ((0, 0), (10, 100), (20, 300)):
+            tracker.update(_snap(("A", 41.0 + metres * _M, 29.0, str(t))), float(t))
+        motion = tracker.get("A")
+        assert motion is not None
+        assert motion.heading == pytest.approx(0, abs=0.5)
+        assert motion.speed == pytest.approx(54, rel=0.01)
+        assert motion.samples == 3
+        assert not motion.stopped
+
+    @pytest.mark.parametrize(("dlat", "dlon", "expected"), [
+        (1, 0, 0), (0, 1, 90), (-1, 0, 180), (0, -1, 270), (1, 1.32, 45),
+    ])
+    def test_heading(self, dlat: float, dlon: float, expected: float) -> None:
+        tracker = MotionTracker()
+        tracker.update(_snap(("A", 41.0, 29.0, "1")), 0.0)
+        tracker.update(_snap(("A", 41.0 + dlat * 0.001, 29.0 + dlon * 0.001, "2")), 15.0)
+        assert tracker.get("A").heading == pytest.approx(expected, abs=1)  # type: ignore[union-attr]
+
+    def test_repeated_fix_is_not_a_new_sample(self) -> None:
+        tracker = MotionTracker()
+        assert tracker.update(_snap(("A", 41.0, 29.0, "12:00:00")), 0.0) == 1
+        assert tracker.update(_snap(("A", 41.0, 29.0, "12:00:00")), 15.0) == 0
+        assert tracker.get("A").samples == 1  # type: ignore[union-attr]
+
+    def test_jitter_counts_as_dwell(self) -> None:
+        tracker = MotionTracker()
+        tracker.update(_snap(("A", 41.0 - 200 * _M, 29.0, "a")), 0.0)
+        for t in range(1, 7):
+            jitter = 5 * _M * (t % 2)
+            tracker.update(_snap(("A", 41.0 + jitter, 29.0, str(t))), 15.0 * t)
+        motion = tracker.get("A")
+        assert motion is not None
+        assert motion.dwell == 75.0
+        assert motion.stopped and motion.dwell >= STOPPED_AFTER
+        # Heading is kept from the last real move, not the jitter.
+        assert motion.heading == pytest.approx(0, abs=0.5)
+
+    def test_ring_buffer_keeps_last_fixes_in_order(self) -> None:
+        tracker = MotionTracker(capacity=3)
+        for t in range(5):
+            tracker.update(_snap(("A", 41.0 + t * 100 * _M, 29.0, str(t))), float(t))
+        history = tracker.history("A")
+        assert [fix[2] for fix in history] == [2.0, 3.0, 4.0]
+        assert tracker.history("missing") == []
+
+    def test_idle_buses_are_evicted(self) -> None:
+        tracker = MotionTracker(max_idle=60)
+        tracker.update(_snap(("A", 41.0, 29.0, "1"), ("B", 41.0, 29.0, "1")), 0.0)
+        tracker.update(_snap(("A", 41.0, 29.0, "2")), 30.0)
+        tracker.update(_snap(("A", 41.0, 29.0, "3")), 70.0)
+        assert len(tracker) == 1
+        assert tracker.get("B") is None
+
+    def test_as_dict(self) -> None:
+        tracker = MotionTracker()
+        tracker.update(_snap(("A", 41.0, 29.0, "1")), 0.0)
+        tracker.update(_snap(("A", 41.0, 29.0 + 0.001, "2")), 10.0)
+        assert tracker.get("A").as_dict() == {  # type: ignore[union-attr]
+            "heading": 90, "speed_avg": 30.2, "dwell": 0, "stopped": False,
+        }
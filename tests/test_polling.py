@@ -0,0 +1,202 @@
+"""Tests for polling.py — adaptive intervals, the service calendar, poll
+phases and cadences."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.iett.models import ScheduledDeparture
+from custom_components.iett.polling import (
+    UNCHANGED_GRACE,
+    AdaptiveInterval,
+    Cadence,
+    PollPhases,
+    ServiceCalendar,
+    StartupStagger,
+)
+from custom_components.iett.schedule import ScheduleIndex
+
+
+def _dep(time: str, day_type: str = "I") -> ScheduledDeparture:
+    return ScheduledDeparture(
+        route_code="500T", route_name="X", route_variant="500T_G_D0",
+        direction="G", day_type=day_type, service_type="ÖHO", departure_time=time,
+    )
+
+
+FRIDAY = datetime(2024, 1, 5)
+
+
+def _poller(base: int = 30, floor: int = 10, ceiling: int = 300) -> AdaptiveInterval:
+    return AdaptiveInterval(
+        timedelta(seconds=base), timedelta(seconds=floor), timedelta(seconds=ceiling)
+    )
+
+
+class TestAdaptiveInterval:
+    def test_changing_feed_stays_at_base(self) -> None:
+        poller = _poller()
+        for _ in range(10):
+            assert poller.update(True) == timedelta(seconds=30)
+
+    def test_backs_off_after_grace_and_caps_at_ceiling(self) -> None:
+        poller = _poller()
+        seen = [poller.update(False).total_seconds() for _ in range(UNCHANGED_GRACE + 5)]
+        assert seen[:UNCHANGED_GRACE] == [30] * UNCHANGED_GRACE
+        assert seen[UNCHANGED_GRACE:UNCHANGED_GRACE + 3] == [60, 120, 240]
+        assert seen[-1] == 300
+        assert poller.update(True) == timedelta(seconds=30)
+
+    def test_near_eta_polls_at_floor_even_when_unchanged(self) -> None:
+        poller = _poller()
+        for _ in range(UNCHANGED_GRACE + 3):
+            poller.update(False)
+        assert poller.update(False, min_eta=2) == timedelta(seconds=10)
+
+    def test_soon_eta_scales_down(self) -> None:
+        assert _poller().update(True, min_eta=5) == timedelta(seconds=15)
+        assert _poller().update(True, min_eta=30) == timedelta(seconds=30)
+
+    def test_outside_service_hours_uses_ceiling(self) -> None:
+        assert _poller().update(False, minutes_to_service=240) == timedelta(seconds=300)
+        assert _poller().update(False, minutes_to_service=20) == timedelta(seconds=30)
+
+    def test_near_eta_or_change_outranks_service_hours(self) -> None:
+        assert _poller().update(True, min_eta=2, minutes_to_service=90) == timedelta(seconds=10)
+        assert _poller().update(False, min_eta=2, minutes_to_service=90) == timedelta(seconds=10)
+        assert _poller().update(True, minutes_to_service=240) == timedelta(seconds=30)
+
+    def test_base_is_clamped_to_bounds(self) -> None:
+        assert _poller(base=3600, ceiling=600).interval == timedelta(seconds=600)
+        poller = _poller()
+        poller.set_bounds(timedelta(seconds=60), timedelta(seconds=40))
+        assert poller.interval == timedelta(seconds=40)
+
+
+class TestServiceCalendar:
+    def test_minutes_to_service_wraps_midnight(self) -> None:
+        calendar = ServiceCalendar()
+        assert calendar.minutes_to_service(["500T"], FRIDAY) is None
+        calendar.set("a", "500T", ScheduleIndex([_dep("06:00"), _dep("23:30")]))
+        calendar.set("b", "34", ScheduleIndex([_dep("05:45")]))
+        # Thursday night: Friday's first departure on either route.
+        thursday = FRIDAY.replace(day=4)
+        late = thursday.replace(hour=23, minute=40)
+        assert calendar.minutes_to_service(["500T", "34"], late) == 6 * 60 + 5
+        assert calendar.minutes_to_service(["500T", "34"], FRIDAY.replace(hour=6)) == 0
+        calendar.remove("b")
+        assert calendar.minutes_to_service(["500T"], FRIDAY.replace(hour=5)) == 60
+        assert len(calendar) == 1
+
+    def test_only_the_asked_routes_count(self) -> None:
+        calendar = ServiceCalendar()
+        calendar.set("night", "N1", ScheduleIndex([_dep("02:00")]))
+        calendar.set("day", "500T", ScheduleIndex([_dep("06:00")]))
+        assert calendar.minutes_to_service(["500T"], FRIDAY.replace(hour=1)) == 5 * 60
+        # A route without a loaded schedule could be running: nothing is known.
+        assert calendar.minutes_to_service(["500T", "34"], FRIDAY.replace(hour=1)) is None
+        assert calendar.minutes_to_service([], FRIDAY) is None
+
+    def test_respects_day_type(self) -> None:
+        calendar = ServiceCalendar()
+        calendar.set("a", "500T", ScheduleIndex([_dep("07:00"), _dep("10:00", "P")]))
+        saturday = FRIDAY.replace(day=6, hour=9)
+        # No Saturday service: the next bus is Sunday's 10:00.
+        assert calendar.minutes_to_service(["500T"], saturday) == 25 * 60
+        assert calendar.minutes_to_service(["500T"], FRIDAY.replace(hour=6)) == 60
+
+
+class TestStartupStagger:
+    def test_keys_get_successive_slots(self) -> None:
+        stagger = StartupStagger(0.25)
+        assert [stagger.delay(k, 100.0) for k in ("a", "b", "c")] == [0.0, 0.25, 0.5]
+
+    def test_shared_key_shares_a_slot(self) -> None:
+        stagger = StartupStagger(0.25)
+        stagger.delay("a", 100.0)
+        assert stagger.delay("hub", 100.0) == 0.25
+        assert stagger.delay("hub", 100.1) == pytest.approx(0.15)
+        assert stagger.delay("b", 100.1) == pytest.approx(0.4)
+
+    def test_late_entries_start_immediately(self) -> None:
+        stagger = StartupStagger(0.25)
+        stagger.delay("a", 100.0)
+        stagger.delay("b", 100.0)
+        assert stagger.delay("c", 500.0) == 0.0
+
+
+class TestPollPhases:
+    def test_pollers_on_one_interval_are_evenly_spaced(self) -> None:
+        phases = PollPhases(4)
+        for key in "abcd":
+            phases.add(key)
+        times = [phases.next_at(key, 30.0, 1000.0) for key in "abcd"]
+        assert times == [1020.0, 1027.5, 1035.0, 1042.5]
+        # In steady state each poller keeps exactly one interval between refreshes.
+        assert phases.next_at("b", 30.0, 1027.5) == 1057.5
+
+    def test_removal_respreads_the_rest(self) -> None:
+        phases = PollPhases(4)
+        for key in "abc":
+            phases.add(key)
+        phases.remove("a")
+        assert (phases.phase("b"), phases.phase("c"), phases.phase("a")) == (0.0, 0.5, None)
+        assert phases.as_dict()["phases"] == {"b": 0.0, "c": 0.5}
+
+    def test_moving_phase_never_polls_within_half_an_interval(self) -> None:
+        phases = PollPhases(4)
+        phases.add("a")
+        # "b" joins at phase 0.5 right before its slot would come round.
+        assert phases.next_at("b", 30.0, 14.0) == 45.0
+
+    async def test_slots_cap_concurrent_refreshes(self) -> None:
+        phases = PollPhases(2)
+        peak = 0
+
+        async def refresh() -> None:
+            nonlocal peak
+            async with phases.slot():
+                peak = max(peak, phases.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(refresh() for _ in range(5)))
+        assert peak == 2
+        assert phases.waits == 3
+        assert phases.in_flight == 0
+
+
+class TestCadence:
+    def _cadence(self) -> Cadence:
+        return Cadence({"fast": timedelta(seconds=300), "slow": timedelta(seconds=3600)})
+
+    def test_everything_is_due_at_first(self) -> None:
+        cadence = self._cadence()
+        assert cadence.due(0.0) == ["fast", "slow"]
+        assert cadence.until_next(0.0) == timedelta(0)
+
+    def test_each_part_keeps_its_own_interval(self) -> None:
+        cadence = self._cadence()
+        for part in cadence.due(0.0):
+            cadence.done(part, 0.0)
+        assert cadence.until_next(0.0) == timedelta(seconds=300)
+        assert cadence.due(269.0) == []
+        assert cadence.due(270.0) == ["fast"]  # within 10 % of its interval
+        cadence.done("fast", 300.0)
+        assert cadence.until_next(300.0) == timedelta(seconds=300)
+
+    def test_nearly_due_parts_join_the_cycle(self) -> None:
+        cadence = self._cadence()
+        cadence.done("fast", 0.0)
+        cadence.done("slow", -3300.0)  # due at 300, like "fast"
+        assert cadence.due(300.0) == ["fast", "slow"]
+        cadence.done("slow", -2800.0)  # due at 800: more than 10 % early
+        assert cadence.due(300.0) == ["fast"]
+
+    def test_failed_part_is_retried_sooner(self) -> None:
+        cadence = self._cadence()
+        cadence.done("fast", 0.0)
+        cadence.done("slow", 0.0, ok=False)
+        assert cadence.until_next(0.0) == timedelta(seconds=60)
+        assert cadence.due(60.0) == ["slow"]
@@ -0,0 +1,126 @@
+"""Tests for push.py — event stream parsing and the reconnecting link."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from custom_components.iett import push
+from custom_components.iett.client import IettMiddleError
+from custom_components.iett.push import (
+    FLEET_CHANNEL,
+    READY,
+    PushEvent,
+    PushLink,
+    SseParser,
+    stop_channel,
+)
+from custom_components.iett.resilience import RetryPolicy
+
+
+class TestSseParser:
+    def test_events_complete_at_blank_line_across_chunks(self) -> None:
+        parser = SseParser()
+        assert parser.feed(": heartbeat\n\nevent: fleet\nda") == []
+        assert parser.feed('ta: {"a": 1}\nid: 7\n\n') == [("fleet", '{"a": 1}', "7")]
+
+    def test_multiline_data_and_default_name(self) -> None:
+        events = SseParser().feed("data: one\r\ndata: two\r\n\r\n")
+        assert events == [("message", "one\ntwo", None)]
+
+    def test_event_without_data_is_dropped(self) -> None:
+        assert SseParser().feed("event: fleet\n\n") == []
+
+
+class _Server:
+    """Stream source the test feeds and ends; records what the link passes on."""
+
+    def __init__(self) -> None:
+        self.opened: list[frozenset[str]] = []
+        self.queue: asyncio.Queue[PushEvent | Exception | None] = asyncio.Queue()
+        self.error: Exception | None = None
+        self.events: list[PushEvent] = []
+        self.states: list[bool] = []
+
+    async def connect(self, channels: frozenset[str]) -> AsyncIterator[PushEvent]:
+        self.opened.append(channels)
+        if self.error is not None:
+            raise self.error
+        yield PushEvent(READY, None)
+        while (item := await self.queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(push._SETTLE)  # type: ignore[reportPrivateUsage]
+
+
+@pytest.fixture()
+def server() -> _Server:
+    return _Server()
+
+
+@pytest.fixture()
+def link(server: _Server) -> PushLink:
+    return PushLink(
+        server.connect, server.events.append, server.states.append, RetryPolicy(base=0.0)
+    )
+
+
+class TestPushLink:
+    async def test_delivers_events_and_reconnects_after_drop(
+        self, server: _Server, link: PushLink
+    ) -> None:
+        link.set_channels([FLEET_CHANNEL])
+        await _settle()
+        assert link.connected
+        server.queue.put_nowait(PushEvent(FLEET_CHANNEL, {"n": 1}))
+        server.queue.put_nowait(IettMiddleError("reset by peer", retryable=True))
+        await _settle()
+        assert [e.data for e in server.events] == [{"n": 1}]
+        assert server.states == [True, False, True]
+        assert (link.connects, link.drops) == (2, 1)
+        await link.stop()
+        assert server.states[-1] is False
+        assert link.as_dict()["channels"] == []
+
+    async def test_channel_changes_reopen_once_with_the_new_set(
+        self, server: _Server, link: PushLink
+    ) -> None:
+        link.set_channels([FLEET_CHANNEL])
+        link.set_channels([FLEET_CHANNEL, stop_channel("1")])
+        await _settle()
+        assert server.opened == [frozenset({FLEET_CHANNEL, stop_channel("1")})]
+        link.set_channels([FLEET_CHANNEL, stop_channel("1")])
+        await _settle()
+        assert len(server.opened) == 1
+        link.set_channels([])
+        await _settle()
+        assert not link.connected
+        await link.stop()
+
+    async def test_missing_endpoint_backs_off_for_long(
+        self, server: _Server, link: PushLink
+    ) -> None:
+        server.error = IettMiddleError("not found", 404)
+        link.set_channels([FLEET_CHANNEL])
+        await _settle()
+        assert link.supported is False
+        # Sleeping out UNSUPPORTED_RETRY, not hammering the server.
+        assert len(server.opened) == 1
+        assert server.states == []
+        await link.stop()
+
+    async def test_other_failures_retry_with_backoff(
+        self, server: _Server, link: PushLink
+    ) -> None:
+        server.error = IettMiddleError("bad gateway", 502, retryable=True)
+        link.set_channels([FLEET_CHANNEL])
+        await _settle()
+        assert len(server.opened) > 1
+        assert link.supported is None
+        await link.stop()
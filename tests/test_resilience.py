@@ -0,0 +1,150 @@
+"""Tests for resilience.py — backoff, circuit breaker and hedging."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.iett.metrics import Rolling
+from custom_components.iett.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    OPEN,
+    CircuitBreaker,
+    RetryPolicy,
+    hedge_delay,
+    hedged,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRetryPolicy:
+    def test_full_jitter_bounds_double_up_to_cap(self) -> None:
+        policy = RetryPolicy(base=0.5, cap=3.0)
+        assert [policy.delay(n, rng=lambda: 1.0) for n in range(4)] == [0.5, 1.0, 2.0, 3.0]
+        assert policy.delay(2, rng=lambda: 0.0) == 0.0
+
+    def test_retry_after_is_a_capped_floor(self) -> None:
+        policy = RetryPolicy()
+        assert policy.delay(0, retry_after=5.0, rng=lambda: 0.5) == 5.0
+        assert policy.delay(0, retry_after=3600.0, rng=lambda: 0.5) == 30.0
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self) -> None:
+        breaker = CircuitBreaker(threshold=3, open_for=10, clock=_Clock())
+        for _ in range(2):
+            breaker.failure()
+        breaker.success()
+        for _ in range(2):
+            breaker.failure()
+        assert breaker.state == CLOSED
+        breaker.failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.trips == 1
+
+    def test_half_open_lets_one_probe_through(self) -> None:
+        clock = _Clock()
+        breaker = CircuitBreaker(threshold=1, open_for=10, clock=clock)
+        breaker.failure()
+        clock.now = 10.0
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.success()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_doubles_the_pause(self) -> None:
+        clock = _Clock()
+        breaker = CircuitBreaker(threshold=1, open_for=10, open_cap=15, clock=clock)
+        breaker.failure()
+        clock.now = 10.0
+        assert breaker.allow()
+        breaker.failure()
+        assert breaker.retry_after() == 15.0  # doubled, capped
+        clock.now = 25.0
+        assert breaker.allow()
+        breaker.release()  # cancelled probe: the next caller may probe
+        assert breaker.allow()
+
+    def test_late_failures_while_open_are_ignored(self) -> None:
+        clock = _Clock()
+        breaker = CircuitBreaker(threshold=1, open_for=10, clock=clock)
+        breaker.failure()
+        breaker.failure()
+        assert breaker.retry_after() == 10.0
+        assert breaker.as_dict() == {"state": OPEN, "trips": 1, "retry_after": 10.0}
+
+
+class TestHedging:
+    def test_delay_needs_samples(self) -> None:
+        latency = Rolling()
+        for n in range(1, HEDGE_MIN_SAMPLES):
+            latency.add(n / 10)
+        assert hedge_delay(latency) is None
+        latency.add(HEDGE_MIN_SAMPLES / 10)
+        assert hedge_delay(latency) == pytest.approx(HEDGE_MIN_SAMPLES * 0.095)
+        fast = Rolling()
+        for _ in range(HEDGE_MIN_SAMPLES):
+            fast.add(0.001)
+        assert hedge_delay(fast) == HEDGE_MIN_DELAY
+
+    async def test_fast_first_call_is_not_hedged(self) -> None:
+        calls = 0
+
+        async def call() -> int:
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await hedged(call, 1.0) == (1, False)
+        assert calls == 1
+
+    async def test_slow_first_call_loses_to_hedge(self) -> None:
+        delays = [1.0, 0.0]
+        cancelled: list[int] = []
+
+        async def call() -> float:
+            delay = delays.pop(0)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return delay
+
+        assert await hedged(call, 0.01) == (0.0, True)
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+
+    async def test_hedge_covers_a_failing_first_call(self) -> None:
+        outcomes: list[BaseException | None] = [ValueError("slow failure"), None]
+
+        async def call() -> str:
+            outcome = outcomes.pop(0)
+            if outcome is not None:
+                await asyncio.sleep(0.05)
+                raise outcome
+            await asyncio.sleep(0.1)
+            return "ok"
+
+        assert await hedged(call, 0.01) == ("ok", True)
+
+    async def test_both_failing_raises(self) -> None:
+        async def call() -> None:
+            await asyncio.sleep(0.02)
+            raise ValueError("down")
+
+        with pytest.raises(ValueError):
+            await hedged(call, 0.01)
@@ -0,0 +1,66 @@
+"""Tests for schedule.py — the precompiled schedule index."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from custom_components.iett.models import ScheduledDeparture
+from custom_components.iett.schedule import ScheduleIndex, parse_minute
+
+# 2026-10-16 is a Friday, 10-17 a Saturday, 10-18 a Sunday.
+FRIDAY = datetime(2026, 10, 16, 8, 0)
+SATURDAY = datetime(2026, 10, 17, 8, 0)
+
+
+def _dep(time: str, day_type: str = "H", direction: str = "G",
+         variant: str = "500T_G_D0") -> ScheduledDeparture:
+    return ScheduledDeparture(
+        route_code="500T", route_name="TUZLA - LEVENT", route_variant=variant,
+        direction=direction, day_type=day_type, service_type="ÖHO",
+        departure_time=time,
+    )
+
+
+class TestParse:
+    def test_parse_minute(self) -> None:
+        assert parse_minute("06:30") == 390
+        assert parse_minute("24:05") == 5
+
+    def test_malformed_rows_are_skipped(self) -> None:
+        index = ScheduleIndex([_dep("bad"), _dep("07:00"), {"departure_time": "08:00"}])
+        assert len(index) == 1
+
+
+class TestNextDepartures:
+    def test_bisects_into_todays_day_type(self) -> None:
+        index = ScheduleIndex([
+            _dep("07:30"), _dep("08:15"), _dep("08:05", "C"), _dep("09:00"), _dep("08:00"),
+        ])
+        upcoming = index.next_departures(FRIDAY, 3)
+        assert [(m, d.departure_time) for m, d in upcoming] == [
+            (0, "08:00"), (15, "08:15"), (60, "09:00"),
+        ]
+        assert index.minutes_to_next(SATURDAY) == 5
+
+    def test_rolls_over_to_next_service_day(self) -> None:
+        index = ScheduleIndex([_dep("06:00", "H"), _dep("07:00", "P")])
+        # Friday 08:00 → Saturday has nothing → Sunday 07:00.
+        assert index.minutes_to_next(FRIDAY) == 16 * 60 + 24 * 60 + 7 * 60
+
+    def test_filters_by_direction_and_variant(self) -> None:
+        index = ScheduleIndex([
+            _dep("08:10", direction="G"),
+            _dep("08:20", direction="D", variant="500T_D_D0"),
+            _dep("08:30", direction="D", variant="500T_D_D1"),
+        ])
+        assert index.minutes_to_next(FRIDAY, direction="D") == 20
+        assert index.minutes_to_next(FRIDAY, variant="500T_D_D1") == 30
+        assert index.keys == [
+            ("H", "D", "500T_D_D0"), ("H", "D", "500T_D_D1"), ("H", "G", "500T_G_D0"),
+        ]
+
+    def test_unknown_day_type_runs_every_day(self) -> None:
+        index = ScheduleIndex([_dep("08:45", "X")])
+        assert index.minutes_to_next(SATURDAY) == 45
+
+    def test_empty_schedule(self) -> None:
+        assert ScheduleIndex([]).minutes_to_next(FRIDAY) is None
@@ -1,6 +1,9 @@
 """Tests for IettSensor — focuses on _state_value pure function."""
 from __future__ import annotations
 
+from datetime import datetime
+from unittest.mock import patch
+
 from custom_components.iett.const import (
     FEED_ALL_FLEET,
     FEED_ROUTE_ANNOUNCEMENTS,
@@ -9,7 +12,9 @@ from custom_components.iett.const import (
     FEED_STOP_ARRIVALS,
 )
 from custom_components.iett.models import Announcement, Arrival, BusPosition, ScheduledDeparture
+from custom_components.iett.schedule import DAY_TYPE_KINDS, day_kind
 from custom_components.iett.sensor import _state_value  # type: ignore[reportPrivateUsage]
+from homeassistant.util import dt as dt_util
 
 
 # ---------------------------------------------------------------------------
@@ -70,27 +75,33 @@ class TestStateValueArrivals:
         assert _state_value(FEED_STOP_ARRIVALS, [self._arrival(8)]) == 8
 
 
+# A Friday night, so the next hour falls on Saturday's timetable.
+FRIDAY_NIGHT = datetime(2024, 1, 5, 23, 30, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
 class TestStateValueSchedule:
-    def _dep(self, hh: int, mm: int) -> ScheduledDeparture:
+    def _dep(self, hh: int, mm: int, day_type: str | None = None) -> ScheduledDeparture:
+        # Default to the code of the frozen clock's service day.
+        kind = day_kind(FRIDAY_NIGHT.date())
         return ScheduledDeparture(
             route_code="500T",
             route_name="TUZLA - LEVENT",
             route_variant="500T_D_D0",
             direction="D",
-            day_type="H",
+            day_type=day_type or next(c for c, k in DAY_TYPE_KINDS.items() if k == kind),
             service_type="ÖHO",
             departure_time=f"{hh:02d}:{mm:02d}",
         )
 
     def test_returns_minutes_to_next(self) -> None:
-        from datetime import datetime
-        now = datetime.now()
-        future_hh = (now.hour + 1) % 24
-        deps = [self._dep(future_hh, now.minute)]
-        result = _state_value(FEED_ROUTE_SCHEDULE, deps)
-        # ~60 minutes away, allow ±2 min for clock drift in test
-        assert result is not None
-        assert 55 <= result <= 65
+        evening = FRIDAY_NIGHT.replace(hour=20)
+        with patch("custom_components.iett.sensor.dt_util.now", return_value=evening):
+            assert _state_value(FEED_ROUTE_SCHEDULE, [self._dep(21, 30)]) == 60
+
+    def test_next_hour_on_the_next_service_day(self) -> None:
+        deps = [self._dep(0, 30, "C"), self._dep(0, 30)]  # Saturday's, and Friday's
+        with patch("custom_components.iett.sensor.dt_util.now", return_value=FRIDAY_NIGHT):
+            assert _state_value(FEED_ROUTE_SCHEDULE, deps) == 60
 
     def test_returns_none_on_parse_error(self) -> None:
         bad = ScheduledDeparture(
@@ -106,8 +117,8 @@ class TestStateValueSchedule:
         assert result is None
 
     def test_wraps_past_to_next_day(self) -> None:
-        # Departure at 00:01 is always in the future or 1439 mins away
-        deps = [self._dep(0, 1)]
+        # Departure at 00:01 every day is always in the future or 1439 mins away
+        deps = [self._dep(0, 1, code) for code in DAY_TYPE_KINDS]
         result = _state_value(FEED_ROUTE_SCHEDULE, deps)
         assert result is not None
         assert 0 <= result <= 1440
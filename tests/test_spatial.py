@@ -0,0 +1,87 @@
+"""Tests for spatial.py — the fleet grid index."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from custom_components.iett.fleet import FleetSnapshot
+from custom_components.iett.models import BusPosition
+from custom_components.iett.spatial import FleetGrid, distance_m
+
+_HOME = (41.0082, 28.9784)
+
+
+def _bus(kapino: str, lat: float, lon: float) -> BusPosition:
+    return BusPosition(
+        kapino=kapino, latitude=lat, longitude=lon, speed=0, last_seen="00:00:00"
+    )
+
+
+def _fleet(n: int = 2000, seed: int = 1) -> FleetSnapshot:
+    rng = random.Random(seed)
+    return FleetSnapshot.from_positions(
+        _bus(f"K-{i}", 40.9 + rng.random() * 0.3, 28.8 + rng.random() * 0.4)
+        for i in range(n)
+    )
+
+
+def _brute_within(snap: FleetSnapshot, radius: float) -> set[str]:
+    return {
+        snap.kapino[i]
+        for i in range(len(snap))
+        if distance_m(*_HOME, snap.latitude[i], snap.longitude[i]) <= radius
+    }
+
+
+class TestDistance:
+    def test_one_degree_of_latitude(self) -> None:
+        assert distance_m(41.0, 29.0, 42.0, 29.0) == pytest.approx(111_195, rel=1e-3)
+
+    def test_longitude_shrinks_with_latitude(self) -> None:
+        assert distance_m(41.0, 29.0, 41.0, 30.0) == pytest.approx(83_900, rel=1e-2)
+
+
+class TestFleetGrid:
+    @pytest.mark.parametrize("radius", [150, 400, 2500])
+    def test_within_matches_brute_force(self, radius: float) -> None:
+        snap = _fleet()
+        grid = FleetGrid()
+        grid.sync(snap)
+        rows = grid.within(*_HOME, radius)
+        assert {snap.kapino[i] for i in rows} == _brute_within(snap, radius)
+        distances = [distance_m(*_HOME, snap.latitude[i], snap.longitude[i]) for i in rows]
+        assert distances == sorted(distances)
+
+    def test_in_bbox(self) -> None:
+        snap = _fleet()
+        grid = FleetGrid()
+        grid.sync(snap)
+        box = (41.0, 28.95, 41.03, 29.0)
+        expected = {
+            snap.kapino[i]
+            for i in range(len(snap))
+            if box[0] <= snap.latitude[i] <= box[2] and box[1] <= snap.longitude[i] <= box[3]
+        }
+        assert {snap.kapino[i] for i in grid.in_bbox(*box)} == expected
+
+    def test_sync_moves_only_changed_buses(self) -> None:
+        snap = FleetSnapshot.from_positions(
+            [_bus("A", *_HOME), _bus("B", 41.05, 29.05), _bus("C", 41.1, 29.1)]
+        )
+        grid = FleetGrid()
+        grid.sync(snap)
+        assert grid.moved == 3
+        moved = snap.updated([_bus("B", *_HOME), _bus("D", 41.0083, 28.9785)], ["C"])
+        grid.sync(moved)
+        assert grid.moved == 2
+        assert len(grid) == 3
+        assert sorted(moved.kapino[i] for i in grid.within(*_HOME, 100)) == ["A", "B", "D"]
+        assert grid.in_bbox(41.09, 29.09, 41.11, 29.11) == []
+
+    def test_same_snapshot_is_a_no_op(self) -> None:
+        snap = _fleet(10)
+        grid = FleetGrid()
+        grid.sync(snap)
+        grid.sync(snap)
+        assert grid.moved == 10